@@ -22,9 +22,9 @@ import bittensor as bt
 import numpy as np
 
 
-async def ping_uids(dendrite, metagraph, uids, timeout=3):
+async def ping_axons(dendrite, metagraph, uids, timeout=3):
     """
-    Pings a list of UIDs to check their availability on the Bittensor network.
+    Pings a list of UIDs with a bare `bt.Synapse` and reports how each one answered.
 
     Args:
         dendrite (bittensor.dendrite): The dendrite instance to use for pinging nodes.
@@ -33,9 +33,8 @@ async def ping_uids(dendrite, metagraph, uids, timeout=3):
         timeout (int, optional): The timeout in seconds for each ping. Defaults to 3.
 
     Returns:
-        tuple: A tuple containing two lists:
-            - The first list contains UIDs that were successfully pinged.
-            - The second list contains UIDs that failed to respond.
+        list: A `(uid, success, rtt)` tuple per UID, where `rtt` is the round trip
+            time in seconds reported by the dendrite, or None if unknown.
     """
     axons = [metagraph.axons[uid] for uid in uids]
     try:
@@ -45,20 +44,37 @@ async def ping_uids(dendrite, metagraph, uids, timeout=3):
             deserialize=False,
             timeout=timeout,
         )
-        successful_uids = [
-            uid
-            for uid, response in zip(uids, responses, strict=False)
-            if response.dendrite.status_code == 200
-        ]
-        failed_uids = [
-            uid
-            for uid, response in zip(uids, responses, strict=False)
-            if response.dendrite.status_code != 200
-        ]
     except Exception as e:
         bt.logging.error(f"Dendrite ping failed: {e}")
-        successful_uids = []
-        failed_uids = uids
+        return [(uid, False, None) for uid in uids]
+    results = []
+    for uid, response in zip(uids, responses, strict=False):
+        try:
+            rtt = float(response.dendrite.process_time)
+        except (TypeError, ValueError):
+            rtt = None
+        results.append((uid, response.dendrite.status_code == 200, rtt))
+    return results
+
+
+async def ping_uids(dendrite, metagraph, uids, timeout=3):
+    """
+    Pings a list of UIDs to check their availability on the Bittensor network.
+
+    Args:
+        dendrite (bittensor.dendrite): The dendrite instance to use for pinging nodes.
+        metagraph (bittensor.metagraph): The metagraph instance containing network information.
+        uids (list): A list of UIDs (unique identifiers) to ping.
+        timeout (int, optional): The timeout in seconds for each ping. Defaults to 3.
+
+    Returns:
+        tuple: A tuple containing two lists:
+            - The first list contains UIDs that were successfully pinged.
+            - The second list contains UIDs that failed to respond.
+    """
+    results = await ping_axons(dendrite, metagraph, uids, timeout=timeout)
+    successful_uids = [uid for uid, success, _ in results if success]
+    failed_uids = [uid for uid, success, _ in results if not success]
     bt.logging.debug(f"ping() successful uids: {successful_uids}")
     bt.logging.debug(f"ping() failed uids    : {failed_uids}")
     return successful_uids, failed_uids
@@ -16,6 +16,8 @@
 # DEALINGS IN THE SOFTWARE.
 
 import copy
+import os
+import threading
 from abc import ABC, abstractmethod
 
 import bittensor as bt
@@ -25,6 +27,10 @@ from BetterTherapy.mock import MockMetagraph, MockSubtensor
 
 # Sync calls set weights and also resyncs the metagraph.
 from BetterTherapy.utils.config import add_args, check_config, config
+from BetterTherapy.utils.metagraph import (
+    load_metagraph_snapshot,
+    save_metagraph_snapshot,
+)
 from BetterTherapy.utils.misc import ttl_get_block
 import time
 
@@ -80,6 +86,9 @@ class BaseNeuron(ABC):
         # These are core Bittensor classes to interact with the network.
         bt.logging.info("Setting up bittensor objects.")
 
+        self._pending_metagraph = None
+        self._metagraph_lock = threading.Lock()
+
         # The wallet holds the cryptographic key pairs for the miner.
         if self.config.mock:
             self.wallet = bt.MockWallet(config=self.config)
@@ -88,7 +97,7 @@ class BaseNeuron(ABC):
         else:
             self.wallet = bt.wallet(config=self.config)
             self.subtensor = bt.subtensor(config=self.config)
-            self.metagraph = self.subtensor.metagraph(self.config.netuid)
+            self.metagraph = self.load_metagraph()
 
         bt.logging.info(f"Wallet: {self.wallet}")
         bt.logging.info(f"Subtensor: {self.subtensor}")
@@ -112,15 +121,106 @@ class BaseNeuron(ABC):
     @abstractmethod
     def run(self): ...
 
+    def new_subtensor(self) -> "bt.subtensor":
+        """A subtensor connection for a background thread; the main one is not thread-safe."""
+        if self.config.mock:
+            return self.subtensor
+        return bt.subtensor(config=self.config)
+
+    @property
+    def metagraph_snapshot_path(self) -> str:
+        return os.path.join(self.config.neuron.full_path, "metagraph.npz")
+
+    def load_metagraph(self) -> "bt.metagraph":
+        """
+        Serves the metagraph from the on-disk snapshot if there is one and refreshes
+        it from the chain in the background; otherwise fetches it from the chain.
+        """
+        metagraph = None
+        if not self.config.neuron.metagraph_snapshot_off:
+            start = time.perf_counter()
+            metagraph = load_metagraph_snapshot(
+                self.metagraph_snapshot_path,
+                self.config.netuid,
+                self.subtensor.network,
+            )
+        if metagraph is None:
+            metagraph = self.subtensor.metagraph(self.config.netuid)
+            self.metagraph = metagraph
+            self.snapshot_metagraph()
+            return metagraph
+
+        bt.logging.info(
+            f"Loaded metagraph snapshot at block {int(metagraph.block.item())} in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms, refreshing in background"
+        )
+        threading.Thread(target=self.refresh_metagraph, daemon=True).start()
+        return metagraph
+
+    def refresh_metagraph(self):
+        """Fetches the metagraph from the chain for the next `sync` to swap in."""
+        subtensor = None
+        try:
+            start = time.perf_counter()
+            # A dedicated connection, the main one is not safe to share across threads.
+            subtensor = bt.subtensor(config=self.config)
+            metagraph = subtensor.metagraph(self.config.netuid)
+            with self._metagraph_lock:
+                self._pending_metagraph = metagraph
+            bt.logging.info(
+                f"Fetched metagraph at block {int(metagraph.block.item())} in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+        except Exception as e:
+            bt.logging.error(f"Error refreshing metagraph from chain: {e}")
+        finally:
+            if subtensor is not None:
+                subtensor.close()
+
+    def apply_pending_metagraph(self) -> bool:
+        """Swaps in a metagraph fetched by `refresh_metagraph`, if one is ready."""
+        with self._metagraph_lock:
+            pending, self._pending_metagraph = self._pending_metagraph, None
+        if pending is None:
+            return False
+        # Update in place so everything holding a reference to the metagraph sees it.
+        state = dict(vars(pending))
+        state.pop("subtensor", None)
+        vars(self.metagraph).update(state)
+        self.apply_metagraph_changes()
+        self.snapshot_metagraph()
+        return True
+
+    def apply_metagraph_changes(self, sync_ms: float | None = None):
+        """
+        Called after the metagraph was refreshed from the chain. Neurons that keep
+        per-UID state override this to update it; the base only logs the refresh.
+        """
+        synced = "refreshed" if sync_ms is None else f"synced in {sync_ms:.0f}ms"
+        bt.logging.info(f"Metagraph {synced} at block {int(self.metagraph.block)}")
+
+    def snapshot_metagraph(self):
+        if self.config.mock or self.config.neuron.metagraph_snapshot_off:
+            return
+        try:
+            save_metagraph_snapshot(self.metagraph, self.metagraph_snapshot_path)
+        except Exception as e:
+            bt.logging.warning(f"Error saving metagraph snapshot: {e}")
+
     def sync(self):
         """
         Wrapper for synchronizing the state of the network for the given miner or validator.
         """
+        refreshed = self.apply_pending_metagraph()
+
         # Ensure miner or validator hotkey is still registered on the network.
         self.check_registered()
+        if refreshed:
+            self.uid = self.metagraph.hotkeys.index(self.wallet.hotkey.ss58_address)
 
         if self.should_sync_metagraph():
             self.resync_metagraph()
+            self.snapshot_metagraph()
             self._last_synced_block = self.block
 
         if self.should_set_weights():
@@ -132,6 +232,10 @@ class BaseNeuron(ABC):
 
     def check_registered(self):
         # --- Check for registration.
+        # The metagraph hotkeys answer without a chain query; only a hotkey missing
+        # from them (e.g. a stale snapshot) is confirmed against the chain.
+        if self.wallet.hotkey.ss58_address in self.metagraph.hotkeys:
+            return
         if not self.subtensor.is_hotkey_registered(
             netuid=self.config.netuid,
             hotkey_ss58=self.wallet.hotkey.ss58_address,
@@ -141,6 +245,8 @@ class BaseNeuron(ABC):
                 f" Please register the hotkey using `btcli subnets register` before trying again"
             )
             exit()
+        bt.logging.info("Hotkey missing from the cached metagraph, syncing from chain")
+        self.metagraph.sync(subtensor=self.subtensor)
 
     def should_sync_metagraph(self):
         """
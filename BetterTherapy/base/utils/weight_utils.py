@@ -1,8 +1,7 @@
-from typing import Any, Union
-
 import bittensor
 import numpy as np
-from numpy import complexfloating, dtype, floating, ndarray
+
+from BetterTherapy.utils.logging import debug_enabled
 
 U32_MAX = 4294967295
 U16_MAX = 65535
@@ -21,68 +20,59 @@ def normalize_max_weight(x: np.ndarray, limit: float = 0.1) -> np.ndarray:
     """
     epsilon = 1e-7  # For numerical stability after normalization
 
-    weights = x.copy()
-    values = np.sort(weights)
-
     if x.sum() == 0 or len(x) * limit <= 1:
         return np.ones_like(x) / x.size
-    else:
-        estimation = values / values.sum()
-
-        if estimation.max() <= limit:
-            return weights / weights.sum()
-
-        # Find the cumulative sum and sorted array
-        cumsum = np.cumsum(estimation, 0)
-
-        # Determine the index of cutoff
-        estimation_sum = np.array(
-            [(len(values) - i - 1) * estimation[i] for i in range(len(values))]
-        )
-        n_values = (estimation / (estimation_sum + cumsum + epsilon) < limit).sum()
 
-        # Determine the cutoff based on the index
-        cutoff_scale = (limit * cumsum[n_values - 1] - epsilon) / (
-            1 - (limit * (len(estimation) - n_values))
-        )
-        cutoff = cutoff_scale * values.sum()
-
-        # Applying the cutoff
-        weights[weights > cutoff] = cutoff
-
-        y = weights / weights.sum()
+    values = np.sort(x)
+    total = values.sum()
+    estimation = values / total
+
+    # The values are sorted, so the last one is the largest.
+    if estimation[-1] <= limit:
+        return x / x.sum()
+
+    # Capping every value above the i-th smallest at estimation[i] gives a total of
+    # cumsum[i] + (n - i - 1) * estimation[i]; the values whose share of that total
+    # stays below the limit are left uncapped.
+    n = len(estimation)
+    cumsum = np.cumsum(estimation)
+    capped_sum = cumsum + np.arange(n - 1, -1, -1, dtype=estimation.dtype) * estimation
+    n_values = (estimation / (capped_sum + epsilon) < limit).sum()
+
+    # Closed form of the cutoff c solving c = limit * (cumsum[k - 1] + (n - k) * c)
+    # for the k uncapped values.
+    cutoff_scale = (limit * cumsum[n_values - 1] - epsilon) / (
+        1 - (limit * (n - n_values))
+    )
+    cutoff = cutoff_scale * total
 
-        return y
+    # Applying the cutoff
+    y = np.where(x > cutoff, x.dtype.type(cutoff), x)
+    return y / y.sum()
 
 
 def convert_weights_and_uids_for_emit(
     uids: np.ndarray, weights: np.ndarray
-) -> tuple[list[int], list[int]]:
-    r"""Converts weights into integer u32 representation that sum to MAX_INT_WEIGHT.
+) -> tuple[np.ndarray, np.ndarray]:
+    r"""Converts weights into integer u16 representation, max-upscaled to U16_MAX.
     Args:
         uids (:obj:`np.ndarray,`):
             Array of uids as destinations for passed weights.
         weights (:obj:`np.ndarray,`):
             Array of weights.
     Returns:
-        weight_uids (List[int]):
-            Uids as a list.
-        weight_vals (List[int]):
-            Weights as a list.
+        weight_uids (:obj:`np.ndarray`):
+            Uids of the non-zero u16 weights, as uint16.
+        weight_vals (:obj:`np.ndarray`):
+            Non-zero u16 weights, as uint16.
     """
     # Checks.
     uids = np.asarray(uids)
     weights = np.asarray(weights)
 
-    # Get non-zero weights and corresponding uids
-    non_zero_weights = weights[weights > 0]
-    non_zero_weight_uids = uids[weights > 0]
-
-    # Debugging information
-    bittensor.logging.debug(f"weights: {weights}")
-    bittensor.logging.debug(f"non_zero_weights: {non_zero_weights}")
-    bittensor.logging.debug(f"uids: {uids}")
-    bittensor.logging.debug(f"non_zero_weight_uids: {non_zero_weight_uids}")
+    if debug_enabled():
+        bittensor.logging.debug(f"weights: {weights}")
+        bittensor.logging.debug(f"uids: {uids}")
 
     if np.min(weights) < 0:
         raise ValueError(f"Passed weight is negative cannot exist on chain {weights}")
@@ -94,118 +84,116 @@ def convert_weights_and_uids_for_emit(
         )
     if np.sum(weights) == 0:
         bittensor.logging.debug("nothing to set on chain")
-        return [], []  # Nothing to set on chain.
-    else:
-        max_weight = float(np.max(weights))
-        weights = [
-            float(value) / max_weight for value in weights
-        ]  # max-upscale values (max_weight = 1).
+        empty = np.zeros(0, dtype=np.uint16)
+        return empty, empty.copy()  # Nothing to set on chain.
+
+    # Max-upscale values (max_weight = 1) and convert to int representation,
+    # rounding half to even like `round`.
+    max_weight = float(np.max(weights))
+    uint16_vals = np.rint(weights.astype(np.float64) / max_weight * U16_MAX)
+
+    # Filter zeros
+    non_zero = uint16_vals != 0
+    weight_uids = uids[non_zero].astype(np.uint16)
+    weight_vals = uint16_vals[non_zero].astype(np.uint16)
+    if debug_enabled():
         bittensor.logging.debug(
-            f"setting on chain max: {max_weight} and weights: {weights}"
+            f"setting on chain max: {max_weight}, final params: "
+            f"{weight_uids} : {weight_vals}"
         )
-
-    weight_vals = []
-    weight_uids = []
-    for i, (weight_i, uid_i) in enumerate(list(zip(weights, uids, strict=False))):
-        uint16_val = round(
-            float(weight_i) * int(U16_MAX)
-        )  # convert to int representation.
-
-        # Filter zeros
-        if uint16_val != 0:  # Filter zeros
-            weight_vals.append(uint16_val)
-            weight_uids.append(uid_i)
-    bittensor.logging.debug(f"final params: {weight_uids} : {weight_vals}")
     return weight_uids, weight_vals
 
 
-def process_weights_for_netuid(
-    uids,
+def process_weights(
+    uids: np.ndarray,
     weights: np.ndarray,
-    netuid: int,
-    subtensor: "bittensor.subtensor",
-    metagraph: "bittensor.metagraph" = None,
+    n: int,
+    min_allowed_weights: int,
+    max_weight_limit: float,
     exclude_quantile: int = 0,
-) -> Union[  # noqa: UP007
-    tuple[
-        ndarray[Any, dtype[Any]],
-        Union[  # noqa: UP007
-            Union[  # noqa: UP007
-                ndarray[Any, dtype[floating[Any]]],
-                ndarray[Any, dtype[complexfloating[Any, Any]]],
-            ],
-            Any,
-        ],
-    ],
-    tuple[ndarray[Any, dtype[Any]], ndarray],
-    tuple[Any, ndarray],
-]:  # noqa: UP007
-    bittensor.logging.debug("process_weights_for_netuid()")
-    bittensor.logging.debug("weights", weights)
-    bittensor.logging.debug("netuid", netuid)
-    bittensor.logging.debug("subtensor", subtensor)
-    bittensor.logging.debug("metagraph", metagraph)
-
-    # Get latest metagraph from chain if metagraph is None.
-    if metagraph is None:
-        metagraph = subtensor.metagraph(netuid)
-
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Applies the subnet weight limits to `weights` of a metagraph of `n` UIDs: drops
+    the weights below `exclude_quantile` (out of U16_MAX) while keeping at least
+    `min_allowed_weights` of them, then max-weight normalizes the rest.
+    """
     # Cast weights to floats.
-    if not isinstance(weights, np.ndarray) or weights.dtype != np.float32:
-        weights = weights.astype(np.float32)
-
-    # Network configuration parameters from an subtensor.
-    # These parameters determine the range of acceptable weights for each neuron.
+    weights = np.asarray(weights, dtype=np.float32)
     quantile = exclude_quantile / U16_MAX
-    min_allowed_weights = subtensor.min_allowed_weights(netuid=netuid)
-    max_weight_limit = subtensor.max_weight_limit(netuid=netuid)
-    bittensor.logging.debug("quantile", quantile)
-    bittensor.logging.debug("min_allowed_weights", min_allowed_weights)
-    bittensor.logging.debug("max_weight_limit", max_weight_limit)
 
     # Find all non zero weights.
-    non_zero_weight_idx = np.argwhere(weights > 0).squeeze()
-    non_zero_weight_idx = np.atleast_1d(non_zero_weight_idx)
-    non_zero_weight_uids = uids[non_zero_weight_idx]
+    non_zero_weight_idx = np.flatnonzero(weights > 0)
     non_zero_weights = weights[non_zero_weight_idx]
-    if non_zero_weights.size == 0 or metagraph.n < min_allowed_weights:
+    if non_zero_weights.size == 0 or n < min_allowed_weights:
         bittensor.logging.warning("No non-zero weights returning all ones.")
-        final_weights = np.ones(metagraph.n) / metagraph.n
-        bittensor.logging.debug("final_weights", final_weights)
-        return np.arange(len(final_weights)), final_weights
+        final_weights = np.ones(n) / n
+        return np.arange(n), final_weights
 
     elif non_zero_weights.size < min_allowed_weights:
         bittensor.logging.warning(
             "No non-zero weights less then min allowed weight, returning all ones."
         )
-        weights = np.ones(metagraph.n) * 1e-5  # creating minimum even non-zero weights
-        weights[non_zero_weight_idx] += non_zero_weights
-        bittensor.logging.debug("final_weights", weights)
-        normalized_weights = normalize_max_weight(x=weights, limit=max_weight_limit)
-        return np.arange(len(normalized_weights)), normalized_weights
-
-    bittensor.logging.debug("non_zero_weights", non_zero_weights)
+        padded = np.ones(n) * 1e-5  # creating minimum even non-zero weights
+        padded[non_zero_weight_idx] += non_zero_weights
+        normalized_weights = normalize_max_weight(x=padded, limit=max_weight_limit)
+        return np.arange(n), normalized_weights
 
-    # Compute the exclude quantile and find the weights in the lowest quantile
+    # Compute the exclude quantile and exclude all weights below it.
     max_exclude = max(0, len(non_zero_weights) - min_allowed_weights) / len(
         non_zero_weights
     )
-    exclude_quantile = min([quantile, max_exclude])
-    lowest_quantile = np.quantile(non_zero_weights, exclude_quantile)
-    bittensor.logging.debug("max_exclude", max_exclude)
-    bittensor.logging.debug("exclude_quantile", exclude_quantile)
-    bittensor.logging.debug("lowest_quantile", lowest_quantile)
-
-    # Exclude all weights below the allowed quantile.
-    non_zero_weight_uids = non_zero_weight_uids[lowest_quantile <= non_zero_weights]
-    non_zero_weights = non_zero_weights[lowest_quantile <= non_zero_weights]
-    bittensor.logging.debug("non_zero_weight_uids", non_zero_weight_uids)
-    bittensor.logging.debug("non_zero_weights", non_zero_weights)
+    exclude_quantile = min(quantile, max_exclude)
+    keep = non_zero_weights >= np.quantile(non_zero_weights, exclude_quantile)
+    non_zero_weight_uids = np.asarray(uids)[non_zero_weight_idx[keep]]
 
     # Normalize weights and return.
     normalized_weights = normalize_max_weight(
-        x=non_zero_weights, limit=max_weight_limit
+        x=non_zero_weights[keep], limit=max_weight_limit
     )
-    bittensor.logging.debug("final_weights", normalized_weights)
-
+    if debug_enabled():
+        bittensor.logging.debug(
+            f"exclude_quantile: {exclude_quantile}, final_weights: "
+            f"{normalized_weights}, uids: {non_zero_weight_uids}"
+        )
     return non_zero_weight_uids, normalized_weights
+
+
+def process_weights_for_emit(
+    uids: np.ndarray,
+    weights: np.ndarray,
+    n: int,
+    min_allowed_weights: int,
+    max_weight_limit: float,
+    exclude_quantile: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Runs `process_weights` and returns the uint16 uids and weights to set on chain."""
+    return convert_weights_and_uids_for_emit(
+        *process_weights(
+            uids, weights, n, min_allowed_weights, max_weight_limit, exclude_quantile
+        )
+    )
+
+
+def process_weights_for_netuid(
+    uids,
+    weights: np.ndarray,
+    netuid: int,
+    subtensor: "bittensor.subtensor",
+    metagraph: "bittensor.metagraph" = None,
+    exclude_quantile: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """`process_weights` with the weight limits of the subnet read from the chain."""
+    # Get latest metagraph from chain if metagraph is None.
+    if metagraph is None:
+        metagraph = subtensor.metagraph(netuid)
+
+    # Network configuration parameters from an subtensor.
+    # These parameters determine the range of acceptable weights for each neuron.
+    return process_weights(
+        uids,
+        weights,
+        n=int(metagraph.n),
+        min_allowed_weights=subtensor.min_allowed_weights(netuid=netuid),
+        max_weight_limit=subtensor.max_weight_limit(netuid=netuid),
+        exclude_quantile=exclude_quantile,
+    )
@@ -20,8 +20,9 @@
 
 import argparse
 import asyncio
-import copy
 import threading
+import time
+from functools import partial
 from traceback import print_exception
 from typing import Union
 
@@ -30,11 +31,20 @@ import numpy as np
 
 from BetterTherapy.base.neuron import BaseNeuron
 from BetterTherapy.base.utils.weight_utils import (
-    convert_weights_and_uids_for_emit,
-    process_weights_for_netuid,
+    process_weights_for_emit,
 )  # TODO: Replace when bittensor switches to numpy
 from BetterTherapy.mock import MockDendrite
+from BetterTherapy.utils.chain import ChainStateCache
 from BetterTherapy.utils.config import add_validator_args
+from BetterTherapy.utils.logging import debug_enabled
+from BetterTherapy.utils.metagraph import MetagraphChange, MetagraphTracker
+from BetterTherapy.utils.rewards import RewardHistory
+from BetterTherapy.utils.scores import ScoreEngine
+from BetterTherapy.utils.state import StateStore
+from BetterTherapy.utils.weight_worker import WeightCommitWorker
+
+# Seconds the weight worker gets on shutdown to submit the last queued weights.
+WEIGHT_WORKER_DRAIN_TIMEOUT = 30.0
 
 
 class BaseValidatorNeuron(BaseNeuron):
@@ -53,7 +63,28 @@ class BaseValidatorNeuron(BaseNeuron):
         super().__init__(config=config)
 
         # Save a copy of the hotkeys to local memory.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = list(self.metagraph.hotkeys)
+        self.hotkey_to_uid = {hotkey: uid for uid, hotkey in enumerate(self.hotkeys)}
+        # Tracks which UIDs change between metagraph syncs.
+        self.metagraph_tracker = MetagraphTracker(self.metagraph)
+        # Subnet hyperparameters and weights, refreshed every few blocks.
+        self.chain_state = ChainStateCache(
+            self.subtensor,
+            self.config.netuid,
+            refresh_blocks=self.config.neuron.chain_state_refresh_blocks,
+        )
+        self.metagraph_tracker.subscribe(lambda change: self.chain_state.invalidate())
+
+        # Submits weights in the background, with its own subtensor connection.
+        self.weight_worker = None
+        if not self.config.neuron.weights_worker_off:
+            self.weight_worker = WeightCommitWorker(
+                self.new_subtensor,
+                retries=self.config.neuron.set_weights_retries,
+                backoff=self.config.neuron.set_weights_backoff,
+                window=self.config.neuron.epoch_length * 12,
+            )
+            self.weight_worker.start()
 
         # Dendrite lets us send messages to other nodes (axons) in the network.
         if self.config.mock:
@@ -64,7 +95,21 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # Set up initial scoring weights for validation
         bt.logging.info("Building validation weights.")
-        self.scores = np.zeros(self.metagraph.n, dtype=np.float32)
+        self.score_engine = ScoreEngine(
+            int(self.metagraph.n), alpha=self.config.neuron.moving_average_alpha
+        )
+        # The last rewards of every miner, alongside the moving average.
+        self.reward_history = RewardHistory(
+            int(self.metagraph.n), window=self.config.neuron.reward_window
+        )
+        self.metagraph_tracker.subscribe(self.reward_history.apply_change)
+
+        # Restore the saved state before the first sync saves over it.
+        self.state_store = StateStore(
+            self.config.neuron.full_path,
+            checkpoint_every=self.config.neuron.state_checkpoint_every,
+        )
+        self.load_state()
 
         # Init sync with the network. Updates the metagraph.
         self.sync()
@@ -84,19 +129,29 @@ class BaseValidatorNeuron(BaseNeuron):
         self.thread: Union[threading.Thread, None] = None  # noqa: UP007
         self.lock = asyncio.Lock()
 
+    @property
+    def scores(self) -> np.ndarray:
+        """The moving average scores, a float32 buffer owned by the score engine."""
+        return self.score_engine.scores
+
+    @scores.setter
+    def scores(self, scores: np.ndarray):
+        self.score_engine.load(scores)
+
     def copy_weights(self):
         if self.config.neuron.disable_set_weights:
             bt.logging.info(f"Skipping set_weights due to disable_set_weights config.")
         else:
-            weights = self.subtensor.weights(self.config.netuid)
-            weights_dict = dict(weights)
-            uids, values = zip(*weights_dict.get(self.config.copy_validator.uid))
+            uids, values = zip(
+                *self.chain_state.validator_weights(
+                    self.config.copy_validator.uid, self.block
+                )
+            )
             elapsed = self.block - self._last_updated_block
             if (
                 elapsed > self.config.neuron.epoch_length
                 and self.neuron_type != "MinerNeuron"
             ):
-
                 result, msg = self.subtensor.set_weights(
                     wallet=self.wallet,
                     netuid=self.config.netuid,
@@ -189,6 +244,7 @@ class BaseValidatorNeuron(BaseNeuron):
         # If someone intentionally stops the validator, it'll safely terminate operations.
         except KeyboardInterrupt:
             self.axon.stop()
+            self.stop_weight_worker()
             bt.logging.success("Validator killed by keyboard interrupt.")
             exit()
 
@@ -220,6 +276,17 @@ class BaseValidatorNeuron(BaseNeuron):
             self.thread.join(5)
             self.is_running = False
             bt.logging.debug("Stopped")
+        self.stop_weight_worker()
+
+    def stop_weight_worker(self):
+        """
+        Lets the weight worker submit the last queued weights, then stops it.
+        """
+        if self.weight_worker is None:
+            return
+        if not self.weight_worker.wait_idle(WEIGHT_WORKER_DRAIN_TIMEOUT):
+            bt.logging.warning("Stopping the weight worker with weights still queued.")
+        self.weight_worker.stop()
 
     def __enter__(self):
         self.run_in_background_thread()
@@ -238,20 +305,38 @@ class BaseValidatorNeuron(BaseNeuron):
             traceback: A traceback object encoding the stack trace.
                        None if the context was exited without an exception.
         """
-        if self.is_running:
-            bt.logging.debug("Stopping validator in background thread.")
-            self.should_exit = True
-            self.thread.join(5)
-            self.is_running = False
-            bt.logging.debug("Stopped")
+        self.stop_run_thread()
 
     def set_weights(self):
         """
         Sets the validator weights to the metagraph hotkeys based on the scores it has received from the miners. The weights determine the trust and incentive level the validator assigns to miner nodes on the network.
-        """
 
-        # Check if self.scores contains any NaN values and log a warning if it does.
-        if np.isnan(self.scores).any():
+        The current scores are handed to the weight worker, which submits them in the background; with the worker off they are submitted inline.
+        """
+        job = partial(
+            self.submit_weights,
+            self.scores.copy(),
+            self.metagraph.uids.copy(),
+            self.chain_state.min_allowed_weights(self.block),
+            self.chain_state.max_weight_limit(self.block),
+        )
+        if self.weight_worker is not None:
+            self.weight_worker.enqueue(job)
+        else:
+            job(self.subtensor)
+
+    def submit_weights(
+        self,
+        scores: np.ndarray,
+        uids: np.ndarray,
+        min_allowed_weights: int,
+        max_weight_limit: float,
+        subtensor: "bt.subtensor",
+    ) -> tuple[bool, str]:
+        """Converts a snapshot of the scores to weights and sets them on chain."""
+
+        # Check if scores contains any NaN values and log a warning if it does.
+        if np.isnan(scores).any():
             bt.logging.warning(
                 "Scores contain NaN values. This may be due to a lack of responses from miners, or a bug in your reward functions."
             )
@@ -259,43 +344,31 @@ class BaseValidatorNeuron(BaseNeuron):
         # Calculate the average reward for each uid across non-zero values.
         # Replace any NaN values with 0.
         # Compute the norm of the scores
-        norm = np.linalg.norm(self.scores, ord=1, axis=0, keepdims=True)
+        norm = np.linalg.norm(scores, ord=1, axis=0, keepdims=True)
 
         # Check if the norm is zero or contains NaN values
         if np.any(norm == 0) or np.isnan(norm).any():
             norm = np.ones_like(norm)  # Avoid division by zero or NaN
 
         # Compute raw_weights safely
-        raw_weights = self.scores / norm
-
-        bt.logging.debug("raw_weights", raw_weights)
-        bt.logging.debug("raw_weight_uids", str(self.metagraph.uids.tolist()))
-        # Process the raw weights to final_weights via subtensor limitations.
-        (
-            processed_weight_uids,
-            processed_weights,
-        ) = process_weights_for_netuid(
-            uids=self.metagraph.uids,
+        raw_weights = scores / norm
+
+        # Process the raw weights via subtensor limitations and convert them to
+        # uint16 weights and uids.
+        uint_uids, uint_weights = process_weights_for_emit(
+            uids=uids,
             weights=raw_weights,
-            netuid=self.config.netuid,
-            subtensor=self.subtensor,
-            metagraph=self.metagraph,
+            n=len(uids),
+            min_allowed_weights=min_allowed_weights,
+            max_weight_limit=max_weight_limit,
         )
-        bt.logging.debug("processed_weights", processed_weights)
-        bt.logging.debug("processed_weight_uids", processed_weight_uids)
-
-        # Convert to uint16 weights and uids.
-        (
-            uint_uids,
-            uint_weights,
-        ) = convert_weights_and_uids_for_emit(
-            uids=processed_weight_uids, weights=processed_weights
-        )
-        bt.logging.debug("uint_weights", uint_weights)
-        bt.logging.debug("uint_uids", uint_uids)
+        if debug_enabled():
+            bt.logging.debug(f"raw_weights: {raw_weights}")
+            bt.logging.debug(f"uint_weights: {uint_weights}, uint_uids: {uint_uids}")
 
         # Set the weights on chain via our subtensor connection.
-        result, msg = self.subtensor.set_weights(
+        start = time.perf_counter()
+        result, msg = subtensor.set_weights(
             wallet=self.wallet,
             netuid=self.config.netuid,
             uids=uint_uids,
@@ -304,45 +377,70 @@ class BaseValidatorNeuron(BaseNeuron):
             wait_for_inclusion=False,
             version_key=self.spec_version,
         )
+        latency = time.perf_counter() - start
         if result is True:
-            bt.logging.info("set_weights on chain successfully!")
+            bt.logging.info(f"set_weights on chain successfully in {latency:.1f}s!")
         else:
             bt.logging.error("set_weights failed", msg)
+        return result is True, msg
 
-    def resync_metagraph(self):
-        """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
-        # Copies state of metagraph before syncing.
-        previous_metagraph = copy.deepcopy(self.metagraph)
-
-        # Sync the metagraph.
+    def resync_metagraph(self) -> MetagraphChange:
+        """Resyncs the metagraph and updates the hotkeys and moving averages of the UIDs that changed."""
+        start = time.perf_counter()
         self.metagraph.sync(subtensor=self.subtensor)
+        return self.apply_metagraph_changes((time.perf_counter() - start) * 1000)
+
+    def apply_metagraph_changes(self, sync_ms: float | None = None) -> MetagraphChange:
+        """Updates the hotkeys and moving averages of the UIDs that changed in the metagraph."""
+        synced = "refreshed" if sync_ms is None else f"synced in {sync_ms:.0f}ms"
+        start = time.perf_counter()
+        change = self.metagraph_tracker.diff(self.metagraph)
+        if change.empty:
+            bt.logging.info(f"Metagraph {synced}, no changes")
+            return change
+
+        # Zero out the moving averages of hotkeys that have been replaced.
+        replaced = change.replaced_uids
+        self.scores[replaced[replaced < len(self.scores)]] = 0
+
+        # Grow the moving averages if the metagraph has grown.
+        grown = change.n_after > len(self.scores)
+        if grown:
+            new_moving_average = np.zeros(change.n_after, dtype=self.scores.dtype)
+            new_moving_average[: len(self.scores)] = self.scores
+            self.scores = new_moving_average
 
-        # Check if the metagraph axon info has changed.
-        if previous_metagraph.axons == self.metagraph.axons:
-            return
+        # Update the hotkeys and the hotkey index for the replaced UIDs only.
+        del self.hotkeys[change.n_after :]
+        for uid in replaced.tolist():
+            hotkey = self.metagraph.hotkeys[uid]
+            if uid < len(self.hotkeys):
+                old_hotkey = self.hotkeys[uid]
+                if self.hotkey_to_uid.get(old_hotkey) == uid:
+                    del self.hotkey_to_uid[old_hotkey]
+                self.hotkeys[uid] = hotkey
+            else:
+                self.hotkeys.append(hotkey)
+            self.hotkey_to_uid[hotkey] = uid
 
+        self.metagraph_tracker.publish(change)
         bt.logging.info(
-            "Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages"
+            f"Metagraph {synced}, applied in "
+            f"{(time.perf_counter() - start) * 1000:.1f}ms: "
+            f"{len(replaced)} replaced, {len(change.axon_uids)} axon and "
+            f"{len(change.stake_uids)} stake changes"
+            + (f", scores resized to {change.n_after}" if grown else "")
         )
-        # Zero out all hotkeys that have been replaced.
-        for uid, hotkey in enumerate(self.hotkeys):
-            if hotkey != self.metagraph.hotkeys[uid]:
-                self.scores[uid] = 0  # hotkey has been replaced
-
-        # Check to see if the metagraph has changed size.
-        # If so, we need to add new hotkeys and moving averages.
-        if len(self.hotkeys) < len(self.metagraph.hotkeys):
-            # Update the size of the moving average scores.
-            new_moving_average = np.zeros(self.metagraph.n)
-            min_len = min(len(self.hotkeys), len(self.scores))
-            new_moving_average[:min_len] = self.scores[:min_len]
-            self.scores = new_moving_average
-
-        # Update the hotkeys.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        return change
 
     def update_scores(self, rewards: np.ndarray, uids: list[int]):
-        """Performs exponential moving average on the scores based on the rewards received from the miners."""
+        """
+        Performs exponential moving average on the scores based on the rewards received from the miners.
+
+        `rewards` may hold several rounds, one row each, for the same `uids` or for a row of UIDs per round.
+        """
+        uids_array = np.asarray(uids)
+        rewards = np.asarray(rewards)
 
         # Check if rewards contains NaN values.
         if np.isnan(rewards).any():
@@ -350,15 +448,6 @@ class BaseValidatorNeuron(BaseNeuron):
             # Replace any NaN values in rewards with 0.
             rewards = np.nan_to_num(rewards, nan=0)
 
-        # Ensure rewards is a numpy array.
-        rewards = np.asarray(rewards)
-
-        # Check if `uids` is already a numpy array and copy it to avoid the warning.
-        if isinstance(uids, np.ndarray):
-            uids_array = uids.copy()
-        else:
-            uids_array = np.array(uids)
-
         # Handle edge case: If either rewards or uids_array is empty.
         if rewards.size == 0 or uids_array.size == 0:
             bt.logging.info(f"rewards: {rewards}, uids_array: {uids_array}")
@@ -367,43 +456,30 @@ class BaseValidatorNeuron(BaseNeuron):
             )
             return
 
-        # Check if sizes of rewards and uids_array match.
-        if rewards.size != uids_array.size:
-            raise ValueError(
-                f"Shape mismatch: rewards array of shape {rewards.shape} "
-                f"cannot be broadcast to uids array of shape {uids_array.shape}"
-            )
-
-        # Compute forward pass rewards, assumes uids are mutually exclusive.
-        # shape: [ metagraph.n ]
-        scattered_rewards: np.ndarray = np.zeros_like(self.scores)
-        scattered_rewards[uids_array] = rewards
-        bt.logging.debug(f"Scattered rewards: {rewards}")
-
-        # Update scores with rewards produced by this step.
-        # shape: [ metagraph.n ]
-        alpha: float = self.config.neuron.moving_average_alpha
-        self.scores: np.ndarray = alpha * scattered_rewards + (1 - alpha) * self.scores
-        bt.logging.debug(f"Updated moving avg scores: {self.scores}")
+        self.score_engine.update(uids_array, rewards)
+        self.reward_history.record(
+            np.broadcast_to(uids_array, rewards.shape).ravel(), rewards.ravel()
+        )
+        if debug_enabled():
+            bt.logging.debug(f"Scattered rewards: {rewards}")
+            bt.logging.debug(f"Updated moving avg scores: {self.scores}")
 
     def save_state(self):
-        """Saves the state of the validator to a file."""
-        bt.logging.info("Saving validator state.")
-
-        # Save the state of the validator to file.
-        np.savez(
-            self.config.neuron.full_path + "/state.npz",
-            step=self.step,
-            scores=self.scores,
-            hotkeys=self.hotkeys,
-        )
+        """Saves the state of the validator if the scores changed since the last save."""
+        if self.state_store.save(self.step, self.scores, self.hotkeys):
+            bt.logging.info("Saved validator state.")
 
     def load_state(self):
         """Loads the state of the validator from a file."""
         bt.logging.info("Loading validator state.")
 
-        # Load the state of the validator from file.
-        state = np.load(self.config.neuron.full_path + "/state.npz")
-        self.step = state["step"]
-        self.scores = state["scores"]
-        self.hotkeys = state["hotkeys"]
+        state = self.state_store.load()
+        if state is None:
+            bt.logging.info("No saved validator state, starting fresh.")
+            return
+        self.step = state.step
+        self.scores = state.scores
+        self.hotkeys = state.hotkeys
+        self.hotkey_to_uid = {hotkey: uid for uid, hotkey in enumerate(self.hotkeys)}
+        # Compare the next sync against the saved hotkeys.
+        self.metagraph_tracker.rebase_hotkeys(self.hotkeys)
@@ -0,0 +1,311 @@
+"""
+Async queries of the validator pipeline. The blacklist snapshot queries, which run
+in a background thread, live in `query`.
+
+Each query takes an optional `session=` unit of work (see `session.unit_of_work`);
+without one it runs in a transaction of its own. Queries inside a unit of work only
+flush, and its changes are committed together when it exits.
+"""
+
+import asyncio
+import typing
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from .blobs import (
+    HASHES_PER_STATEMENT,
+    blob_rows,
+    decompress,
+    delete_unreferenced,
+    insert_blobs,
+)
+from .models import BlacklistedMiners, MinerResponse, Request, ResponseBlob
+from .session import async_session, unit_of_work
+
+
+@dataclass(slots=True)
+class ReadyResponse:
+    """The columns of a stored miner response that scoring needs."""
+
+    id: int
+    miner_id: int
+    response_time: float | None
+    has_text: bool
+
+
+@dataclass(slots=True)
+class ReadyRequest:
+    """A ready request with its responses; see `iter_ready_requests`."""
+
+    id: int
+    name: str
+    openai_batch_id: str
+    prompt: str
+    base_response: str
+    created_at: datetime
+    responses: typing.List[ReadyResponse]
+
+
+@async_session
+async def get_ready_requests(
+    session: AsyncSession, hours: int = 24
+) -> typing.List[Request]:
+    """Get requests that are older than the specified number of hours."""
+
+    threshold = datetime.now(timezone.utc) - timedelta(hours=hours)
+    result = await session.scalars(
+        select(Request)
+        .filter(Request.created_at < threshold)
+        .options(selectinload(Request.responses).selectinload(MinerResponse.blob))
+    )
+    return list(result.all())
+
+
+async def iter_ready_requests(
+    hours: int = 24, page_size: int = 100
+) -> typing.AsyncIterator[ReadyRequest]:
+    """
+    Stream the requests older than the specified number of hours, `page_size`
+    requests at a time. Only the columns scoring needs are loaded; the response texts
+    are fetched on demand with `get_response_texts`, so memory stays bounded however
+    many requests are ready.
+    """
+    threshold = datetime.now(timezone.utc) - timedelta(hours=hours)
+    async with unit_of_work() as session:
+        result = await session.stream(
+            select(
+                Request.id,
+                Request.name,
+                Request.openai_batch_id,
+                Request.prompt,
+                Request.base_response,
+                Request.created_at,
+            )
+            .filter(Request.created_at < threshold)
+            .order_by(Request.id)
+            .execution_options(yield_per=page_size)
+        )
+        async for page in result.partitions():
+            responses = defaultdict(list)
+            rows = await session.execute(
+                select(
+                    MinerResponse.request_id,
+                    MinerResponse.id,
+                    MinerResponse.miner_id,
+                    MinerResponse.response_time,
+                    MinerResponse.response_hash.is_not(None).label("has_text"),
+                )
+                .where(MinerResponse.request_id.in_([row.id for row in page]))
+                .order_by(MinerResponse.id)
+            )
+            for row in rows:
+                responses[row.request_id].append(
+                    ReadyResponse(
+                        id=row.id,
+                        miner_id=row.miner_id,
+                        response_time=row.response_time,
+                        has_text=bool(row.has_text),
+                    )
+                )
+            for row in page:
+                yield ReadyRequest(
+                    id=row.id,
+                    name=row.name,
+                    openai_batch_id=row.openai_batch_id,
+                    prompt=row.prompt,
+                    base_response=row.base_response,
+                    created_at=row.created_at,
+                    responses=responses.pop(row.id, []),
+                )
+
+
+@async_session
+async def get_response_texts(
+    session: AsyncSession, response_ids: typing.List[int]
+) -> typing.Dict[int, str]:
+    """
+    Fetch the texts of the given responses by their IDs. Responses without text
+    are left out, and a text shared by several responses is decompressed once.
+    """
+    rows = (
+        await session.execute(
+            select(MinerResponse.id, MinerResponse.response_hash).where(
+                MinerResponse.id.in_(response_ids),
+                MinerResponse.response_hash.is_not(None),
+            )
+        )
+    ).all()
+    blobs = await session.execute(
+        select(ResponseBlob.hash, ResponseBlob.data).where(
+            ResponseBlob.hash.in_({row.response_hash for row in rows})
+        )
+    )
+    texts = {blob.hash: decompress(blob.data) for blob in blobs}
+    return {row.id: texts[row.response_hash] for row in rows}
+
+
+@async_session
+async def count_pending_requests(session: AsyncSession) -> int:
+    """Count requests still waiting for their judge results."""
+    return await session.scalar(select(func.count()).select_from(Request))
+
+
+@async_session
+async def get_blacklisted_miners_hotkeys(session: AsyncSession):
+    """
+    Fetch all blacklisted miners from the database.
+    """
+    result = await session.execute(
+        select(BlacklistedMiners.hotkey).where(BlacklistedMiners.blacklist_count > 1)
+    )
+    return result.all()
+
+
+@async_session
+async def add_or_update_blacklisted_miner(
+    session: AsyncSession, miner_id: int, hotkey: str, coldkey: str, reason: str
+):
+    """
+    Add or update a blacklisted miner in the database.
+    If the hotkey already exists, it will be updated with the new miner_id.
+    """
+    now = datetime.utcnow().isoformat()
+
+    ups_stmt = insert(BlacklistedMiners).values(
+        miner_id=miner_id,
+        hotkey=hotkey,
+        updated_at=now,
+        coldkey=coldkey,
+        reason=reason,
+    )
+    # A row created by the pool snapshot (miner_id -1) becomes this validator's own.
+    snapshot_only = BlacklistedMiners.miner_id == -1
+    query = ups_stmt.on_conflict_do_update(
+        index_elements=["hotkey"],
+        set_={
+            "miner_id": ups_stmt.excluded.miner_id,
+            "updated_at": now,
+            "coldkey": ups_stmt.excluded.coldkey,
+            "reason": case(
+                (snapshot_only, ups_stmt.excluded.reason),
+                else_=BlacklistedMiners.reason,
+            ),
+            "blacklist_count": case(
+                (snapshot_only, 1), else_=BlacklistedMiners.blacklist_count + 1
+            ),
+        },
+    )
+    await session.execute(query)
+
+
+@async_session
+async def add_request(
+    session: AsyncSession,
+    name: str,
+    openai_batch_id: str,
+    prompt: str,
+    base_response: str,
+) -> Request:
+    """Add a new request to the database."""
+    new_request = Request(
+        name=name,
+        openai_batch_id=openai_batch_id,
+        prompt=prompt,
+        base_response=base_response,
+    )
+    session.add(new_request)
+    await session.flush()
+    await session.refresh(new_request)
+    return new_request
+
+
+@async_session
+async def add_bulk_responses(
+    session: AsyncSession,
+    responses: typing.List[MinerResponse],
+    texts: typing.List[str | None] | None = None,
+) -> None:
+    """Add multiple responses to a request, with the text of each, if given."""
+    if texts is not None:
+        hashes, blobs = blob_rows(texts)
+        if blobs:
+            await session.execute(insert_blobs(), blobs)
+        for response, response_hash in zip(responses, hashes, strict=True):
+            response.response_hash = response_hash
+    await session.run_sync(lambda session: session.bulk_save_objects(responses))
+
+
+@async_session
+async def add_round(
+    session: AsyncSession,
+    requests: typing.List[dict],
+    responses: typing.List[dict],
+) -> typing.List[int]:
+    """
+    Add the requests of a round and all their responses with one INSERT each.
+    Every response row names the index of its request in `requests` as `request`,
+    and its text as `response_text`; each distinct text is stored once.
+    Returns the IDs of the requests, in order.
+    """
+    if not requests:
+        return []
+    # Core statements on the session connection skip the ORM bulk machinery.
+    connection = await session.connection()
+    result = await connection.execute(
+        insert(Request.__table__).returning(
+            Request.__table__.c.id, sort_by_parameter_order=True
+        ),
+        requests,
+    )
+    request_ids = list(result.scalars().all())
+    if responses:
+        # zlib releases the GIL, so compressing in a thread keeps the loop free.
+        hashes, blobs = await asyncio.to_thread(
+            blob_rows, [response.get("response_text") for response in responses]
+        )
+        if blobs:
+            await connection.execute(insert_blobs(), blobs)
+        await connection.execute(
+            insert(MinerResponse.__table__),
+            [
+                {
+                    **{
+                        k: v
+                        for k, v in response.items()
+                        if k not in ("request", "response_text")
+                    },
+                    "request_id": request_ids[response["request"]],
+                    "response_hash": response_hash,
+                }
+                for response, response_hash in zip(responses, hashes, strict=True)
+            ],
+        )
+    return request_ids
+
+
+@async_session
+async def delete_requests(session: AsyncSession, request_ids: typing.List[int]) -> None:
+    """Delete requests and their responses by their IDs, and texts no longer used."""
+    result = await session.scalars(
+        select(MinerResponse.response_hash)
+        .where(
+            MinerResponse.request_id.in_(request_ids),
+            MinerResponse.response_hash.is_not(None),
+        )
+        .distinct()
+    )
+    hashes = result.all()
+    await session.execute(
+        delete(MinerResponse).where(MinerResponse.request_id.in_(request_ids))
+    )
+    await session.execute(delete(Request).where(Request.id.in_(request_ids)))
+    for start in range(0, len(hashes), HASHES_PER_STATEMENT):
+        await session.execute(
+            delete_unreferenced(hashes[start : start + HASHES_PER_STATEMENT])
+        )
@@ -0,0 +1,74 @@
+"""
+Content-addressed storage of the miner response texts.
+
+Miners often return the same text for a prompt, so a response only holds the SHA-256
+of its text in `response_hash`, and each distinct text is stored once, compressed
+with zlib, in `response_blobs`. Empty texts are not stored; their hash is NULL.
+Blobs that no response references any more are deleted with the responses.
+"""
+
+import hashlib
+import typing
+import zlib
+
+from sqlalchemy import Delete, Insert, delete, exists, select
+from sqlalchemy.dialects.sqlite import insert
+
+from .models import MinerResponse, ResponseBlob
+
+COMPRESSION_LEVEL = 6
+# Stays well below SQLite's limit of 32766 bound parameters per statement.
+HASHES_PER_STATEMENT = 10_000
+
+
+def decompress(data: bytes) -> str:
+    return zlib.decompress(data).decode()
+
+
+def blob_rows(
+    texts: typing.Iterable[str | None],
+) -> typing.Tuple[typing.List[bytes | None], typing.List[dict]]:
+    """
+    Hashes the texts. Returns the hash of each text (None for empty ones) and one
+    `response_blobs` row per distinct text, so each is only compressed once.
+    """
+    hashes = []
+    rows = {}
+    for text in texts:
+        if not text:
+            hashes.append(None)
+            continue
+        data = text.encode()
+        digest = hashlib.sha256(data).digest()
+        hashes.append(digest)
+        if digest not in rows:
+            rows[digest] = {
+                "hash": digest,
+                "data": zlib.compress(data, COMPRESSION_LEVEL),
+                "size": len(data),
+            }
+    return hashes, list(rows.values())
+
+
+def insert_blobs() -> Insert:
+    """INSERT of `blob_rows` rows that skips the texts already stored."""
+    return insert(ResponseBlob.__table__).on_conflict_do_nothing(
+        index_elements=["hash"]
+    )
+
+
+def unreferenced_blobs(hashes: typing.Iterable[bytes] | None = None):
+    """SELECT of the hashes of the blobs (among `hashes`) no response references."""
+    query = select(ResponseBlob.hash).where(
+        ~exists().where(MinerResponse.response_hash == ResponseBlob.hash)
+    )
+    if hashes is not None:
+        query = query.where(ResponseBlob.hash.in_(hashes))
+    return query
+
+
+def delete_unreferenced(hashes: typing.Iterable[bytes]) -> Delete:
+    """DELETE of the blobs among `hashes` that no response references any more."""
+    return delete(ResponseBlob).where(
+        ResponseBlob.hash.in_(unreferenced_blobs(hashes).scalar_subquery())
+    )
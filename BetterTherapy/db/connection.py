@@ -1,13 +1,53 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from .models import Base
 
 DATABASE_URL = "sqlite:///bettertherapy.db"
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///bettertherapy.db"
 
-engine = create_engine(DATABASE_URL, echo=False, future=True)
+# Applied to every new SQLite connection. `auto_vacuum` only takes effect in new
+# databases (see `RetentionJob.enable_incremental_vacuum`) and lets the retention job
+# give freed pages back to the file system. WAL lets the judge readers run while the
+# forward loop writes, and with it `synchronous=NORMAL` only risks the last
+# transactions on power loss, never corruption. `cache_size` is in KiB when negative.
+SQLITE_PRAGMAS = {
+    "auto_vacuum": "INCREMENTAL",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+
+def configure_sqlite(engine: Engine) -> Engine:
+    """Sets `SQLITE_PRAGMAS` on every connection the engine opens."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+engine = configure_sqlite(create_engine(DATABASE_URL, echo=False, future=True))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Used from the event loop: the driver runs SQLite in a worker thread. Objects stay
+# readable after their unit of work commits.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+configure_sqlite(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def init_db():
     Base.metadata.create_all(bind=engine)
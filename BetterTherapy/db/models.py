@@ -1,4 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTime, func
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    String,
+    Float,
+    ForeignKey,
+    Text,
+    DateTime,
+    Index,
+    LargeBinary,
+    false,
+    func,
+)
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.ext.declarative import declared_attr
 
@@ -20,6 +33,8 @@ class TimestampMixin(object):
 
 class Request(Base, TimestampMixin):
     __tablename__ = "requests"
+    # get_ready_requests filters on the request age.
+    __table_args__ = (Index("ix_requests_created_at", "created_at"),)
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False, unique=True)
     openai_batch_id = Column(String(255), nullable=False, unique=False)
@@ -39,17 +54,48 @@ class BlacklistedMiners(Base):
     coldkey = Column(String, nullable=False)
     blacklist_count = Column(Integer, default=1)
     reason = Column(String, nullable=False)
+    # Whether the hotkey is in the last persisted pool API blacklist snapshot.
+    in_pool_snapshot = Column(
+        Boolean, nullable=False, default=False, server_default=false()
+    )
     created_at = Column(String)
     updated_at = Column(String)
 
 
+class ResponseBlob(Base):
+    """A response text, compressed and stored once however many miners returned it."""
+
+    __tablename__ = "response_blobs"
+    hash = Column(LargeBinary(32), primary_key=True)  # SHA-256 of the text.
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed UTF-8 text.
+    size = Column(Integer, nullable=False)  # Length of the text in bytes.
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    @property
+    def text(self) -> str:
+        # blobs imports the models, so it can only be imported once they exist.
+        from .blobs import decompress
+
+        return decompress(self.data)
+
+
 class MinerResponse(Base, TimestampMixin):
     __tablename__ = "miner_responses"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    request_id = Column(Integer, ForeignKey("requests.id"), nullable=False)
+    request_id = Column(Integer, ForeignKey("requests.id"), nullable=False, index=True)
     miner_id = Column(Integer, nullable=False)
-    response_text = Column(Text, nullable=True)
+    # NULL when the miner returned no text; see `blobs.blob_rows`.
+    response_hash = Column(
+        LargeBinary(32), ForeignKey("response_blobs.hash"), nullable=True, index=True
+    )
+    blob = relationship("ResponseBlob")
     response_time = Column(Float, nullable=True)
     time_score = Column(Float, nullable=True)
     quality_score = Column(Float, nullable=True)
     total_score = Column(Float, nullable=True)
+
+    @property
+    def response_text(self) -> str | None:
+        return None if self.blob is None else self.blob.text
@@ -1,96 +1,63 @@
-from sqlalchemy.dialects.sqlite import insert
-from .session import session
-from .models import BlacklistedMiners, Request, MinerResponse
-from datetime import datetime, timedelta, timezone
-import typing
-from sqlalchemy.orm import Session, selectinload
+"""
+Synchronous queries, for the background threads that run without an event loop.
+The validator pipeline uses the async queries in `async_query`.
+"""
 
+import typing
+from datetime import datetime
 
-# get request with greater than or equal to 24 hours old
-@session
-def get_ready_requests(session: Session, hours: int = 24) -> typing.List[Request]:
-    """Get requests that are older than the specified number of hours."""
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
 
-    threshold = datetime.now(timezone.utc) - timedelta(hours=hours)
-    # attach responses to the requests
-    return (
-        session.query(Request)
-        .filter(Request.created_at < threshold)
-        .options(selectinload(Request.responses))
-        .all()
-    )
+from .models import BlacklistedMiners
+from .session import session
 
 
 @session
-def get_blacklisted_miners_hotkeys(session: Session):
-    """
-    Fetch all blacklisted miners from the database.
-    """
-    return (
+def get_blacklist_snapshot(session: Session) -> typing.List[str]:
+    """Fetch the hotkeys of the last persisted blacklist snapshot."""
+    rows = (
         session.query(BlacklistedMiners.hotkey)
-        .where(BlacklistedMiners.blacklist_count > 1)
+        .where(BlacklistedMiners.in_pool_snapshot)
         .all()
     )
+    return [row.hotkey for row in rows]
 
 
 @session
-def add_or_update_blacklisted_miner(
-    session: Session, miner_id: int, hotkey: str, coldkey: str, reason: str
-):
+def replace_blacklist_snapshot(
+    session: Session, hotkeys: typing.Iterable[str], reason: str
+) -> None:
     """
-    Add or update a blacklisted miner in the database.
-    If the hotkey already exists, it will be updated with the new miner_id.
+    Replace the persisted blacklist snapshot with `hotkeys`.
+    Snapshot membership is the `in_pool_snapshot` flag, so hotkeys this validator
+    blacklisted itself keep their row and are flagged too. Hotkeys without a row get
+    one with `reason` and miner_id -1, deleted once they leave the snapshot.
     """
     now = datetime.utcnow().isoformat()
-
-    ups_stmt = insert(BlacklistedMiners).values(
-        miner_id=miner_id,
-        hotkey=hotkey,
-        updated_at=now,
-        coldkey=coldkey,
-        reason=reason,
-    )
-    query = ups_stmt.on_conflict_do_update(
-        index_elements=["hotkey"],
-        set_=dict(
-            miner_id=ups_stmt.excluded.miner_id,
-            updated_at=now,
-            coldkey=ups_stmt.excluded.coldkey,
-            blacklist_count=BlacklistedMiners.blacklist_count + 1,
-        ),
-    )
-    session.execute(query)
-    session.commit()
-
-
-@session
-def add_request(
-    session: Session, name: str, openai_batch_id: str, prompt: str, base_response: str
-) -> Request:
-    """Add a new request to the database."""
-    new_request = Request(
-        name=name,
-        openai_batch_id=openai_batch_id,
-        prompt=prompt,
-        base_response=base_response,
-    )
-    session.add(new_request)
-    session.commit()
-    session.refresh(new_request)
-    return new_request
-
-
-@session
-def add_bulk_responses(session: Session, responses: typing.List[MinerResponse]) -> None:
-    """Add multiple responses to a request."""
-    session.bulk_save_objects(responses)
-    session.commit()
-
-
-@session
-def delete_requests(session: Session, request_ids: typing.List[int]) -> None:
-    """Delete requests by their IDs."""
-    session.query(Request).filter(Request.id.in_(request_ids)).delete(
+    session.query(BlacklistedMiners).filter(BlacklistedMiners.reason == reason).delete(
         synchronize_session=False
     )
+    session.query(BlacklistedMiners).filter(BlacklistedMiners.in_pool_snapshot).update(
+        {BlacklistedMiners.in_pool_snapshot: False}, synchronize_session=False
+    )
+    rows = [
+        {
+            "miner_id": -1,
+            "hotkey": hotkey,
+            "coldkey": "",
+            "reason": reason,
+            "in_pool_snapshot": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for hotkey in hotkeys
+    ]
+    if rows:
+        session.execute(
+            insert(BlacklistedMiners).on_conflict_do_update(
+                index_elements=["hotkey"], set_={"in_pool_snapshot": True}
+            ),
+            rows,
+        )
     session.commit()
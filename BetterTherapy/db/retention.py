@@ -0,0 +1,249 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import bittensor as bt
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Connection, Engine
+
+from .blobs import unreferenced_blobs
+from .models import MinerResponse, Request, ResponseBlob
+
+
+@dataclass
+class RetentionReport:
+    """Outcome of one retention run."""
+
+    deleted_requests: int
+    deleted_responses: int
+    deleted_blobs: int
+    seconds: float
+    db_bytes: int  # Database and WAL files after the run.
+    free_bytes: int  # Pages still on the free list after the incremental vacuum.
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.deleted_requests + self.deleted_responses + self.deleted_blobs
+        return rows / self.seconds if self.seconds > 0 else 0.0
+
+
+class RetentionJob:
+    """
+    Keeps the validator database at a bounded size.
+
+    Every `interval` seconds, requests older than `max_age_hours` are deleted, then
+    the oldest requests until at most `max_requests` requests and `max_responses`
+    responses remain, then responses whose request is gone (left behind before
+    foreign keys were enforced), and finally the response texts no response uses.
+    Rows are deleted `batch_size` requests at a time, responses first, each batch in
+    its own short transaction so the forward loop is never locked out for long. The
+    freed pages are returned to the file system by an incremental vacuum of at most
+    `vacuum_pages` pages and a WAL checkpoint. A cap of 0 disables it. The vacuum
+    only frees pages once `enable_incremental_vacuum` has converted the database.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_age_hours: float = 72,
+        max_requests: int = 10_000,
+        max_responses: int = 1_000_000,
+        batch_size: int = 1000,
+        vacuum_pages: int = 10_000,
+        interval: float = 3600,
+    ):
+        self.engine = engine
+        self.max_age_hours = max_age_hours
+        self.max_requests = max_requests
+        self.max_responses = max_responses
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self.interval = interval
+        self.last_report: RetentionReport | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def enable_incremental_vacuum(self) -> None:
+        """
+        Switches a database created without `auto_vacuum=INCREMENTAL` over to it.
+        This rewrites the whole file once, holding the write lock throughout, so it
+        has to run before anything else writes to the database; later runs only
+        vacuum freed pages.
+        """
+        with self.engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+                return
+            bt.logging.info("Enabling incremental vacuum, rewriting the database")
+            connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.exec_driver_sql("VACUUM")
+
+    def _delete(
+        self, connection: Connection, request_ids: list[int]
+    ) -> tuple[int, int]:
+        responses = connection.execute(
+            delete(MinerResponse).where(MinerResponse.request_id.in_(request_ids))
+        ).rowcount
+        requests = connection.execute(
+            delete(Request).where(Request.id.in_(request_ids))
+        ).rowcount
+        return requests, responses
+
+    def _expired(self, connection: Connection) -> list[int]:
+        threshold = datetime.now(timezone.utc) - timedelta(hours=self.max_age_hours)
+        return list(
+            connection.scalars(
+                select(Request.id)
+                .where(Request.created_at < threshold)
+                .order_by(Request.id)
+                .limit(self.batch_size)
+            )
+        )
+
+    def _over_request_cap(self, connection: Connection) -> list[int]:
+        excess = connection.scalar(select(func.count(Request.id))) - self.max_requests
+        return list(
+            connection.scalars(
+                select(Request.id)
+                .order_by(Request.id)
+                .limit(min(max(excess, 0), self.batch_size))
+            )
+        )
+
+    def _over_response_cap(self, connection: Connection) -> list[int]:
+        excess = (
+            connection.scalar(select(func.count(MinerResponse.id))) - self.max_responses
+        )
+        request_ids = []
+        if excess <= 0:
+            return request_ids
+        oldest = connection.execute(
+            select(Request.id, func.count(MinerResponse.id))
+            .outerjoin(MinerResponse, MinerResponse.request_id == Request.id)
+            .group_by(Request.id)
+            .order_by(Request.id)
+            .limit(self.batch_size)
+        )
+        for request_id, responses in oldest:
+            if excess <= 0:
+                break
+            request_ids.append(request_id)
+            excess -= responses
+        return request_ids
+
+    def _orphans(self, connection: Connection) -> int:
+        orphans = (
+            select(MinerResponse.id)
+            .outerjoin(Request, MinerResponse.request_id == Request.id)
+            .where(Request.id.is_(None))
+            .limit(self.batch_size * 100)
+            .scalar_subquery()
+        )
+        return connection.execute(
+            delete(MinerResponse).where(MinerResponse.id.in_(orphans))
+        ).rowcount
+
+    def _orphan_blobs(self, connection: Connection) -> int:
+        orphans = unreferenced_blobs().limit(self.batch_size * 100).scalar_subquery()
+        return connection.execute(
+            delete(ResponseBlob).where(ResponseBlob.hash.in_(orphans))
+        ).rowcount
+
+    def _size(self, connection: Connection) -> tuple[int, int]:
+        page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+        free_pages = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        db_bytes = 0
+        path = self.engine.url.database
+        for suffix in ("", "-wal"):
+            if path and os.path.exists(path + suffix):
+                db_bytes += os.path.getsize(path + suffix)
+        return db_bytes, free_pages * page_size
+
+    def run(self) -> RetentionReport:
+        """Enforces the caps, vacuums and reports the database size."""
+        start = time.perf_counter()
+        deleted_requests = deleted_responses = 0
+        selectors = []
+        if self.max_age_hours > 0:
+            selectors.append(self._expired)
+        if self.max_requests > 0:
+            selectors.append(self._over_request_cap)
+        if self.max_responses > 0:
+            selectors.append(self._over_response_cap)
+        for selector in selectors:
+            while True:
+                with self.engine.begin() as connection:
+                    request_ids = selector(connection)
+                    if not request_ids:
+                        break
+                    requests, responses = self._delete(connection, request_ids)
+                deleted_requests += requests
+                deleted_responses += responses
+        while True:
+            with self.engine.begin() as connection:
+                orphans = self._orphans(connection)
+            deleted_responses += orphans
+            if not orphans:
+                break
+        deleted_blobs = 0
+        while True:
+            with self.engine.begin() as connection:
+                orphans = self._orphan_blobs(connection)
+            deleted_blobs += orphans
+            if not orphans:
+                break
+
+        with self.engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            if self.vacuum_pages > 0:
+                # Each step of the statement frees one page, so the cursor has to be
+                # drained; SQLAlchemy closes row-less results after the first step.
+                cursor = connection.connection.dbapi_connection.cursor()
+                cursor.execute(f"PRAGMA incremental_vacuum({self.vacuum_pages})")
+                cursor.fetchall()
+                cursor.close()
+            connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").all()
+            db_bytes, free_bytes = self._size(connection)
+
+        report = RetentionReport(
+            deleted_requests=deleted_requests,
+            deleted_responses=deleted_responses,
+            deleted_blobs=deleted_blobs,
+            seconds=time.perf_counter() - start,
+            db_bytes=db_bytes,
+            free_bytes=free_bytes,
+        )
+        self.last_report = report
+        bt.logging.info(
+            f"Retention deleted {report.deleted_requests} requests, "
+            f"{report.deleted_responses} responses and {report.deleted_blobs} "
+            f"response texts in {report.seconds:.2f}s "
+            f"({report.rows_per_second:.0f} rows/s), database is "
+            f"{report.db_bytes / 2**20:.1f} MiB with "
+            f"{report.free_bytes / 2**20:.1f} MiB free"
+        )
+        return report
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run()
+            except Exception as e:
+                bt.logging.error(f"Error running database retention: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
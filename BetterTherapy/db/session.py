@@ -1,5 +1,9 @@
+from contextlib import asynccontextmanager
 from functools import wraps
-from .connection import SessionLocal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .connection import AsyncSessionLocal, SessionLocal
 
 
 def session(func):
@@ -9,3 +13,29 @@ def session(func):
             return func(session, *args, **kwargs)
 
     return session_wrapper
+
+
+@asynccontextmanager
+async def unit_of_work():
+    """
+    Async session whose changes are committed together when the block exits, or
+    rolled back if it raises. Pass it to the async queries as `session=`.
+    """
+    async with AsyncSessionLocal() as session, session.begin():
+        yield session
+
+
+def async_session(func):
+    """
+    Runs the async query in the given `session=` unit of work, or in a transaction
+    of its own committed when the query returns.
+    """
+
+    @wraps(func)
+    async def session_wrapper(*args, session: AsyncSession | None = None, **kwargs):
+        if session is not None:
+            return await func(session, *args, **kwargs)
+        async with unit_of_work() as session:
+            return await func(session, *args, **kwargs)
+
+    return session_wrapper
@@ -1,19 +1,133 @@
-import requests
+import asyncio
+import time
+
+import aiohttp
 import bittensor as bt
 
+# HTTP statuses worth retrying: the request may succeed once the backend recovers.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PoolApiClient:
+    """
+    Async client of the pool mining backend.
+
+    Requests share one pooled `aiohttp` session per event loop, have a total
+    `timeout` and are retried `retries` times with exponential backoff on
+    connection errors, timeouts and 429/5xx answers. The pool metagraph is cached
+    for `miners_ttl` seconds, and the last good one is served when the backend
+    cannot be reached. The blacklist is fetched conditionally on its ETag; it is
+    cached by `BlacklistService`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 10,
+        retries: int = 2,
+        backoff: float = 0.5,
+        miners_ttl: float = 300,
+        max_connections: int = 8,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.miners_ttl = miners_ttl
+        self.max_connections = max_connections
+        self._sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._pool_miners: list[dict] = []
+        self._pool_miner_uids: frozenset[int] = frozenset()
+        self._pool_miners_at = 0.0
+
+    def _session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            # Sessions of closed loops can no longer be used or closed; drop them.
+            for closed in [other for other in self._sessions if other.is_closed()]:
+                del self._sessions[closed]
+            session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def close(self) -> None:
+        """Closes the session of the running event loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def request(
+        self, method: str, path: str, headers: dict | None = None, **kwargs
+    ) -> tuple[int, dict | None, str | None]:
+        """
+        Sends a request with retries. Returns the status, the decoded JSON body
+        (None for 304) and the ETag of the response.
+        """
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._session().request(
+                    method, url, headers=headers, **kwargs
+                ) as response:
+                    if response.status == 304:
+                        return 304, None, response.headers.get("ETag")
+                    if response.status in RETRY_STATUSES and attempt < self.retries:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=response.status,
+                        )
+                    response.raise_for_status()
+                    body = await response.json(content_type=None)
+                    return response.status, body, response.headers.get("ETag")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or (
+                    e.status in RETRY_STATUSES
+                )
+                if not retryable or attempt == self.retries:
+                    raise
+                bt.logging.debug(f"Retrying {method} {path} after error: {e}")
+                await asyncio.sleep(self.backoff * 2**attempt)
 
-def fetch_pool_miners():
-    url = "https://api.taopoolmining.com/api/v1/pool/get/pool-metagraph"
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            response_json = response.json()
-            return response_json.get("data", [])
-        else:
-            bt.logging.error(
-                f"Error fetching pool minerss: {response.status_code} {response.text}"
+    async def fetch_pool_miners(self) -> list[dict]:
+        _, body, _ = await self.request("GET", "/pool/get/pool-metagraph")
+        return (body or {}).get("data", [])
+
+    async def get_pool_miners(self, force: bool = False) -> list[dict]:
+        """Returns the pool metagraph, fetching it if the cached one expired."""
+        if force or time.monotonic() - self._pool_miners_at >= self.miners_ttl:
+            try:
+                miners = await self.fetch_pool_miners()
+            except Exception as e:
+                bt.logging.error(f"Error while fetching pool miners: {e}")
+                return self._pool_miners
+            self._pool_miners = miners
+            self._pool_miner_uids = frozenset(
+                int(miner["uid"]) for miner in miners if "uid" in miner
             )
-            return []
-    except Exception as e:
-        bt.logging.error(f"Error while fetching pool miners: {e}")
-        return []
+            self._pool_miners_at = time.monotonic()
+        return self._pool_miners
+
+    async def pool_miner_uids(self, force: bool = False) -> frozenset[int]:
+        """UIDs of the pool miners, as a set for O(1) membership tests."""
+        await self.get_pool_miners(force=force)
+        return self._pool_miner_uids
+
+    async def fetch_blacklist(
+        self, etag: str | None = None
+    ) -> tuple[list | None, str | None]:
+        """
+        Fetches the blacklist, conditionally on `etag` if given. Returns the items,
+        or None if the blacklist is unchanged, and the ETag of the response.
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        status, body, etag = await self.request(
+            "GET", "/pool/get/blacklist", headers=headers
+        )
+        if status == 304:
+            return None, etag
+        return (body or {}).get("data", []), etag
@@ -1,9 +1,17 @@
+import asyncio
 import uuid
 import bittensor as bt
 import requests
 import hashlib
+import threading
 import time
 
+from BetterTherapy.db.query import get_blacklist_snapshot, replace_blacklist_snapshot
+from BetterTherapy.utils.api import PoolApiClient
+
+# Reason of the BlacklistedMiners rows only the pool API blacklist snapshot holds.
+SNAPSHOT_REASON = "pool_api_snapshot"
+
 
 def compute_body_hash(instance_fields: dict):
     hashes = []
@@ -26,6 +34,7 @@ def blacklist_hotkey(
     blacklisted_coldkey: str,
     uid: int,
     base_url: str,
+    timeout: float = 10,
 ):
     try:
         nonce = time.time_ns()
@@ -52,18 +61,133 @@ def blacklist_hotkey(
                 "blackListedColdkey": blacklisted_coldkey,
                 "blackListedUid": uid,
             },
+            timeout=timeout,
         )
     except Exception as e:
         bt.logging.error(f"Error blacklisting {str(e)}")
 
 
-def get_blacklisted_hotkeys(base_url: str):
+def parse_blacklisted_hotkey(item) -> str | None:
+    """Extracts the hotkey from a blacklist API item (a hotkey, a dict or a row)."""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        return item.get("hotkey") or item.get("blackListedHotkey")
     try:
-        response = requests.get(
-            f"{base_url}/pool/get/blacklist",
+        return item[0]
+    except (TypeError, IndexError, KeyError):
+        return None
+
+
+class BlacklistService:
+    """
+    In-memory view of the pool blacklist, refreshed in a background thread.
+
+    `hotkeys` never touches the network: it returns the last good blacklist. Every
+    `ttl` seconds the pool API is polled through `client` with a conditional request
+    (ETag), and each changed blacklist is persisted as a snapshot to the
+    BlacklistedMiners table. On startup, and whenever the API fails before any
+    blacklist was fetched, the last snapshot is loaded from the database instead of
+    falling back to an empty list.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        ttl: float = 300,
+        timeout: float = 10,
+        client: PoolApiClient | None = None,
+    ):
+        self.base_url = base_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.client = client or PoolApiClient(base_url, timeout=timeout)
+        self.etag: str | None = None
+        self.source = "empty"
+        self.version = 0
+        self.last_refresh = 0.0
+        self._hotkeys: frozenset[str] = frozenset()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def hotkeys(self) -> frozenset[str]:
+        return self._hotkeys
+
+    def _set(self, hotkeys: frozenset[str], source: str) -> None:
+        with self._lock:
+            if hotkeys != self._hotkeys:
+                self.version += 1
+            self._hotkeys = hotkeys
+            self.source = source
+
+    def load_snapshot(self) -> bool:
+        """Loads the last persisted blacklist snapshot from the database."""
+        try:
+            hotkeys = get_blacklist_snapshot()
+        except Exception as e:
+            bt.logging.error(f"Error loading blacklist snapshot: {e}")
+            return False
+        self._set(frozenset(hotkeys), "db")
+        bt.logging.info(f"Loaded {len(hotkeys)} blacklisted hotkeys from snapshot")
+        return True
+
+    def refresh(self) -> bool:
+        """
+        Fetches the blacklist from the pool API, unless it has not changed since the
+        last fetch. Returns False if the API could not be reached.
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        try:
+            items, etag = self._loop.run_until_complete(
+                self.client.fetch_blacklist(self.etag)
+            )
+        except Exception as e:
+            bt.logging.error(f"Error refreshing blacklist: {e}")
+            if self.source == "empty":
+                self.load_snapshot()
+            return False
+        self.last_refresh = time.time()
+        if items is None:
+            return True
+
+        hotkeys = frozenset(
+            hotkey for hotkey in map(parse_blacklisted_hotkey, items) if hotkey
         )
-        response_json = response.json()
-        return response_json.get("data", [])
-    except Exception as e:
-        bt.logging.error(f"Error getting blacklisted hotkeys {str(e)}")
-        return []
+        changed = hotkeys != self._hotkeys or self.source != "api"
+        self._set(hotkeys, "api")
+        self.etag = etag
+        if changed:
+            try:
+                replace_blacklist_snapshot(hotkeys, reason=SNAPSHOT_REASON)
+            except Exception as e:
+                bt.logging.error(f"Error saving blacklist snapshot: {e}")
+        return True
+
+    def _run(self) -> None:
+        while True:
+            self.refresh()
+            if self._stop.wait(self.ttl):
+                return
+
+    def start(self) -> None:
+        """Loads the snapshot and starts refreshing in the background."""
+        if self._thread is not None:
+            return
+        self.load_snapshot()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._loop is not None:
+            self._loop.run_until_complete(self.client.close())
+            self._loop.close()
+            self._loop = None
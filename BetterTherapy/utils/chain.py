@@ -0,0 +1,63 @@
+import bittensor as bt
+
+
+class ChainStateCache:
+    """
+    Serves subnet hyperparameters and validator weights from memory.
+
+    Values are fetched from the chain on first use and refetched once
+    `refresh_blocks` blocks have passed since they were fetched, or after
+    `invalidate` (e.g. on a metagraph change). If a refetch fails the last value
+    is served.
+    """
+
+    def __init__(
+        self, subtensor: "bt.subtensor", netuid: int, refresh_blocks: int = 100
+    ):
+        self.subtensor = subtensor
+        self.netuid = netuid
+        self.refresh_blocks = refresh_blocks
+        # name -> (block fetched at, value)
+        self._values: dict[object, tuple[int, object]] = {}
+
+    def invalidate(self) -> None:
+        self._values.clear()
+
+    def _get(self, key, block: int, fetch):
+        cached = self._values.get(key)
+        if cached is not None and block - cached[0] < self.refresh_blocks:
+            return cached[1]
+        try:
+            value = fetch()
+        except Exception as e:
+            if cached is None:
+                raise
+            bt.logging.warning(f"Error refreshing {key}, serving cached value: {e}")
+            return cached[1]
+        self._values[key] = (block, value)
+        return value
+
+    def min_allowed_weights(self, block: int) -> int:
+        return self._get(
+            "min_allowed_weights",
+            block,
+            lambda: self.subtensor.min_allowed_weights(netuid=self.netuid),
+        )
+
+    def max_weight_limit(self, block: int) -> float:
+        return self._get(
+            "max_weight_limit",
+            block,
+            lambda: self.subtensor.max_weight_limit(netuid=self.netuid),
+        )
+
+    def validator_weights(self, uid: int, block: int) -> list[tuple[int, int]]:
+        """The `(uid, weight)` pairs set by `uid`, read from its own storage entry."""
+
+        def fetch():
+            weights = self.subtensor.query_subtensor(
+                "Weights", params=[self.netuid, uid]
+            )
+            return [tuple(pair) for pair in (getattr(weights, "value", weights) or [])]
+
+        return self._get(("weights", uid), block, fetch)
@@ -92,6 +92,13 @@ def add_args(cls, parser):
         default=100,
     )
 
+    parser.add_argument(
+        "--neuron.metagraph_snapshot_off",
+        action="store_true",
+        help="If set, the metagraph is always fetched from the chain on startup instead of loaded from the snapshot.",
+        default=False,
+    )
+
     parser.add_argument(
         "--mock",
         action="store_true",
@@ -232,6 +239,20 @@ def add_validator_args(cls, parser):
         default=50,
     )
 
+    parser.add_argument(
+        "--neuron.chain_state_refresh_blocks",
+        type=int,
+        help="Blocks after which cached subnet hyperparameters and weights are refetched.",
+        default=100,
+    )
+
+    parser.add_argument(
+        "--neuron.coverage_rounds",
+        type=int,
+        help="Every eligible miner is queried at least once within this many steps.",
+        default=8,
+    )
+
     parser.add_argument(
         "--neuron.disable_set_weights",
         action="store_true",
@@ -239,6 +260,41 @@ def add_validator_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--neuron.weights_worker_off",
+        action="store_true",
+        help="Set weights inline in the main loop instead of in a background worker.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.set_weights_retries",
+        type=int,
+        help="Number of retries of a failed weight submission within the epoch.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--neuron.set_weights_backoff",
+        type=float,
+        help="Seconds before the first retry of a failed weight submission, doubled on each retry.",
+        default=12,
+    )
+
+    parser.add_argument(
+        "--neuron.state_checkpoint_every",
+        type=int,
+        help="Number of score journal records after which a full state checkpoint is written.",
+        default=100,
+    )
+
+    parser.add_argument(
+        "--neuron.reward_window",
+        type=int,
+        help="Number of recent rewards kept per miner for windowed statistics.",
+        default=64,
+    )
+
     parser.add_argument(
         "--neuron.moving_average_alpha",
         type=float,
@@ -296,6 +352,113 @@ def add_validator_args(cls, parser):
         help="Validator UID to copy weights from.",
         default=0,
     )
+    parser.add_argument(
+        "--judge_cache.off",
+        action="store_true",
+        help="Disable the judge cache that scores identical miner responses once.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--judge_cache.max_entries",
+        type=int,
+        help="Maximum number of judge scores to keep in the judge cache.",
+        default=50000,
+    )
+
+    parser.add_argument(
+        "--judge_cache.ttl_hours",
+        type=int,
+        help="How long a cached judge score stays valid, in hours.",
+        default=72,
+    )
+
+    parser.add_argument(
+        "--near_duplicate.off",
+        action="store_true",
+        help="Disable near-duplicate clustering of miner responses before judging.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--near_duplicate.threshold",
+        type=float,
+        help="Estimated Jaccard similarity above which two responses are near-duplicates.",
+        default=0.8,
+    )
+
+    parser.add_argument(
+        "--near_duplicate.policy",
+        type=str,
+        choices=["share", "zero"],
+        help="Score near-duplicates with their representative's score (share) or with 0 (zero).",
+        default="share",
+    )
+
+    parser.add_argument(
+        "--triage.off",
+        action="store_true",
+        help="Disable local scoring of empty, too short and too long responses.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--triage.embedding_model",
+        type=str,
+        help="Optional HuggingFace encoder used to score responses unrelated to the base response as 0.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--triage.min_similarity",
+        type=float,
+        help="Minimum cosine similarity to the base response when --triage.embedding_model is set.",
+        default=0.1,
+    )
+
+    parser.add_argument(
+        "--judge.backend",
+        type=str,
+        choices=["openai", "local"],
+        help="Judge backend: the OpenAI batch API, or the local model loaded with --model.name.",
+        default="openai",
+    )
+
+    parser.add_argument(
+        "--judge.local_batch_size",
+        type=int,
+        help="Number of responses scored per forward pass by the local judge.",
+        default=8,
+    )
+
+    parser.add_argument(
+        "--judge.realtime_fraction",
+        type=float,
+        help="Fraction of judge requests sent to the real-time API instead of the batch API.",
+        default=0.05,
+    )
+
+    parser.add_argument(
+        "--judge.realtime_token_budget",
+        type=int,
+        help="Hourly token budget for real-time judge requests. 0 disables the fast lane.",
+        default=20000,
+    )
+
+    parser.add_argument(
+        "--judge.deadline_minutes",
+        type=float,
+        help="Minutes within which judge scores are needed; shorter than the batch window routes to the real-time API. 0 means no deadline.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--judge.max_batch_queue_depth",
+        type=int,
+        help="Number of pending batches above which judge requests go to the real-time API.",
+        default=100,
+    )
+
     parser.add_argument(
         "--pool_mining.url",
         type=str,
@@ -305,6 +468,118 @@ def add_validator_args(cls, parser):
         ),
     )
 
+    parser.add_argument(
+        "--pool_mining.blacklist_ttl",
+        type=float,
+        help="Seconds between background refreshes of the pool blacklist.",
+        default=300,
+    )
+
+    parser.add_argument(
+        "--pool_mining.miners_ttl",
+        type=float,
+        help="Seconds the pool metagraph is cached for.",
+        default=300,
+    )
+
+    parser.add_argument(
+        "--pool_mining.timeout",
+        type=float,
+        help="Timeout in seconds of pool mining API requests.",
+        default=10,
+    )
+
+    parser.add_argument(
+        "--pool_mining.retries",
+        type=int,
+        help="Number of retries of failed pool mining API requests.",
+        default=2,
+    )
+
+    parser.add_argument(
+        "--health_probe.off",
+        action="store_true",
+        help="Disable the background axon health prober.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--health_probe.interval",
+        type=float,
+        help="Seconds between axon health probe rounds.",
+        default=120,
+    )
+
+    parser.add_argument(
+        "--health_probe.timeout",
+        type=float,
+        help="Timeout in seconds of a single axon ping.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--health_probe.concurrency",
+        type=int,
+        help="Maximum number of axon pings in flight at once.",
+        default=64,
+    )
+
+    parser.add_argument(
+        "--health_probe.max_failures",
+        type=int,
+        help="Consecutive failed pings after which an axon is skipped when selecting miners.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--retention.off",
+        action="store_true",
+        help="Disable the background database retention job.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--retention.interval",
+        type=float,
+        help="Seconds between database retention runs.",
+        default=3600,
+    )
+
+    parser.add_argument(
+        "--retention.max_age_hours",
+        type=float,
+        help="Requests older than this many hours are deleted with their responses. 0 disables the age cap.",
+        default=72,
+    )
+
+    parser.add_argument(
+        "--retention.max_requests",
+        type=int,
+        help="Maximum number of stored requests; the oldest are deleted first. 0 disables the cap.",
+        default=10000,
+    )
+
+    parser.add_argument(
+        "--retention.max_responses",
+        type=int,
+        help="Maximum number of stored miner responses; the oldest requests are deleted first. 0 disables the cap.",
+        default=1000000,
+    )
+
+    parser.add_argument(
+        "--retention.batch_size",
+        type=int,
+        help="Number of requests deleted per retention transaction.",
+        default=1000,
+    )
+
+    parser.add_argument(
+        "--retention.vacuum_pages",
+        type=int,
+        help="Maximum number of free database pages returned to the file system per retention run.",
+        default=10000,
+    )
+
 
 def config(cls):
     """
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import threading
+import time
+
+import bittensor as bt
+import numpy as np
+
+from BetterTherapy.api.get_query_axons import ping_axons
+
+
+class AxonHealthProber:
+    """
+    Pings every serving axon in the background and tracks which ones answer.
+
+    A probe round pings the axons with a bare `bt.Synapse` in chunks of
+    `max_concurrency`, so at most that many pings are in flight at once. Per UID
+    it keeps the number of probes and successes, consecutive failures, the time of
+    the last successful ping and an exponential moving average of the round trip
+    time. A UID is considered unreachable after `max_failures` consecutive failed
+    pings; UIDs that were never probed count as reachable. Stats are saved to
+    `path` after every round and reloaded on start, keyed by hotkey.
+    """
+
+    def __init__(
+        self,
+        dendrite,
+        metagraph: "bt.metagraph.Metagraph",
+        path: str | None = None,
+        interval: float = 120,
+        timeout: float = 3,
+        max_concurrency: int = 64,
+        max_failures: int = 3,
+        rtt_alpha: float = 0.3,
+    ):
+        self.dendrite = dendrite
+        self.metagraph = metagraph
+        self.path = path
+        self.interval = interval
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_failures = max_failures
+        self.rtt_alpha = rtt_alpha
+        self.version = 0
+        self.hotkeys: list[str] = []
+        self.probes = np.zeros(0, dtype=np.int64)
+        self.successes = np.zeros(0, dtype=np.int64)
+        self.failures = np.zeros(0, dtype=np.int64)
+        self.last_ok = np.zeros(0, dtype=np.float64)
+        self.rtt = np.zeros(0, dtype=np.float64)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _resize(self, n: int) -> None:
+        old = len(self.probes)
+        if n == old:
+            return
+
+        def fit(array: np.ndarray, fill) -> np.ndarray:
+            resized = np.full(n, fill, dtype=array.dtype)
+            resized[: min(n, old)] = array[: min(n, old)]
+            return resized
+
+        self.probes = fit(self.probes, 0)
+        self.successes = fit(self.successes, 0)
+        self.failures = fit(self.failures, 0)
+        self.last_ok = fit(self.last_ok, 0.0)
+        self.rtt = fit(self.rtt, np.nan)
+
+    def sync(self, hotkeys: list[str]) -> None:
+        """Resizes to the metagraph and forgets UIDs whose hotkey changed."""
+        with self._lock:
+            self._resize(len(hotkeys))
+            changed = [
+                uid
+                for uid, (old, new) in enumerate(
+                    zip(self.hotkeys, hotkeys, strict=False)
+                )
+                if old != new
+            ]
+            if changed:
+                self.probes[changed] = 0
+                self.successes[changed] = 0
+                self.failures[changed] = 0
+                self.last_ok[changed] = 0.0
+                self.rtt[changed] = np.nan
+                self.version += 1
+            self.hotkeys = list(hotkeys)
+
+    def record(self, results: list[tuple[int, bool, float | None]]) -> None:
+        """Applies `(uid, success, rtt)` ping results."""
+        if not results:
+            return
+        uids = np.array([uid for uid, _, _ in results], dtype=np.int64)
+        ok = np.array([success for _, success, _ in results], dtype=bool)
+        rtt = np.array(
+            [np.nan if t is None else t for _, _, t in results], dtype=np.float64
+        )
+        with self._lock:
+            if len(uids) and uids.max() >= len(self.probes):
+                self._resize(int(uids.max()) + 1)
+            was_reachable = self.failures < self.max_failures
+            self.probes[uids] += 1
+            self.successes[uids] += ok
+            self.failures[uids] = np.where(ok, 0, self.failures[uids] + 1)
+            self.last_ok[uids[ok]] = time.time()
+            measured = ok & ~np.isnan(rtt)
+            previous = self.rtt[uids[measured]]
+            self.rtt[uids[measured]] = np.where(
+                np.isnan(previous),
+                rtt[measured],
+                self.rtt_alpha * rtt[measured] + (1 - self.rtt_alpha) * previous,
+            )
+            if ((self.failures < self.max_failures) != was_reachable).any():
+                self.version += 1
+
+    def reachable_mask(self, n: int) -> np.ndarray:
+        """Boolean mask over `n` UIDs; False for UIDs known to be unreachable."""
+        with self._lock:
+            mask = np.ones(n, dtype=bool)
+            m = min(n, len(self.failures))
+            mask[:m] = self.failures[:m] < self.max_failures
+            return mask
+
+    async def probe(self, uids: list[int]) -> None:
+        """Pings `uids`, `max_concurrency` at a time, and records the results."""
+        for start in range(0, len(uids), self.max_concurrency):
+            chunk = uids[start : start + self.max_concurrency]
+            self.record(
+                await ping_axons(
+                    self.dendrite, self.metagraph, chunk, timeout=self.timeout
+                )
+            )
+
+    async def probe_all(self) -> None:
+        """Probes every serving axon of the metagraph."""
+        self.sync(list(self.metagraph.hotkeys))
+        uids = [uid for uid, axon in enumerate(self.metagraph.axons) if axon.is_serving]
+        start = time.perf_counter()
+        await self.probe(uids)
+        unreachable = len(uids) - int(self.reachable_mask(len(self.probes))[uids].sum())
+        bt.logging.info(
+            f"Probed {len(uids)} axons in {time.perf_counter() - start:.1f}s, "
+            f"{unreachable} unreachable"
+        )
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            tmp_path = f"{self.path}.tmp.npz"
+            np.savez(
+                tmp_path,
+                hotkeys=np.array(self.hotkeys, dtype=str),
+                probes=self.probes,
+                successes=self.successes,
+                failures=self.failures,
+                last_ok=self.last_ok,
+                rtt=self.rtt,
+            )
+            os.replace(tmp_path, self.path)
+
+    def load(self) -> None:
+        """Restores the stats of UIDs whose hotkey is unchanged since the save."""
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            state = np.load(self.path)
+            hotkeys = state["hotkeys"].tolist()
+        except Exception as e:
+            bt.logging.error(f"Error loading axon health stats: {e}")
+            return
+        self.sync(list(self.metagraph.hotkeys))
+        with self._lock:
+            uids = [
+                uid
+                for uid, hotkey in enumerate(hotkeys)
+                if uid < len(self.hotkeys) and self.hotkeys[uid] == hotkey
+            ]
+            for name in ("probes", "successes", "failures", "last_ok", "rtt"):
+                getattr(self, name)[uids] = state[name][uids]
+            self.version += 1
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                try:
+                    loop.run_until_complete(self.probe_all())
+                    self.save()
+                except Exception as e:
+                    bt.logging.error(f"Error probing axons: {e}")
+                if self._stop.wait(self.interval):
+                    return
+        finally:
+            loop.close()
+
+    def start(self) -> None:
+        """Loads saved stats and starts probing in the background."""
+        if self._thread is not None:
+            return
+        self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -2,6 +2,8 @@ import logging
 import os
 from logging.handlers import RotatingFileHandler
 
+import bittensor as bt
+
 EVENTS_LEVEL_NUM = 38
 DEFAULT_LOG_BACKUP_COUNT = 10
 
@@ -33,3 +35,8 @@ def setup_events_logger(full_path, events_retention_size):
     logger.addHandler(file_handler)
 
     return logger
+
+
+def debug_enabled() -> bool:
+    """Whether bittensor debug logging is on, to skip formatting debug-only output."""
+    return bt.logging.get_level() <= logging.DEBUG
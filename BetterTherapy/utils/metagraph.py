@@ -0,0 +1,208 @@
+import hashlib
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import bittensor as bt
+import numpy as np
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+_AXON_FIELDS = (
+    "version",
+    "ip",
+    "port",
+    "ip_type",
+    "hotkey",
+    "coldkey",
+    "protocol",
+    "placeholder1",
+    "placeholder2",
+)
+
+
+def _axon_key(axon) -> tuple:
+    return (
+        axon.ip,
+        axon.port,
+        axon.ip_type,
+        axon.version,
+        axon.protocol,
+        axon.hotkey,
+        axon.coldkey,
+    )
+
+
+def _digest(values) -> bytes:
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).digest()
+
+
+@dataclass
+class MetagraphChange:
+    """
+    UIDs that changed between two metagraph syncs.
+
+    `replaced_uids` got a new hotkey (a new miner took the slot), `axon_uids` changed
+    their axon info and `stake_uids` their stake. `changed_uids` is the union.
+    UIDs past the previous metagraph size count as replaced.
+    """
+
+    block: int
+    n_before: int
+    n_after: int
+    replaced_uids: np.ndarray = field(default_factory=lambda: _EMPTY)
+    axon_uids: np.ndarray = field(default_factory=lambda: _EMPTY)
+    stake_uids: np.ndarray = field(default_factory=lambda: _EMPTY)
+
+    @property
+    def changed_uids(self) -> np.ndarray:
+        return np.union1d(
+            np.union1d(self.replaced_uids, self.axon_uids), self.stake_uids
+        )
+
+    @property
+    def empty(self) -> bool:
+        return (
+            self.n_before == self.n_after
+            and not self.replaced_uids.size
+            and not self.axon_uids.size
+            and not self.stake_uids.size
+        )
+
+
+class MetagraphTracker:
+    """
+    Keeps fingerprints of the metagraph hotkeys, axons and stake, and works out which
+    UIDs changed since the last sync without copying the metagraph.
+
+    Each array is first compared through a single digest, so an unchanged array costs
+    one hash; only arrays whose digest moved are compared per UID. Subscribers
+    registered with `subscribe` receive every non-empty `MetagraphChange`.
+    """
+
+    def __init__(self, metagraph: "bt.metagraph.Metagraph | None" = None):
+        self.hotkeys: list[str] = []
+        self.axon_keys: list[tuple] = []
+        self.stake = np.zeros(0, dtype=np.float32)
+        self._hotkeys_digest = b""
+        self._axons_digest = b""
+        self._subscribers: list[Callable[[MetagraphChange], None]] = []
+        if metagraph is not None:
+            self.diff(metagraph)
+
+    def rebase_hotkeys(self, hotkeys: list[str]) -> None:
+        """Sets the hotkeys the next diff compares against, e.g. from saved state."""
+        self.hotkeys = list(hotkeys)
+        self._hotkeys_digest = _digest(self.hotkeys)
+
+    def subscribe(self, callback: Callable[[MetagraphChange], None]) -> None:
+        self._subscribers.append(callback)
+
+    def publish(self, change: MetagraphChange) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                bt.logging.error(f"Metagraph change subscriber failed: {e}")
+
+    def diff(self, metagraph: "bt.metagraph.Metagraph") -> MetagraphChange:
+        """Compares the metagraph with the last fingerprints and updates them."""
+        n_before = len(self.hotkeys)
+        n = int(metagraph.n.item())
+        change = MetagraphChange(
+            block=int(metagraph.block.item()), n_before=n_before, n_after=n
+        )
+
+        hotkeys = list(metagraph.hotkeys[:n])
+        hotkeys_digest = _digest(hotkeys)
+        if hotkeys_digest != self._hotkeys_digest:
+            change.replaced_uids = np.array(
+                [
+                    uid
+                    for uid, hotkey in enumerate(hotkeys)
+                    if uid >= n_before or self.hotkeys[uid] != hotkey
+                ],
+                dtype=np.int64,
+            )
+            self.hotkeys = hotkeys
+            self._hotkeys_digest = hotkeys_digest
+
+        axon_keys = [_axon_key(axon) for axon in metagraph.axons[:n]]
+        axons_digest = _digest(axon_keys)
+        if axons_digest != self._axons_digest:
+            n_axons = len(self.axon_keys)
+            change.axon_uids = np.array(
+                [
+                    uid
+                    for uid, key in enumerate(axon_keys)
+                    if uid >= n_axons or self.axon_keys[uid] != key
+                ],
+                dtype=np.int64,
+            )
+            self.axon_keys = axon_keys
+            self._axons_digest = axons_digest
+
+        stake = np.asarray(metagraph.S, dtype=np.float32)[:n]
+        m = min(len(stake), len(self.stake))
+        stake_changed = np.flatnonzero(stake[:m] != self.stake[:m])
+        change.stake_uids = np.concatenate(
+            [stake_changed, np.arange(m, len(stake), dtype=np.int64)]
+        )
+        if change.stake_uids.size or len(stake) != len(self.stake):
+            self.stake = stake.copy()
+        return change
+
+
+def save_metagraph_snapshot(metagraph: "bt.metagraph.Metagraph", path: str) -> None:
+    """
+    Writes the numeric arrays and the axons of the metagraph to a `.npz` file.
+
+    The file is written next to `path` and renamed over it, so a crash mid-write
+    never leaves a truncated snapshot behind.
+    """
+    arrays = {
+        name: value
+        for name, value in vars(metagraph).items()
+        if isinstance(value, np.ndarray) and value.dtype.kind in "biuf"
+    }
+    axons = {
+        f"axon_{name}": np.array(
+            [getattr(axon, name) for axon in metagraph.axons],
+            dtype=str if name in ("ip", "hotkey", "coldkey") else np.int64,
+        )
+        for name in _AXON_FIELDS
+    }
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, netuid=np.array(metagraph.netuid), **arrays, **axons)
+    os.replace(tmp_path, path)
+
+
+def load_metagraph_snapshot(
+    path: str, netuid: int, network: str
+) -> "bt.metagraph.Metagraph | None":
+    """
+    Rebuilds a metagraph from a snapshot written by `save_metagraph_snapshot`
+    without touching the chain. Returns None if the snapshot is missing, unreadable
+    or belongs to another subnet.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as snapshot:
+            if int(snapshot["netuid"]) != netuid:
+                bt.logging.warning(
+                    f"Ignoring metagraph snapshot of netuid {int(snapshot['netuid'])}"
+                )
+                return None
+            metagraph = bt.metagraph(netuid, network=network, lite=True, sync=False)
+            for name in snapshot.files:
+                if name != "netuid" and not name.startswith("axon_"):
+                    setattr(metagraph, name, snapshot[name])
+            fields = [snapshot[f"axon_{name}"].tolist() for name in _AXON_FIELDS]
+        metagraph.axons = [
+            bt.AxonInfo(**dict(zip(_AXON_FIELDS, values, strict=True)))
+            for values in zip(*fields, strict=True)
+        ]
+    except Exception as e:
+        bt.logging.warning(f"Error loading metagraph snapshot: {e}")
+        return None
+    return metagraph
@@ -0,0 +1,111 @@
+import time
+
+import numpy as np
+
+from BetterTherapy.utils.metagraph import MetagraphChange
+from BetterTherapy.utils.uids import _occurrence_rank
+
+
+class RewardHistory:
+    """
+    The last `window` rewards of every UID, with the time they were recorded.
+
+    Rewards and timestamps live in two `(n_uids, window)` ring buffers, so memory
+    stays fixed however long the validator runs. Empty slots hold NaN. The buffers
+    grow with the metagraph and the history of a UID is cleared when its hotkey is
+    replaced (see `apply_change`). Every statistic is computed for all UIDs at once
+    and can be restricted to rewards recorded since a given time; UIDs without
+    rewards in range get NaN.
+    """
+
+    def __init__(self, n: int = 0, window: int = 64):
+        self.window = window
+        self.rewards = np.full((0, window), np.nan, dtype=np.float32)
+        self.timestamps = np.full((0, window), np.nan, dtype=np.float64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.resize(n)
+
+    @property
+    def n(self) -> int:
+        return len(self.counts)
+
+    def resize(self, n: int) -> None:
+        old = self.n
+        if n == old:
+            return
+
+        def fit(array: np.ndarray, fill) -> np.ndarray:
+            resized = np.full((n, *array.shape[1:]), fill, dtype=array.dtype)
+            resized[: min(n, old)] = array[: min(n, old)]
+            return resized
+
+        self.rewards = fit(self.rewards, np.nan)
+        self.timestamps = fit(self.timestamps, np.nan)
+        self.counts = fit(self.counts, 0)
+
+    def reset(self, uids) -> None:
+        uids = np.asarray(uids, dtype=np.int64)
+        self.rewards[uids] = np.nan
+        self.timestamps[uids] = np.nan
+        self.counts[uids] = 0
+
+    def apply_change(self, change: MetagraphChange) -> None:
+        """Follows a metagraph change: resizes and clears replaced UIDs."""
+        self.resize(change.n_after)
+        replaced = change.replaced_uids
+        self.reset(replaced[replaced < self.n])
+
+    def record(self, uids, rewards, timestamps=None) -> None:
+        """
+        Records any number of rewards in one call. A UID may appear several times,
+        e.g. for several rounds; its rewards are stored in the order given.
+
+        Args:
+            uids: UID of each reward.
+            rewards: The rewards.
+            timestamps: Time of each reward, a single time for all of them, or None
+                for now.
+        """
+        uids = np.asarray(uids, dtype=np.int64)
+        if uids.size == 0:
+            return
+        if uids.max() >= self.n:
+            self.resize(int(uids.max()) + 1)
+        if timestamps is None:
+            timestamps = time.time()
+        slots = (self.counts[uids] + _occurrence_rank(uids)) % self.window
+        self.rewards[uids, slots] = rewards
+        self.timestamps[uids, slots] = timestamps
+        np.add.at(self.counts, uids, 1)
+
+    def _in_range(self, since: float | None) -> np.ndarray:
+        if since is None:
+            return self.rewards
+        return np.where(self.timestamps >= since, self.rewards, np.nan)
+
+    def count(self, since: float | None = None) -> np.ndarray:
+        return np.count_nonzero(~np.isnan(self._in_range(since)), axis=1)
+
+    def mean(self, since: float | None = None) -> np.ndarray:
+        rewards = self._in_range(since)
+        counts = np.count_nonzero(~np.isnan(rewards), axis=1)
+        total = np.where(np.isnan(rewards), 0, rewards).sum(axis=1, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, total / counts, np.nan)
+
+    def percentile(self, q: float, since: float | None = None) -> np.ndarray:
+        """Per-UID percentile with linear interpolation, like `np.percentile`."""
+        rewards = self._in_range(since)
+        counts = np.count_nonzero(~np.isnan(rewards), axis=1)
+        ordered = np.sort(rewards, axis=1).astype(np.float64)  # NaNs sort last
+        position = q / 100 * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, np.maximum(counts - 1, 0))
+        rows = np.arange(len(ordered))
+        low, high = ordered[rows, lower], ordered[rows, upper]
+        result = low + (high - low) * (position - lower)
+        result[counts == 0] = np.nan
+        return result
+
+    def median(self, since: float | None = None) -> np.ndarray:
+        return self.percentile(50, since)
@@ -0,0 +1,158 @@
+import math
+
+import bittensor as bt
+import numpy as np
+
+
+class MinerSampler:
+    """
+    Picks which miners to query each round from per-UID query history.
+
+    For every UID the sampler keeps the number of queries and successes, a ring
+    buffer of the last `latency_window` response times, and the round it was last
+    queried. `sample` returns `k` of the eligible UIDs:
+
+    - Coverage: the ceil(n_eligible / coverage_rounds) UIDs that have gone longest
+      without a query are always included, so every eligible miner is queried at
+      least once every `coverage_rounds` rounds (as long as k allows it).
+    - The remaining slots are drawn without replacement, weighted by the smoothed
+      success rate and the median latency of each miner.
+
+    History is reset for a UID when its hotkey changes (see `sync`).
+    """
+
+    def __init__(
+        self,
+        n: int = 0,
+        coverage_rounds: int = 8,
+        latency_window: int = 32,
+        latency_scale: float = 10.0,
+        seed: int | None = None,
+    ):
+        self.coverage_rounds = max(1, coverage_rounds)
+        self.latency_window = latency_window
+        self.latency_scale = latency_scale
+        self.round = 0
+        self.hotkeys: list[str] = []
+        self._rng = np.random.default_rng(seed)
+        self.attempts = np.zeros(0, dtype=np.int64)
+        self.successes = np.zeros(0, dtype=np.int64)
+        self.last_seen = np.zeros(0, dtype=np.int64)
+        self.latencies = np.zeros((0, latency_window), dtype=np.float32)
+        self._latency_pos = np.zeros(0, dtype=np.int64)
+        self.resize(n)
+
+    def resize(self, n: int) -> None:
+        """Grows or shrinks the history arrays to `n` UIDs."""
+        old = len(self.attempts)
+        if n == old:
+            return
+
+        def fit(array: np.ndarray, fill) -> np.ndarray:
+            resized = np.full((n, *array.shape[1:]), fill, dtype=array.dtype)
+            resized[: min(n, old)] = array[: min(n, old)]
+            return resized
+
+        self.attempts = fit(self.attempts, 0)
+        self.successes = fit(self.successes, 0)
+        # -1 marks a UID that was never queried, so it is the most overdue.
+        self.last_seen = fit(self.last_seen, -1)
+        self.latencies = fit(self.latencies, np.nan)
+        self._latency_pos = fit(self._latency_pos, 0)
+
+    def reset(self, uids) -> None:
+        """Forgets the history of `uids`, e.g. after their hotkeys were replaced."""
+        uids = np.asarray(uids, dtype=np.int64)
+        self.attempts[uids] = 0
+        self.successes[uids] = 0
+        self.last_seen[uids] = -1
+        self.latencies[uids] = np.nan
+        self._latency_pos[uids] = 0
+
+    def sync(self, hotkeys: list[str]) -> None:
+        """Resizes to the metagraph and resets UIDs whose hotkey changed."""
+        self.resize(len(hotkeys))
+        changed = [
+            uid
+            for uid, (old, new) in enumerate(zip(self.hotkeys, hotkeys, strict=False))
+            if old != new
+        ]
+        if changed:
+            self.reset(changed)
+        self.hotkeys = list(hotkeys)
+
+    def record(self, uids, successes, latencies) -> None:
+        """
+        Records the outcome of a round of queries.
+
+        Args:
+            uids: The queried UIDs.
+            successes: Whether each miner returned a usable response.
+            latencies: Response time of each miner in seconds, or None/NaN if unknown.
+        """
+        uids = np.asarray(uids, dtype=np.int64)
+        if uids.size == 0:
+            return
+        successes = np.asarray(successes, dtype=bool)
+        latencies = np.array(
+            [np.nan if t is None else t for t in latencies], dtype=np.float32
+        )
+        np.add.at(self.attempts, uids, 1)
+        np.add.at(self.successes, uids, successes.astype(np.int64))
+        known = ~np.isnan(latencies)
+        pos = self._latency_pos[uids[known]]
+        self.latencies[uids[known], pos] = latencies[known]
+        self._latency_pos[uids[known]] = (pos + 1) % self.latency_window
+
+    def success_rate(self) -> np.ndarray:
+        """Laplace-smoothed success rate per UID; 0.5 for UIDs never queried."""
+        return (self.successes + 1) / (self.attempts + 2)
+
+    def latency_percentile(self, q: float) -> np.ndarray:
+        """Nearest-rank latency percentile per UID; NaN for UIDs with no latencies."""
+        counts = np.count_nonzero(~np.isnan(self.latencies), axis=1)
+        ordered = np.sort(self.latencies, axis=1)  # NaNs sort last
+        index = np.floor(q / 100 * np.maximum(counts - 1, 0)).astype(np.int64)
+        percentile = ordered[np.arange(len(ordered)), index].astype(np.float64)
+        percentile[counts == 0] = np.nan
+        return percentile
+
+    def weights(self, uids: np.ndarray) -> np.ndarray:
+        p50 = self.latency_percentile(50)[uids]
+        p50 = np.where(np.isnan(p50), self.latency_scale, p50)
+        return self.success_rate()[uids] / (1 + p50 / self.latency_scale)
+
+    def sample(self, eligible_uids, k: int) -> np.ndarray:
+        """
+        Returns `k` of `eligible_uids` to query this round, in ascending order.
+        """
+        eligible = np.unique(np.asarray(eligible_uids, dtype=np.int64))
+        if len(eligible) and eligible[-1] >= len(self.attempts):
+            self.resize(int(eligible[-1]) + 1)
+        self.round += 1
+        k = max(0, min(k, len(eligible)))
+        if k == len(eligible):
+            chosen = eligible
+        else:
+            quota = math.ceil(len(eligible) / self.coverage_rounds)
+            if quota > k:
+                bt.logging.warning(
+                    f"Sample size {k} cannot cover {len(eligible)} miners every "
+                    f"{self.coverage_rounds} rounds"
+                )
+                quota = k
+            # Stalest first; a random secondary key breaks ties between equals.
+            order = np.lexsort(
+                (self._rng.random(len(eligible)), self.last_seen[eligible])
+            )
+            overdue = eligible[order[:quota]]
+            rest = eligible[order[quota:]]
+            extra = np.zeros(0, dtype=np.int64)
+            if k > quota:
+                weights = self.weights(rest)
+                extra = self._rng.choice(
+                    rest, size=k - quota, replace=False, p=weights / weights.sum()
+                )
+            chosen = np.sort(np.concatenate([overdue, extra]))
+        self.last_seen[chosen] = self.round
+        return chosen
@@ -0,0 +1,103 @@
+import bittensor as bt
+import numpy as np
+
+
+class ScoreEngine:
+    """
+    Exponential moving average of the miner scores, updated in place.
+
+    The scores live in one float32 buffer that is only reallocated when the subnet
+    grows. Every round decays all scores by `1 - alpha` in place and adds
+    `alpha * reward` to the UIDs that were rewarded. The result is the same as
+    blending a zero-filled reward vector into the scores. Rewards go through scratch
+    buffers sized to the largest batch seen, so an update allocates no array; only a
+    few KiB of Python frames and NumPy scalars and views, whatever the subnet size. On
+    small subnets that per-call overhead makes it slower than scattering the rewards
+    into a new array.
+    """
+
+    def __init__(self, n: int = 0, alpha: float = 0.1):
+        self.alpha = alpha
+        self.scores = np.zeros(n, dtype=np.float32)
+        self._rewards = np.zeros(0, dtype=np.float32)
+        self._gathered = np.zeros(0, dtype=np.float32)
+        self._nan = np.zeros(0, dtype=bool)
+
+    @property
+    def n(self) -> int:
+        return len(self.scores)
+
+    def load(self, scores: np.ndarray) -> None:
+        """Replaces the scores with an owned float32 copy of `scores`."""
+        self.scores = np.array(scores, dtype=np.float32)
+
+    def resize(self, n: int) -> None:
+        if n == self.n:
+            return
+        resized = np.zeros(n, dtype=np.float32)
+        resized[: min(n, self.n)] = self.scores[: min(n, self.n)]
+        self.scores = resized
+
+    def reset(self, uids) -> None:
+        self.scores[np.asarray(uids, dtype=np.intp)] = 0
+
+    def _reserve(self, size: int) -> None:
+        if size > len(self._rewards):
+            size = max(size, 2 * len(self._rewards))
+            self._rewards = np.zeros(size, dtype=np.float32)
+            self._gathered = np.zeros(size, dtype=np.float32)
+            self._nan = np.zeros(size, dtype=bool)
+
+    def update(self, uids, rewards) -> None:
+        """
+        Applies one or several rounds of rewards.
+
+        Args:
+            uids: UIDs of the rewards, a row per round or one row shared by all of
+                them. A UID repeated within a round keeps its last reward.
+            rewards: The rewards of one round, or a `(rounds, len(uids))` array.
+
+        Raises:
+            ValueError: If the shapes of `uids` and `rewards` do not match.
+            IndexError: If a UID is out of range.
+        """
+        uids = np.asarray(uids, dtype=np.intp)
+        rewards = np.asarray(rewards)
+        if rewards.ndim == 1:
+            rewards = rewards[np.newaxis]
+        if uids.shape[-1:] != rewards.shape[-1:] or (
+            uids.ndim == 2 and uids.shape[0] != rewards.shape[0]
+        ):
+            raise ValueError(
+                f"Shape mismatch: rewards array of shape {rewards.shape} "
+                f"cannot be broadcast to uids array of shape {uids.shape}"
+            )
+        # Negative UIDs wrap around to huge unsigned values.
+        if uids.size and uids.view(np.uintp).max() >= self.n:
+            raise IndexError(f"UIDs out of range for {self.n} scores")
+        self._reserve(rewards.shape[-1])
+        if uids.ndim == 1:
+            for round_rewards in rewards:
+                self._apply(uids, round_rewards)
+        else:
+            for round_uids, round_rewards in zip(uids, rewards, strict=True):
+                self._apply(round_uids, round_rewards)
+
+    def _apply(self, uids: np.ndarray, rewards: np.ndarray) -> None:
+        size = len(uids)
+        weighted = self._rewards[:size]
+        gathered = self._gathered[:size]
+        nan = self._nan[:size]
+
+        np.copyto(weighted, rewards, casting="same_kind")
+        # The sum is NaN if any reward is, which is cheaper to test than every one.
+        if np.isnan(np.add.reduce(weighted)):
+            np.isnan(weighted, out=nan)
+            bt.logging.warning(f"NaN values detected in rewards: {rewards}")
+            weighted[nan] = 0
+        np.multiply(weighted, self.alpha, out=weighted)
+
+        np.multiply(self.scores, 1 - self.alpha, out=self.scores)
+        self.scores.take(uids, out=gathered, mode="clip")
+        np.add(gathered, weighted, out=gathered)
+        self.scores.put(uids, gathered, mode="clip")
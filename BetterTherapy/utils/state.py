@@ -0,0 +1,178 @@
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+
+import bittensor as bt
+import numpy as np
+
+_RECORD_HEADER = struct.Struct("<4sqI")  # magic, step, number of changed UIDs
+_RECORD_MAGIC = b"SCD1"
+_CRC = struct.Struct("<I")
+
+
+@dataclass
+class ValidatorState:
+    step: int
+    scores: np.ndarray
+    hotkeys: list[str]
+
+
+def _write_atomic(path: str, write) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class StateStore:
+    """
+    Crash-safe store of the validator step, scores and hotkeys.
+
+    A checkpoint is a raw `.npy` scores file plus `state.json`, which names the
+    current scores and journal files and is the only file whose replacement commits a
+    checkpoint; every file is written to a temporary name and renamed. Between
+    checkpoints `save` appends the scores that changed to the journal as
+    `(uids, values)` records with a CRC, and writes nothing when no score changed.
+    A new checkpoint is written every `checkpoint_every` records, and whenever the
+    hotkeys or the number of UIDs change. `load` memory-maps the checkpoint scores
+    and replays the journal up to the first torn or corrupt record.
+    """
+
+    def __init__(self, path: str, checkpoint_every: int = 100):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.meta_path = os.path.join(path, "state.json")
+        self.legacy_path = os.path.join(path, "state.npz")
+        self._scores: np.ndarray | None = None
+        self._hotkeys: list[str] = []
+        self._generation = 0
+        self._records = 0
+
+    def _file(self, kind: str, generation: int) -> str:
+        suffix = "npy" if kind == "scores" else "bin"
+        return os.path.join(self.path, f"state-{kind}-{generation}.{suffix}")
+
+    def checkpoint(self, step: int, scores: np.ndarray, hotkeys: list[str]) -> None:
+        generation = self._generation + 1
+        scores = np.ascontiguousarray(scores)
+        _write_atomic(self._file("scores", generation), lambda f: np.save(f, scores))
+        _write_atomic(self._file("journal", generation), lambda f: None)
+        meta = {
+            "generation": generation,
+            "step": int(step),
+            "hotkeys": list(hotkeys),
+        }
+        _write_atomic(self.meta_path, lambda f: f.write(json.dumps(meta).encode()))
+        for kind in ("scores", "journal"):
+            old = self._file(kind, self._generation)
+            if os.path.exists(old):
+                os.remove(old)
+        self._generation = generation
+        self._records = 0
+        self._scores = scores.copy()
+        self._hotkeys = list(hotkeys)
+
+    def save(self, step: int, scores: np.ndarray, hotkeys: list[str]) -> bool:
+        """Persists the state if any score changed. Returns whether it wrote."""
+        if (
+            self._scores is None
+            or len(scores) != len(self._scores)
+            or scores.dtype != self._scores.dtype
+            or list(hotkeys) != self._hotkeys
+        ):
+            self.checkpoint(step, scores, hotkeys)
+            return True
+
+        changed = scores != self._scores
+        changed &= ~(np.isnan(scores) & np.isnan(self._scores))
+        uids = np.flatnonzero(changed).astype(np.uint32)
+        if uids.size == 0:
+            return False
+        if self._records >= self.checkpoint_every:
+            self.checkpoint(step, scores, hotkeys)
+            return True
+        values = scores[uids]
+        body = (
+            _RECORD_HEADER.pack(_RECORD_MAGIC, int(step), len(uids))
+            + uids.tobytes()
+            + values.tobytes()
+        )
+        with open(self._file("journal", self._generation), "ab") as f:
+            f.write(body + _CRC.pack(zlib.crc32(body)))
+            f.flush()
+            os.fsync(f.fileno())
+        self._scores[uids] = values
+        self._records += 1
+        return True
+
+    def _replay(self, scores: np.ndarray, step: int) -> tuple[int, int]:
+        """Applies the journal records to `scores`. Returns the step and the count."""
+        records = 0
+        path = self._file("journal", self._generation)
+        if not os.path.exists(path):
+            return step, records
+        with open(path, "rb") as f:
+            data = f.read()
+        offset = 0
+        item = scores.dtype.itemsize
+        while offset + _RECORD_HEADER.size <= len(data):
+            magic, record_step, count = _RECORD_HEADER.unpack_from(data, offset)
+            end = offset + _RECORD_HEADER.size + count * (4 + item)
+            if magic != _RECORD_MAGIC or end + _CRC.size > len(data):
+                break
+            (crc,) = _CRC.unpack_from(data, end)
+            if crc != zlib.crc32(data[offset:end]):
+                break
+            start = offset + _RECORD_HEADER.size
+            uids = np.frombuffer(data, dtype=np.uint32, count=count, offset=start)
+            values = np.frombuffer(
+                data, dtype=scores.dtype, count=count, offset=start + count * 4
+            )
+            scores[uids] = values
+            step = record_step
+            records += 1
+            offset = end + _CRC.size
+        if offset < len(data):
+            # Drop the torn tail so that new records follow the last good one.
+            bt.logging.warning(
+                f"Truncating {len(data) - offset} bytes of torn score journal"
+            )
+            os.truncate(path, offset)
+        return step, records
+
+    def load(self) -> ValidatorState | None:
+        """Loads the last saved state, or None if there is none."""
+        if not os.path.exists(self.meta_path):
+            return self._load_legacy()
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self._generation = meta["generation"]
+            # Copy-on-write mapping: the journal is replayed in memory only.
+            scores = np.load(self._file("scores", self._generation), mmap_mode="c")
+        except Exception as e:
+            bt.logging.error(f"Error loading validator state: {e}")
+            return None
+        step, self._records = self._replay(scores, meta["step"])
+        self._scores = np.array(scores)
+        self._hotkeys = list(meta["hotkeys"])
+        return ValidatorState(step=step, scores=scores, hotkeys=list(self._hotkeys))
+
+    def _load_legacy(self) -> ValidatorState | None:
+        """Reads the `state.npz` written by earlier versions."""
+        if not os.path.exists(self.legacy_path):
+            return None
+        try:
+            state = np.load(self.legacy_path)
+            return ValidatorState(
+                step=int(state["step"]),
+                scores=state["scores"],
+                hotkeys=state["hotkeys"].tolist(),
+            )
+        except Exception as e:
+            bt.logging.error(f"Error loading validator state: {e}")
+            return None
@@ -1,11 +1,8 @@
-import random
-from typing import Dict, Optional
+from typing import Optional
 
 import bittensor as bt
 import numpy as np
 
-from BetterTherapy.utils.blacklist import get_blacklisted_hotkeys
-
 
 def check_uid_availability(
     metagraph: "bt.metagraph.Metagraph", uid: int, vpermit_tao_limit: int
@@ -29,102 +26,165 @@ def check_uid_availability(
     return True
 
 
-def filter_uids(
-    bt_obj, max_per_key: int = 15, blacklist: Optional[list[int]] = None
-) -> np.ndarray:
-    """Return available uids filtered by blacklist and per-coldkey cap."""
-    available = []
-    counts: Dict[str, int] = {}
-    ip_counts: Dict[str, int] = {}
-    ip_port_sets = set()
-    blacklisted_hotkeys = get_blacklisted_hotkeys(bt_obj.config.pool_mining.url)
-    blacklisted_hotkeys_set = {t[0] for t in blacklisted_hotkeys}
-    bt.logging.info(f"Blacklisted count: {len(blacklisted_hotkeys_set)}")
+def _factorize(values) -> np.ndarray:
+    """Maps each value to an integer code, in order of first appearance."""
+    codes: dict = {}
+    return np.fromiter(
+        (codes.setdefault(v, len(codes)) for v in values), dtype=np.int64
+    )
+
 
-    for uid in range(bt_obj.metagraph.n.item()):
-        ip_address = bt_obj.metagraph.axons[uid].ip
-        port = bt_obj.metagraph.axons[uid].port
-        ip_port = f"{ip_address}:{port}"
-        ip_counts[ip_address] = ip_counts.get(ip_address, 0) + 1
-        if ip_counts[ip_address] >= max_per_key:
-            bt.logging.warning(
-                f"IP {ip_address} for uid {uid} has reached max_per_key: {max_per_key}"
-            )
-            continue
-
-        if ip_port in ip_port_sets:
-            continue
-        ip_port_sets.add(ip_port)
-        uid_is_available = check_uid_availability(
-            bt_obj.metagraph, uid, bt_obj.config.neuron.vpermit_tao_limit
+def _occurrence_rank(codes: np.ndarray) -> np.ndarray:
+    """Returns, for each element, how many equal codes precede it in array order."""
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    group_start = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    group_sizes = np.diff(np.r_[group_start, len(codes)])
+    rank = np.empty(len(codes), dtype=np.int64)
+    rank[order] = np.arange(len(codes)) - np.repeat(group_start, group_sizes)
+    return rank
+
+
+def compute_uid_masks(
+    metagraph: "bt.metagraph.Metagraph",
+    vpermit_tao_limit: int,
+    max_per_key: int = 15,
+    blacklisted_hotkeys: set[str] | None = None,
+    reachable: np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    """Computes the UID eligibility masks over the metagraph arrays.
+
+    Masks are evaluated in UID order with the same rules as the original per-UID
+    loop: an IP is capped once it has been seen `max_per_key` times (counting every
+    UID), only the first UID that passed the IP cap keeps an `ip:port`, and a coldkey
+    is capped at `max_per_key` UIDs among those that passed every other filter.
+
+    Args:
+        metagraph (:obj: bt.metagraph.Metagraph): Metagraph object
+        vpermit_tao_limit (int): Validator permit tao limit
+        max_per_key (int): Maximum number of UIDs per IP and per coldkey
+        blacklisted_hotkeys (set[str] | None): Hotkeys to exclude
+        reachable (np.ndarray | None): Mask of UIDs whose axons answer pings
+    Returns:
+        dict[str, np.ndarray]: Boolean masks keyed by filter name, and "eligible"
+            combining all of them.
+    """
+    n = int(metagraph.n.item())
+    axons = metagraph.axons[:n]
+    ip_codes = _factorize(axon.ip for axon in axons)
+    ports = np.fromiter((axon.port for axon in axons), dtype=np.int64, count=n)
+    stake = np.asarray(metagraph.S, dtype=np.float64)[:n]
+    validator_permit = np.asarray(metagraph.validator_permit, dtype=bool)[:n]
+
+    serving = np.fromiter((axon.is_serving for axon in axons), dtype=bool, count=n)
+    stake_ok = ~(validator_permit & (stake > vpermit_tao_limit))
+    ip_cap = _occurrence_rank(ip_codes) + 1 < max_per_key
+
+    ip_port_unique = np.zeros(n, dtype=bool)
+    capped_uids = np.flatnonzero(ip_cap)
+    ip_port_codes = ip_codes[capped_uids] * 65536 + ports[capped_uids]
+    _, first = np.unique(ip_port_codes, return_index=True)
+    ip_port_unique[capped_uids[first]] = True
+
+    not_blacklisted = np.ones(n, dtype=bool)
+    if blacklisted_hotkeys:
+        not_blacklisted = np.fromiter(
+            (hk not in blacklisted_hotkeys for hk in metagraph.hotkeys[:n]),
+            dtype=bool,
+            count=n,
         )
-        if not uid_is_available:
-            continue
-        ck = bt_obj.metagraph.coldkeys[uid]
-        hk = bt_obj.metagraph.hotkeys[uid]
 
-        if blacklist and hk in blacklist:
-            continue
+    if reachable is None:
+        reachable = np.ones(n, dtype=bool)
 
-        if blacklisted_hotkeys_set and hk in blacklisted_hotkeys_set:
-            bt.logging.info(f"{hk} is blacklisted")
-            continue
+    eligible = (
+        serving & stake_ok & ip_cap & ip_port_unique & not_blacklisted & reachable
+    )
+    coldkey_cap = np.zeros(n, dtype=bool)
+    eligible_uids = np.flatnonzero(eligible)
+    coldkey_codes = _factorize(metagraph.coldkeys[uid] for uid in eligible_uids)
+    coldkey_cap[eligible_uids] = _occurrence_rank(coldkey_codes) < max_per_key
+    return {
+        "serving": serving,
+        "stake": stake_ok,
+        "ip_cap": ip_cap,
+        "ip_port_unique": ip_port_unique,
+        "not_blacklisted": not_blacklisted,
+        "reachable": reachable,
+        "coldkey_cap": coldkey_cap,
+        "eligible": eligible & coldkey_cap,
+    }
 
-        cnt = counts.get(ck, 0)
-        if cnt >= max_per_key:
-            continue
 
-        neuron = bt_obj.metagraph.axons[uid]
-        if not neuron.is_serving:
-            continue
+# Memoized filter_uids result for the last (metagraph, block, config) seen.
+_filter_cache: dict[tuple, np.ndarray] = {}
 
-        if (
-            bt_obj.metagraph.validator_permit[uid]
-            and bt_obj.metagraph.S[uid] > bt_obj.config.neuron.vpermit_tao_limit
-        ):
-            continue
 
-        available.append(uid)
-        counts[ck] = cnt + 1
+def filter_uids(
+    bt_obj, max_per_key: int = 15, blacklist: Optional[list[int]] = None
+) -> np.ndarray:
+    """Return available uids filtered by blacklist and per-coldkey cap.
 
-    return np.array(available, dtype=int)
+    The result is memoized per metagraph, block and blacklist version, so the masks
+    are computed at most once per metagraph sync. The pool blacklist comes from
+    `bt_obj.blacklist_service` when there is one, so this never blocks on the network,
+    and axons `bt_obj.health_prober` knows to be unreachable are skipped.
+    """
+    metagraph = bt_obj.metagraph
+    vpermit_tao_limit = bt_obj.config.neuron.vpermit_tao_limit
+    blacklist_service = getattr(bt_obj, "blacklist_service", None)
+    health_prober = getattr(bt_obj, "health_prober", None)
+    key = (
+        id(metagraph),
+        int(metagraph.block.item()),
+        int(metagraph.n.item()),
+        max_per_key,
+        vpermit_tao_limit,
+        tuple(blacklist) if blacklist else (),
+        blacklist_service.version if blacklist_service is not None else None,
+        health_prober.version if health_prober is not None else None,
+    )
+    cached = _filter_cache.get(key)
+    if cached is not None:
+        return cached.copy()
+
+    blacklisted_hotkeys_set = (
+        set(blacklist_service.hotkeys) if blacklist_service is not None else set()
+    )
+    bt.logging.info(f"Blacklisted count: {len(blacklisted_hotkeys_set)}")
+    if blacklist:
+        blacklisted_hotkeys_set |= set(blacklist)
+
+    reachable = None
+    if health_prober is not None:
+        reachable = health_prober.reachable_mask(int(metagraph.n.item()))
+    masks = compute_uid_masks(
+        metagraph, vpermit_tao_limit, max_per_key, blacklisted_hotkeys_set, reachable
+    )
+    capped_ips = sorted(
+        {metagraph.axons[uid].ip for uid in np.flatnonzero(~masks["ip_cap"])}
+    )
+    if capped_ips:
+        bt.logging.warning(f"IPs that reached max_per_key {max_per_key}: {capped_ips}")
+    available = np.flatnonzero(masks["eligible"]).astype(int)
+
+    _filter_cache.clear()
+    _filter_cache[key] = available
+    return available.copy()
 
 
 def get_available_uids(self, k: int, exclude: list[int] = None) -> np.ndarray:
-    """Returns k available random uids from the metagraph.
+    """Returns k available uids from the metagraph, picked by the miner sampler.
     Args:
         k (int): Number of uids to return.
-        exclude (List[int]): List of uids to exclude from the random sampling.
+        exclude (List[int]): List of uids to exclude from the sampling.
     Returns:
-        uids (np.ndarray): Randomly sampled available uids.
+        uids (np.ndarray): Sampled available uids.
     Notes:
-        If `k` is larger than the number of available `uids`, set `k` to the number of available `uids`.
+        If `k` is larger than the number of available `uids`, all of them are returned.
     """
-    candidate_uids = []
-    avail_uids = []
-
-    for uid in range(self.metagraph.n.item()):
-        uid_is_available = check_uid_availability(
-            self.metagraph, uid, self.config.neuron.vpermit_tao_limit
-        )
-        uid_is_not_excluded = exclude is None or uid not in exclude
-
-        if uid_is_available:
-            avail_uids.append(uid)
-            if uid_is_not_excluded:
-                candidate_uids.append(uid)
-
-    filtered_uids = filter_uids(self)
-    # If k is larger than the number of available uids, set k to the number of available uids.
-    k = min(k, len(avail_uids), len(filtered_uids))
-    # Check if candidate_uids contain enough for querying, if not grab all avaliable uids
-    available_uids = candidate_uids
-    if len(candidate_uids) < k:
-        available_uids += random.sample(
-            [uid for uid in avail_uids if uid not in candidate_uids],
-            k - len(candidate_uids),
-        )
-
-    uids_list = list(set(avail_uids).intersection(set(filtered_uids)))
-    uids = np.array(uids_list)
-    return uids
+    eligible = filter_uids(self)
+    if exclude is not None:
+        eligible = eligible[~np.isin(eligible, exclude)]
+    self.miner_sampler.sync(self.metagraph.hotkeys)
+    return self.miner_sampler.sample(eligible, k)
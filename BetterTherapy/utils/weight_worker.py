@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import bittensor as bt
+
+# A weight job submits one snapshot of weights through the given subtensor and
+# returns the (success, message) pair of `subtensor.set_weights`.
+WeightJob = Callable[["bt.subtensor"], tuple[bool, str]]
+
+
+@dataclass
+class WeightSubmission:
+    """Outcome of one queued weight job."""
+
+    queued_at: float
+    latency: float  # Seconds from queueing to the last attempt finishing.
+    attempts: int
+    success: bool
+    message: str
+
+
+class WeightCommitWorker:
+    """
+    Submits weights from a background thread so the validator loop never waits on
+    the set_weights extrinsic.
+
+    `enqueue` replaces any job still waiting, so only the latest score snapshot is
+    submitted. A failed submission is retried up to `retries` times with
+    exponential backoff starting at `backoff` seconds, as long as the retry starts
+    within `window` seconds of queueing (the epoch) and no newer job has arrived.
+    The worker opens its own subtensor through `subtensor_factory` and reconnects
+    after an error. The outcome of every job is kept in `history`.
+    """
+
+    def __init__(
+        self,
+        subtensor_factory: Callable[[], "bt.subtensor"],
+        retries: int = 3,
+        backoff: float = 12.0,
+        window: float = 1200.0,
+        history_size: int = 100,
+    ):
+        self.subtensor_factory = subtensor_factory
+        self.retries = retries
+        self.backoff = backoff
+        self.window = window
+        self.history: deque[WeightSubmission] = deque(maxlen=history_size)
+        self._pending: tuple[float, WeightJob] | None = None
+        self._subtensor: bt.subtensor | None = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: threading.Thread | None = None
+
+    def enqueue(self, job: WeightJob) -> None:
+        with self._lock:
+            self._pending = (time.time(), job)
+            self._idle.clear()
+        self._wake.set()
+
+    def _take(self) -> tuple[float, WeightJob] | None:
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is None:
+                self._idle.set()
+            return pending
+
+    def _superseded(self) -> bool:
+        with self._lock:
+            return self._pending is not None
+
+    def _submit(self, queued_at: float, job: WeightJob) -> WeightSubmission:
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                if self._subtensor is None:
+                    self._subtensor = self.subtensor_factory()
+                success, message = job(self._subtensor)
+            except Exception as e:
+                success, message = False, str(e)
+                self._subtensor = None
+            if success or attempts > self.retries:
+                break
+            delay = self.backoff * 2 ** (attempts - 1)
+            if time.time() + delay > queued_at + self.window:
+                break
+            bt.logging.warning(
+                f"set_weights failed ({message}), retrying in {delay:.0f}s"
+            )
+            if self._stop.wait(delay) or self._superseded():
+                break
+        return WeightSubmission(
+            queued_at=queued_at,
+            latency=time.time() - queued_at,
+            attempts=attempts,
+            success=bool(success),
+            message=str(message),
+        )
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            while not self._stop.is_set() and (pending := self._take()) is not None:
+                submission = self._submit(*pending)
+                self.history.append(submission)
+                log = bt.logging.info if submission.success else bt.logging.error
+                log(
+                    f"Weight submission {'succeeded' if submission.success else 'failed'} "
+                    f"after {submission.attempts} attempt(s) in "
+                    f"{submission.latency:.1f}s: {submission.message}"
+                )
+        self._idle.set()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Blocks until every queued job was submitted or given up."""
+        return self._idle.wait(timeout)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
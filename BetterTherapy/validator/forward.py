@@ -24,18 +24,493 @@ import ulid
 from BetterTherapy.protocol import InferenceSynapse
 from BetterTherapy.utils.blacklist import blacklist_hotkey
 from BetterTherapy.utils.llm import generate_response
-from BetterTherapy.utils.uids import filter_uids
+from BetterTherapy.utils.uids import get_available_uids
 from neurons import validator
 import traceback
-from BetterTherapy.db.query import (
-    get_ready_requests,
-    add_request,
-    add_bulk_responses,
+from BetterTherapy.db.async_query import (
+    iter_ready_requests,
+    get_response_texts,
+    add_round,
+    count_pending_requests,
     delete_requests,
 )
-from BetterTherapy.db.models import MinerResponse
 import json
-from BetterTherapy.utils.api import fetch_pool_miners
+from types import SimpleNamespace
+
+
+def score_miner_response(
+    self: validator.Validator,
+    req,
+    miner_uid: int,
+    score: float,
+    miner_db_response: dict,
+) -> dict | None:
+    """
+    Turns a judge score for a single miner into a judged response record.
+
+    Miners scored -1 by the judge are blacklisted and no record is returned. Miners
+    whose response is missing from the database are skipped as well.
+    """
+    if score == -1:
+        bt.logging.info(f"Blacklisting miner {miner_uid}")
+        blacklist_hotkey(
+            wallet=self.wallet,
+            blacklisted_coldkey=self.metagraph.coldkeys[miner_uid],
+            blacklisted_hotkey=self.metagraph.hotkeys[miner_uid],
+            uid=miner_uid,
+            base_url=self.config.pool_mining.url,
+        )
+        return None
+    response_time_score = 0
+    bounded_score = max(0.0, min(1.0, float(score)))
+    if bounded_score <= 0.2:
+        total_score = 0.0
+    else:
+        miner_data = miner_db_response.get(miner_uid)
+        if (
+            miner_data is None
+            or not miner_data.get("response_text")
+            or miner_data.get("response_time") is None
+        ):
+            return None
+        response_time = miner_data.get("response_time", 500)
+        if response_time < 10:
+            response_time_score = 100
+        elif response_time < 20:
+            response_time_score = 50
+        elif response_time < 30:
+            response_time_score = 20
+        total_score = bounded_score * 100 * 0.7 + response_time_score * 0.3
+    miner_data = miner_db_response.get(miner_uid, {})
+    return {
+        "request_id": req.name,
+        "miner_id": miner_uid,
+        "hotkey": self.metagraph.hotkeys[miner_uid],
+        "coldkey": self.metagraph.coldkeys[miner_uid],
+        "prompt": req.prompt,
+        "response": miner_data.get("response_text", ""),
+        "base_response": req.base_response,
+        "response_time": miner_data.get("response_time", 500),
+        "response_time_score": response_time_score,
+        "quality_score": bounded_score * 100,
+        "total_score": total_score,
+    }
+
+
+def ingest_judge_records(
+    self: validator.Validator,
+    req,
+    records: list[str],
+    metadata: dict,
+    miner_db_response: dict,
+    miner_scores: dict,
+    scores: dict[int, float] | None = None,
+) -> tuple[list[dict], set[int]]:
+    """
+    Applies judge result records (JSON lines in the OpenAI batch output format) and
+    judge `scores` computed locally, by UID, to the miners of a request, then fans
+    cached scores out to miners whose responses were deduplicated, triaged or
+    clustered instead of judged.
+
+    Returns:
+        tuple[list[dict], set[int]]: The judged response records, and the UIDs that
+            were handled (scored or blacklisted).
+    """
+    judged_responses = []
+    scored_miner_uids = set()
+
+    def apply_score(miner_uid: int, score: float):
+        scored_miner_uids.add(miner_uid)
+        judged_response = score_miner_response(
+            self, req, miner_uid, score, miner_db_response
+        )
+        if judged_response is None:
+            return
+        judged_responses.append(judged_response)
+        miner_scores[miner_uid] = (
+            miner_scores.get(miner_uid, 0.0) + judged_response["total_score"]
+        )
+
+    def apply_judge_score(miner_uid: int, score: float):
+        miner_data = miner_db_response.get(miner_uid)
+        if (
+            self.judge_cache is not None
+            and miner_data is not None
+            and miner_data.get("response_text")
+        ):
+            self.judge_cache.put(
+                self.judge_cache.key(
+                    req.prompt,
+                    req.base_response,
+                    miner_data["response_text"],
+                ),
+                score,
+            )
+        apply_score(miner_uid, score)
+
+    for eval in records:
+        parsed_eval = json.loads(eval.strip())
+        custom_id = parsed_eval.get("custom_id", "")
+        if not custom_id or parsed_eval.get("response", {}).get("status_code") != 200:
+            continue
+        try:
+            parsed_miners = metadata[custom_id].split(",")
+            miner_evaluation = (
+                parsed_eval.get("response", "")
+                .get("body")
+                .get("choices")[0]
+                .get("message")
+                .get("content")
+            )
+            result = json.loads(miner_evaluation.strip())
+            record_scores = result.get(
+                "scores",
+                [0.0] * len(parsed_miners),
+            )
+            for score, miner_uid in zip(
+                record_scores,
+                parsed_miners,
+            ):
+                apply_judge_score(int(miner_uid), score)
+        except Exception as e:
+            bt.logging.error(f"Error parsing judge JSON: {e}, content: {parsed_eval}")
+            bt.logging.error(traceback.format_exc())
+    for miner_uid, score in (scores or {}).items():
+        apply_judge_score(miner_uid, score)
+
+    # Fan cached scores back out to miners whose responses were not sent to the judge.
+    if self.judge_cache is not None:
+        for miner_uid, miner_data in miner_db_response.items():
+            if miner_uid in scored_miner_uids or not miner_data.get("response_text"):
+                continue
+            score, aliased = self.judge_cache.lookup(
+                self.judge_cache.key(
+                    req.prompt,
+                    req.base_response,
+                    miner_data["response_text"],
+                )
+            )
+            if score is None:
+                continue
+            if aliased and score > 0 and self.config.near_duplicate.policy == "zero":
+                score = 0.0
+            apply_score(miner_uid, score)
+        self.judge_cache.save()
+
+    return judged_responses, scored_miner_uids
+
+
+def process_time(resp: InferenceSynapse) -> float | None:
+    try:
+        return float(resp.dendrite.process_time)
+    except (TypeError, ValueError):
+        return None
+
+
+def assign_batches(
+    self: validator.Validator,
+    prompt: str,
+    base_response: str,
+    responses: list[InferenceSynapse],
+    miner_uids: list[int],
+    batch_info: list[tuple[list[dict], dict]],
+) -> list[int | None]:
+    """
+    Finds the batch whose results score each response. Responses sent to the judge
+    belong to their batch. Responses left out of the batches because they duplicate
+    a response sent to the judge belong to its batch, so the judge cache can fan its
+    score out to them when that batch is ingested.
+
+    Returns:
+        list[int | None]: The index in `batch_info` of the batch of each response,
+            or None if no batch scores it.
+    """
+    batch_of_uid = {}
+    for index, (_, batch_metadata) in enumerate(batch_info):
+        for uids in batch_metadata.values():
+            for uid in uids.split(","):
+                batch_of_uid[int(uid)] = index
+
+    representatives = {}
+    if self.near_duplicate_index is not None:
+        for cluster in getattr(self, "duplicate_clusters", []):
+            for uid in cluster["members"]:
+                representatives[uid] = cluster["representative"]
+
+    keys = []
+    batch_of_key = {}
+    if self.judge_cache is not None:
+        keys = [
+            self.judge_cache.key(prompt, base_response, resp.output)
+            for resp in responses
+        ]
+        for key, uid in zip(keys, miner_uids, strict=True):
+            if uid in batch_of_uid:
+                batch_of_key.setdefault(key, batch_of_uid[uid])
+
+    batches = []
+    for i, uid in enumerate(miner_uids):
+        batch = batch_of_uid.get(uid)
+        if batch is None:
+            batch = batch_of_uid.get(representatives.get(uid))
+        if batch is None and keys:
+            batch = batch_of_key.get(keys[i])
+        batches.append(batch)
+    return batches
+
+
+def responses_by_uid(
+    responses: list[InferenceSynapse], miner_uids: list[int]
+) -> dict[int, dict]:
+    """In-memory equivalent of the stored miner responses of a request."""
+    return {
+        miner_uid: {
+            "response_text": resp.output,
+            "response_time": process_time(resp),
+        }
+        for resp, miner_uid in zip(responses, miner_uids, strict=True)
+    }
+
+
+async def run_local_judge(
+    self: validator.Validator,
+    request_id: str,
+    prompt: str,
+    base_response: str,
+    responses: list[InferenceSynapse],
+    miner_uids: list[int],
+    skip_uids: set[int],
+    miner_scores: dict,
+) -> set[int]:
+    """
+    Scores the round with the local judge backend and ingests the scores right away,
+    instead of queueing batches for the OpenAI judge.
+
+    Returns:
+        set[int]: The UIDs that were scored.
+    """
+    texts = [
+        None if uid in skip_uids else resp.output
+        for resp, uid in zip(responses, miner_uids, strict=True)
+    ]
+    start = time.perf_counter()
+    judge_scores = await self.evals.judge_responses(
+        prompt, base_response, texts, self.config
+    )
+    bt.logging.info(
+        f"Local judge scored {sum(1 for t in texts if t)} responses in "
+        f"{time.perf_counter() - start:.1f}s"
+    )
+    scores = {
+        uid: score
+        for uid, text, score in zip(miner_uids, texts, judge_scores, strict=True)
+        if text
+    }
+    req = SimpleNamespace(
+        name=f"{request_id}_local", prompt=prompt, base_response=base_response
+    )
+    judged_responses, handled_uids = ingest_judge_records(
+        self,
+        req,
+        [],
+        {},
+        responses_by_uid(responses, miner_uids),
+        miner_scores,
+        scores=scores,
+    )
+    if judged_responses:
+        self.ready_to_set_weights = True
+        self.wandb_logger.log_evaluation_round(prompt, req.name, judged_responses)
+        self.wandb_logger.create_summary_dashboard()
+    return handled_uids
+
+
+def resolve_cached_scores(
+    self: validator.Validator,
+    request_id: str,
+    prompt: str,
+    base_response: str,
+    responses: list[InferenceSynapse],
+    miner_uids: list[int],
+    uids: list[int],
+    miner_scores: dict,
+) -> set[int]:
+    """
+    Scores the responses of `uids`, which no judge batch scores (cached, triaged or
+    duplicates of an earlier judged response), from the judge cache right away, like
+    the local judge and the fast lane do.
+
+    Returns:
+        set[int]: The UIDs that were scored.
+    """
+    stored = responses_by_uid(responses, miner_uids)
+    req = SimpleNamespace(
+        name=f"{request_id}_cached", prompt=prompt, base_response=base_response
+    )
+    judged_responses, handled_uids = ingest_judge_records(
+        self,
+        req,
+        [],
+        {},
+        {uid: stored[uid] for uid in uids},
+        miner_scores,
+    )
+    if judged_responses:
+        self.ready_to_set_weights = True
+        self.wandb_logger.log_evaluation_round(prompt, req.name, judged_responses)
+        self.wandb_logger.create_summary_dashboard()
+    return handled_uids
+
+
+async def run_fast_lane(
+    self: validator.Validator,
+    request_id: str,
+    prompt: str,
+    base_response: str,
+    responses: list[InferenceSynapse],
+    miner_uids: list[int],
+    batch_info: list[tuple[list[dict], dict]],
+    miner_scores: dict,
+) -> tuple[list[tuple[list[dict], dict]], set[int]]:
+    """
+    Routes this round's judge requests through the judge scheduler. Fast-lane requests
+    are judged right away and ingested like batch results; requests that stay on (or
+    fall back to) the batch lane are returned for queueing.
+
+    Returns:
+        tuple[list[tuple[list[dict], dict]], set[int]]: The batches left for the batch
+            API, and the UIDs already scored by the fast lane.
+    """
+    deadline = None
+    if self.config.judge.deadline_minutes > 0:
+        deadline = self.config.judge.deadline_minutes * 60
+    batch_queue_depth = await count_pending_requests()
+
+    remaining_batches = []
+    records = []
+    metadata = {}
+    for batch_requests, batch_metadata in batch_info:
+        realtime, batch = self.judge_scheduler.route(
+            batch_requests, deadline=deadline, batch_queue_depth=batch_queue_depth
+        )
+        if realtime:
+            realtime_records, failed = await self.judge_scheduler.run_realtime(realtime)
+            records.extend(realtime_records)
+            batch.extend(failed)
+        metadata.update(batch_metadata)
+        if batch:
+            remaining_batches.append(
+                (batch, {r["custom_id"]: batch_metadata[r["custom_id"]] for r in batch})
+            )
+    if not records:
+        return remaining_batches, set()
+
+    bt.logging.info(
+        f"Fast lane judged {len(records)} requests, "
+        f"{self.judge_scheduler.tokens_spent()} tokens spent in the last hour"
+    )
+    req = SimpleNamespace(
+        name=f"{request_id}_realtime", prompt=prompt, base_response=base_response
+    )
+    judged_responses, handled_uids = ingest_judge_records(
+        self,
+        req,
+        records,
+        metadata,
+        responses_by_uid(responses, miner_uids),
+        miner_scores,
+    )
+    if judged_responses:
+        self.ready_to_set_weights = True
+        self.wandb_logger.log_evaluation_round(prompt, req.name, judged_responses)
+        self.wandb_logger.create_summary_dashboard()
+    return remaining_batches, handled_uids
+
+
+def triage_responses(
+    self: validator.Validator,
+    prompt: str,
+    base_response: str,
+    responses: list[InferenceSynapse],
+    miner_uids: list[int],
+) -> set[int]:
+    """
+    Scores responses with no usable content (empty, too short, too long) locally as 0
+    and stores the score in the judge cache, from which `resolve_cached_scores` picks
+    it up in the same round.
+
+    Returns:
+        set[int]: UIDs whose responses should not be sent to the judge.
+    """
+    self.triage.start_round()
+    verdicts = self.triage.triage(base_response, [resp.output for resp in responses])
+    skip_uids = set()
+    for i, (rule, score) in verdicts.items():
+        skip_uids.add(miner_uids[i])
+        if rule == "empty":
+            continue
+        self.judge_cache.put(
+            self.judge_cache.key(prompt, base_response, responses[i].output), score
+        )
+        bt.logging.debug(f"Triaged miner {miner_uids[i]} as {rule}: {score}")
+    bt.logging.info(
+        f"Triage short-circuited: {dict(self.triage.counts)}, "
+        f"flagged for the judge: {dict(self.triage.flags)}"
+    )
+    return skip_uids
+
+
+def group_near_duplicates(
+    self: validator.Validator,
+    prompt: str,
+    base_response: str,
+    responses: list[InferenceSynapse],
+    miner_uids: list[int],
+    skip_uids: set[int] | None = None,
+) -> set[int]:
+    """
+    Clusters near-duplicate responses of this round and aliases every duplicate to
+    its cluster representative in the judge cache, so only the representative is
+    judged. The clusters are kept on `self.duplicate_clusters` for scoring policy.
+
+    Returns:
+        set[int]: UIDs whose responses should not be sent to the judge.
+    """
+    texts = [
+        None if skip_uids and uid in skip_uids else resp.output
+        for resp, uid in zip(responses, miner_uids, strict=True)
+    ]
+    keys = [self.judge_cache.key(prompt, base_response, text) for text in texts]
+    priority = []
+    for resp in responses:
+        try:
+            priority.append(float(resp.dendrite.process_time))
+        except (TypeError, ValueError):
+            priority.append(float("inf"))
+
+    start = time.perf_counter()
+    clusters = self.near_duplicate_index.cluster(texts, priority)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    skip_uids = set()
+    self.duplicate_clusters = []
+    for cluster in clusters:
+        # The representative is always judged; only its duplicates are aliased.
+        for i in cluster.duplicates:
+            self.judge_cache.alias(keys[i], keys[cluster.representative])
+            skip_uids.add(miner_uids[i])
+        self.duplicate_clusters.append(
+            {
+                "representative": miner_uids[cluster.representative],
+                "members": [miner_uids[i] for i in cluster.members],
+                "similarity": cluster.similarity,
+            }
+        )
+    bt.logging.info(
+        f"Near-duplicate clustering took {elapsed_ms:.1f}ms: {len(clusters)} clusters, "
+        f"{len(skip_uids)} responses not sent to the judge"
+    )
+    return skip_uids
 
 
 async def forward(self: validator.Validator):
@@ -51,7 +526,7 @@ async def forward(self: validator.Validator):
     # Define how the validator selects a miner to query, how often, etc.
     # get_random_uids is an example method, but you can replace it with your own.
     try:
-        miner_uids = filter_uids(self)
+        miner_uids = get_available_uids(self, self.config.neuron.sample_size)
         # The dendrite client queries the network.
         prompt_for_vali = """<|begin_of_text|><|start_header_id|>system<|end_header_id|>  
     You are a compassionate mental health assistant.  
@@ -93,16 +568,66 @@ async def forward(self: validator.Validator):
         bt.logging.info(
             f"Received total responses: {len(responses)}, batching them and queueing them to openai"
         )
+        self.miner_sampler.record(
+            miner_uids,
+            [resp.is_success and bool(resp.output) for resp in responses],
+            [process_time(resp) for resp in responses],
+        )
+        miner_scores = {}
         if responses:
-            batch_info = self.batch_evals.create_batch(
-                prompt,
-                base_response,
-                request_id,
-                responses,
-                MAX_TOKENS_PER_RESPONSE,
-                miner_uids.tolist(),
-            )
-            bt.logging.info(f"Creating {len(batch_info)} batches")
+            skip_uids = set()
+            if self.judge_cache is not None:
+                self.judge_cache.start_round()
+                if self.triage is not None:
+                    skip_uids |= triage_responses(
+                        self, prompt, base_response, responses, miner_uids.tolist()
+                    )
+                if self.near_duplicate_index is not None:
+                    skip_uids |= group_near_duplicates(
+                        self,
+                        prompt,
+                        base_response,
+                        responses,
+                        miner_uids.tolist(),
+                        skip_uids=skip_uids,
+                    )
+            if self.batch_evals is None:
+                batch_info = []
+                handled_uids = await run_local_judge(
+                    self,
+                    request_id,
+                    prompt,
+                    base_response,
+                    responses,
+                    miner_uids.tolist(),
+                    skip_uids,
+                    miner_scores,
+                )
+            else:
+                batch_info = self.batch_evals.create_batch(
+                    prompt,
+                    base_response,
+                    request_id,
+                    responses,
+                    MAX_TOKENS_PER_RESPONSE,
+                    miner_uids.tolist(),
+                    skip_uids=skip_uids,
+                )
+                bt.logging.info(f"Creating {len(batch_info)} batches")
+                handled_uids = set()
+            if self.judge_cache is not None:
+                bt.logging.info(f"Judge cache stats: {self.judge_cache.round_stats}")
+            if self.judge_scheduler is not None and batch_info:
+                batch_info, handled_uids = await run_fast_lane(
+                    self,
+                    request_id,
+                    prompt,
+                    base_response,
+                    responses,
+                    miner_uids.tolist(),
+                    batch_info,
+                    miner_scores,
+                )
             openai_batch_ids = []
             for i, (batch_requests, batch_metadata) in enumerate(batch_info):
                 bt.logging.info(f"Processing batch {i + 1}/{len(batch_info)}")
@@ -113,45 +638,61 @@ async def forward(self: validator.Validator):
                 )
                 openai_batch_ids.append(openai_batch_response.id)
 
-            for batch_id in openai_batch_ids:
-                new_request = add_request(
-                    name=f"{request_id}_{batch_id}",  # Make unique names
-                    openai_batch_id=batch_id,
-                    prompt=prompt,
-                    base_response=base_response,
+            # One request per queued batch; every response is linked to the batch
+            # that scores it.
+            response_batches = assign_batches(
+                self, prompt, base_response, responses, miner_uids.tolist(), batch_info
+            )
+            if self.batch_evals is not None and self.judge_cache is not None:
+                handled_uids |= resolve_cached_scores(
+                    self,
+                    request_id,
+                    prompt,
+                    base_response,
+                    responses,
+                    miner_uids.tolist(),
+                    [
+                        uid
+                        for uid, batch in zip(
+                            miner_uids.tolist(), response_batches, strict=True
+                        )
+                        if batch is None and uid not in handled_uids
+                    ],
+                    miner_scores,
                 )
-
-            miner_responses = []
-            for resp, miner_uid in zip(responses, miner_uids.tolist()):
-                miner_responses.append(
-                    MinerResponse(
-                        request_id=new_request.id,
-                        miner_id=miner_uid,
-                        response_text=resp.output,
-                        response_time=resp.dendrite.process_time,
+            await add_round(
+                requests=[
+                    {
+                        "name": f"{request_id}_{batch_id}",  # Make unique names
+                        "openai_batch_id": batch_id,
+                        "prompt": prompt,
+                        "base_response": base_response,
+                    }
+                    for batch_id in openai_batch_ids
+                ],
+                responses=[
+                    {
+                        "request": batch,
+                        "miner_id": miner_uid,
+                        "response_text": resp.output,
+                        "response_time": process_time(resp),
+                    }
+                    for resp, miner_uid, batch in zip(
+                        responses, miner_uids.tolist(), response_batches, strict=True
                     )
-                )
-            add_bulk_responses(responses=miner_responses)
+                    # Only responses waiting for a judge batch; the others are
+                    # scored already.
+                    if batch is not None and miner_uid not in handled_uids
+                ],
+            )
 
-        ready_requests = get_ready_requests()
         elapsed_time_since_start = time.time() - self.start_time
-        if ready_requests:
-            self.ready_to_set_weights = True
-            processed_request_ids = []
-            miner_scores = {}
-            bt.logging.info(
-                f"Found {len(ready_requests)} requests ready for processing."
-            )
-            for req in ready_requests:
+        processed_request_ids = []
+        if self.batch_evals is not None:
+            # Streamed, so requests piling up during downtime are never all in memory.
+            async for req in iter_ready_requests():
+                processed_request_ids.append(req.id)
                 judged_responses = []
-                miner_db_response = {
-                    item.miner_id: {
-                        "response_text": item.response_text,
-                        "response_time": item.response_time,
-                    }
-                    for item in req.responses
-                }
-
                 bt.logging.info(
                     f"Processing batch request {req.openai_batch_id} created at {req.created_at} with prompt: {req.prompt}"
                 )
@@ -159,115 +700,27 @@ async def forward(self: validator.Validator):
                     batch_id=req.openai_batch_id
                 )
                 if openai_batch:
-                    processed_request_ids.append(req.id)
-                    for eval in openai_batch:
-                        parsed_eval = json.loads(eval.strip())
-                        custom_id = parsed_eval.get("custom_id", "")
-                        if (
-                            custom_id
-                            and parsed_eval.get("response", "").get("status_code")
-                            == 200
-                        ):
-                            parsed_miners = batch_info.metadata[custom_id].split(",")
-                            miner_evaluation = (
-                                parsed_eval.get("response", "")
-                                .get("body")
-                                .get("choices")[0]
-                                .get("message")
-                                .get("content")
-                            )
-                        try:
-                            result = json.loads(miner_evaluation.strip())
-                            scores = result.get(
-                                "scores",
-                                [0.0] * len(parsed_miners),
-                            )
-                            for score, miner_uid in zip(
-                                scores,
-                                parsed_miners,
-                            ):
-                                if score == -1:
-                                    bt.logging.info(f"Blacklisting miner {miner_uid}")
-                                    blacklist_hotkey(
-                                        wallet=self.wallet,
-                                        blacklisted_coldkey=self.metagraph.coldkeys[
-                                            int(miner_uid)
-                                        ],
-                                        blacklisted_hotkey=self.metagraph.hotkeys[
-                                            int(miner_uid)
-                                        ],
-                                        uid=miner_uid,
-                                        base_url=self.config.pool_mining.url,
-                                    )
-                                    continue
-                                response_time_score = 0
-                                miner_uid = int(miner_uid)
-                                bounded_score = max(0.0, min(1.0, float(score)))
-                                if bounded_score <= 0.2:
-                                    total_score = 0.0
-                                elif bounded_score > 0.2:
-                                    miner_data = miner_db_response.get(miner_uid)
-                                    if (
-                                        miner_data is None
-                                        or not miner_data.get("response_text")
-                                        or miner_data.get("response_time") is None
-                                    ):
-                                        continue
-                                    if (
-                                        miner_db_response.get(miner_uid).get(
-                                            "response_time", 500
-                                        )
-                                        < 10
-                                    ):
-                                        response_time_score = 100
-                                    elif (
-                                        miner_db_response.get(miner_uid).get(
-                                            "response_time", 500
-                                        )
-                                        < 20
-                                    ):
-                                        response_time_score = 50
-                                    elif (
-                                        miner_db_response.get(miner_uid).get(
-                                            "response_time", 500
-                                        )
-                                        < 30
-                                    ):
-                                        response_time_score = 20
-                                    total_score = (
-                                        bounded_score * 100 * 0.7
-                                        + response_time_score * 0.3
-                                    )
-                                judged_responses.append(
-                                    {
-                                        "request_id": req.name,
-                                        "miner_id": miner_uid,
-                                        "hotkey": self.metagraph.hotkeys[miner_uid],
-                                        "coldkey": self.metagraph.coldkeys[miner_uid],
-                                        "prompt": req.prompt,
-                                        "response": miner_db_response[miner_uid].get(
-                                            "response_text", ""
-                                        ),
-                                        "base_response": req.base_response,
-                                        "response_time": miner_db_response[
-                                            miner_uid
-                                        ].get("response_time", 500),
-                                        "response_time_score": response_time_score,
-                                        "quality_score": bounded_score * 100,
-                                        "total_score": total_score,
-                                    }
-                                )
-
-                                miner_scores[miner_uid] = (
-                                    miner_scores.get(miner_uid, 0.0) + total_score
-                                )
-                        except Exception as e:
-                            bt.logging.error(
-                                f"Error parsing judge JSON: {e}, content: {parsed_eval}"
-                            )
-                            bt.logging.error(traceback.format_exc())
-                else:
-                    processed_request_ids.append(req.id)
+                    # Only the texts of the request being scored are loaded.
+                    texts = await get_response_texts(
+                        response_ids=[
+                            item.id for item in req.responses if item.has_text
+                        ]
+                    )
+                    miner_db_response = {
+                        item.miner_id: {
+                            "response_text": texts.get(item.id, ""),
+                            "response_time": item.response_time,
+                        }
+                        for item in req.responses
+                    }
+                    judged_responses, _ = ingest_judge_records(
+                        self,
+                        req,
+                        openai_batch,
+                        batch_info.metadata,
+                        miner_db_response,
+                        miner_scores,
+                    )
                 if judged_responses:
                     self.wandb_logger.log_evaluation_round(
                         prompt, req.name, judged_responses
@@ -276,29 +729,33 @@ async def forward(self: validator.Validator):
                 else:
                     bt.logging.warning(f"No responses received for request {req.name}")
 
+        if processed_request_ids:
+            self.ready_to_set_weights = True
+            bt.logging.info(
+                f"Processed {len(processed_request_ids)} requests ready for processing."
+            )
             if miner_scores:
                 rewarded_miner_ids = list(miner_scores.keys())
                 reward_scores = np.array(list(miner_scores.values()))
-                pool_miners = fetch_pool_miners()
-                unique_pool_miner_uids = set([p["uid"] for p in pool_miners])
-                pool_uids_indexes = [
-                    i
-                    for i, uid in enumerate(rewarded_miner_ids)
-                    if uid in unique_pool_miner_uids
-                ]
-                reward_scores = [reward_scores[i] for i in pool_uids_indexes]
-                rewarded_miner_ids = [rewarded_miner_ids[i] for i in pool_uids_indexes]
+                pool_miner_uids = await self.pool_api.pool_miner_uids()
+                in_pool = np.fromiter(
+                    (uid in pool_miner_uids for uid in rewarded_miner_ids),
+                    dtype=bool,
+                    count=len(rewarded_miner_ids),
+                )
+                reward_scores = reward_scores[in_pool]
+                rewarded_miner_ids = np.asarray(rewarded_miner_ids)[in_pool].tolist()
 
                 # self.update_scores(reward_scores, rewarded_miner_ids)
                 # bt.logging.info(
                 #     f"Updated scores for miners: keys: {rewarded_miner_ids}, values: {reward_scores}"
                 # )
             if processed_request_ids:
-                delete_requests(request_ids=processed_request_ids)
+                await delete_requests(request_ids=processed_request_ids)
                 bt.logging.info(
                     f"Deleted processed requests with IDs: {processed_request_ids}"
                 )
-        elif elapsed_time_since_start < 24 * 60 * 60:
+        elif not miner_scores and elapsed_time_since_start < 24 * 60 * 60:
             # bt.logging.info(
             #     f"No requests ready for processing yet and less than 24 hours since start, so copying weights from vali {self.config.copy_validator.uid}."
             # )
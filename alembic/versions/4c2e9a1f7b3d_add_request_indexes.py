@@ -0,0 +1,35 @@
+"""add_request_indexes
+
+Revision ID: 4c2e9a1f7b3d
+Revises: bbc21b4cd363
+Create Date: 2026-10-19 10:12:41.208355
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4c2e9a1f7b3d"
+down_revision: Union[str, Sequence[str], None] = "bbc21b4cd363"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_requests_created_at", "requests", ["created_at"], unique=False)
+    op.create_index(
+        op.f("ix_miner_responses_request_id"),
+        "miner_responses",
+        ["request_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_miner_responses_request_id"), table_name="miner_responses")
+    op.drop_index("ix_requests_created_at", table_name="requests")
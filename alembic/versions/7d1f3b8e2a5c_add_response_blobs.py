@@ -0,0 +1,135 @@
+"""add_response_blobs
+
+Revision ID: 7d1f3b8e2a5c
+Revises: 4c2e9a1f7b3d
+Create Date: 2026-10-19 16:40:12.583021
+
+"""
+
+import hashlib
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d1f3b8e2a5c"
+down_revision: Union[str, Sequence[str], None] = "4c2e9a1f7b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "response_blobs",
+        sa.Column("hash", sa.LargeBinary(length=32), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.add_column(
+        "miner_responses",
+        sa.Column("response_hash", sa.LargeBinary(length=32), nullable=True),
+    )
+
+    # Move the texts to the blobs, a batch of responses at a time.
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, response_text FROM miner_responses "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        blobs = {}
+        updates = []
+        for row in rows:
+            if not row.response_text:
+                continue
+            data = row.response_text.encode()
+            digest = hashlib.sha256(data).digest()
+            if digest not in blobs:
+                blobs[digest] = {
+                    "hash": digest,
+                    "data": zlib.compress(data, 6),
+                    "size": len(data),
+                }
+            updates.append({"id": row.id, "response_hash": digest})
+        if blobs:
+            connection.execute(
+                sa.text(
+                    "INSERT OR IGNORE INTO response_blobs (hash, data, size) "
+                    "VALUES (:hash, :data, :size)"
+                ),
+                list(blobs.values()),
+            )
+            connection.execute(
+                sa.text(
+                    "UPDATE miner_responses SET response_hash = :response_hash "
+                    "WHERE id = :id"
+                ),
+                updates,
+            )
+
+    with op.batch_alter_table("miner_responses") as batch_op:
+        batch_op.drop_column("response_text")
+        batch_op.create_foreign_key(
+            "fk_miner_responses_response_hash",
+            "response_blobs",
+            ["response_hash"],
+            ["hash"],
+        )
+        batch_op.create_index(
+            op.f("ix_miner_responses_response_hash"), ["response_hash"], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        "miner_responses", sa.Column("response_text", sa.Text(), nullable=True)
+    )
+    connection = op.get_bind()
+    last_hash = b""
+    while True:
+        blobs = connection.execute(
+            sa.text(
+                "SELECT hash, data FROM response_blobs "
+                "WHERE hash > :last_hash ORDER BY hash LIMIT :limit"
+            ),
+            {"last_hash": last_hash, "limit": BATCH_SIZE},
+        ).all()
+        if not blobs:
+            break
+        last_hash = blobs[-1].hash
+        connection.execute(
+            sa.text(
+                "UPDATE miner_responses SET response_text = :text "
+                "WHERE response_hash = :hash"
+            ),
+            [
+                {"text": zlib.decompress(blob.data).decode(), "hash": blob.hash}
+                for blob in blobs
+            ],
+        )
+    with op.batch_alter_table("miner_responses") as batch_op:
+        batch_op.drop_index(op.f("ix_miner_responses_response_hash"))
+        batch_op.drop_constraint("fk_miner_responses_response_hash", type_="foreignkey")
+        batch_op.drop_column("response_hash")
+    op.drop_table("response_blobs")
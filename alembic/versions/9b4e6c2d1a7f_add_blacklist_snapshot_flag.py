@@ -0,0 +1,47 @@
+"""add_blacklist_snapshot_flag
+
+Revision ID: 9b4e6c2d1a7f
+Revises: 7d1f3b8e2a5c
+Create Date: 2026-10-19 18:05:37.416290
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b4e6c2d1a7f"
+down_revision: Union[str, Sequence[str], None] = "7d1f3b8e2a5c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SNAPSHOT_REASON = "pool_api_snapshot"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "blacklisted_miners",
+        sa.Column(
+            "in_pool_snapshot",
+            sa.Boolean(),
+            server_default=sa.false(),
+            nullable=False,
+        ),
+    )
+    # Hotkeys with a row of their own were dropped from the snapshot; the next
+    # refresh of the blacklist flags them.
+    op.execute(
+        sa.text(
+            "UPDATE blacklisted_miners SET in_pool_snapshot = 1 WHERE reason = :reason"
+        ).bindparams(reason=SNAPSHOT_REASON)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("blacklisted_miners") as batch_op:
+        batch_op.drop_column("in_pool_snapshot")
@@ -1,16 +1,20 @@
 import json
 
 from openai import OpenAI
+from .cache import JudgeCache
 from .utils import count_and_clip_tokens
 import bittensor as bt
 from BetterTherapy.protocol import InferenceSynapse
 
 
 class OpenAIBatchLLMAsJudgeEval:
-    def __init__(self, api_key, judge_model="gpt-4o"):
+    def __init__(
+        self, api_key, judge_model="gpt-4o", judge_cache: JudgeCache | None = None
+    ):
         self.judge_client = OpenAI(api_key=api_key)
         self.judge_model = judge_model
         self.base_response = None
+        self.judge_cache = judge_cache
 
     def create_judge_prompt(
         self, prompt: str, base_response: str, responses: list[str]
@@ -60,11 +64,17 @@ class OpenAIBatchLLMAsJudgeEval:
         max_tokens_per_response: int,
         miner_uids: list[int],
         max_request_per_batch: int = 12,
+        skip_uids: set[int] | None = None,
     ) -> list[tuple[list[dict], dict]]:
         """
         Create batches of requests for the LLM judge.
         Each batch will not exceed 5500 words total.
         Returns a list of batches, where each batch is a list of request dicts.
+
+        If a judge cache is configured, only one copy of each distinct response is
+        sent to the judge and responses already scored in earlier rounds are skipped;
+        their scores are fanned back out when the results are ingested. Miners in
+        `skip_uids` (e.g. near-duplicates of another response) are not judged either.
         """
 
         all_batches = []
@@ -75,11 +85,14 @@ class OpenAIBatchLLMAsJudgeEval:
         max_token_per_batch = 6000  # 1000 tokens ~ 750 words
         batch_metadata = {}
         request_number = 1
+        # Numbers the requests across all batches, so custom_ids are unique in a round.
+        request_index = 1
+        seen_keys = set()
 
         def create_request():
             """Helper function to create a request from current batch"""
-            nonlocal request_number
-            custom_id = f"{request_id}_{request_number}"
+            nonlocal request_number, request_index
+            custom_id = f"{request_id}_{request_index}"
             request = {
                 "custom_id": custom_id,
                 "method": "POST",
@@ -110,6 +123,7 @@ class OpenAIBatchLLMAsJudgeEval:
             batch.append(request)
             batch_metadata[custom_id] = ",".join(map(str, current_batch_miner_uids))
             request_number += 1
+            request_index += 1
 
         for response, miner_uid in zip(responses, miner_uids, strict=False):
             if not response.output:
@@ -117,6 +131,17 @@ class OpenAIBatchLLMAsJudgeEval:
             response_token_count, individual_response = count_and_clip_tokens(
                 response.output, max_tokens_per_response
             )
+            if skip_uids and miner_uid in skip_uids:
+                if self.judge_cache is not None:
+                    self.judge_cache.record_deduplicated(response_token_count)
+                continue
+            if self.judge_cache is not None:
+                key = self.judge_cache.key(prompt, base_response, response.output)
+                if key in seen_keys or key in self.judge_cache:
+                    self.judge_cache.record_deduplicated(response_token_count)
+                    continue
+                seen_keys.add(key)
+                self.judge_cache.record_judged()
 
             if request_number > max_request_per_batch:
                 if current_batch_responses:
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+import bittensor as bt
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def hash_text(text: str | None) -> str:
+    """Returns a short, stable content hash for the given text."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:32]
+
+
+def normalize_response(text: str | None) -> str:
+    """
+    Normalizes a miner response so that template-identical outputs (differing only
+    in case or whitespace) hash to the same value.
+    """
+    return _WHITESPACE_RE.sub(" ", (text or "").strip().lower())
+
+
+class JudgeCache:
+    """
+    Caches judge scores keyed by (prompt hash, base response hash, normalized response hash).
+
+    Identical responses to the same prompt are sent to the judge once; when the judge
+    results are ingested the score is stored here and fanned back out to every miner
+    that produced the same response. Entries are evicted least-recently-used once
+    `max_entries` is reached, and expire after `ttl` seconds.
+
+    A key can also be aliased to another key, so near-duplicate responses that were
+    not judged themselves resolve to the score of their cluster representative.
+    """
+
+    def __init__(
+        self, path: str | None = None, max_entries: int = 50000, ttl: int = 72 * 60 * 60
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._aliases: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self.round_stats = {
+            "responses": 0,
+            "judged": 0,
+            "deduplicated": 0,
+            "tokens_saved": 0,
+        }
+        self.load()
+
+    @staticmethod
+    def key(prompt: str, base_response: str, response: str | None) -> str:
+        return ":".join(
+            (
+                hash_text(prompt),
+                hash_text(base_response),
+                hash_text(normalize_response(response)),
+            )
+        )
+
+    def _get_entry(self, key: str) -> float | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        score, created_at = entry
+        if time.time() - created_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return score
+
+    def lookup(self, key: str) -> tuple[float | None, bool]:
+        """
+        Returns the cached score for a key and whether it was resolved through an
+        alias rather than judged directly.
+        """
+        score = self._get_entry(key)
+        if score is not None:
+            return score, False
+        alias = self._aliases.get(key)
+        if alias is None:
+            return None, False
+        target, created_at = alias
+        if time.time() - created_at > self.ttl:
+            del self._aliases[key]
+            return None, False
+        return self._get_entry(target), True
+
+    def get(self, key: str) -> float | None:
+        return self.lookup(key)[0]
+
+    def put(self, key: str, score: float) -> None:
+        self._entries[key] = (float(score), time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def alias(self, key: str, target: str) -> None:
+        """Resolves `key` to the score stored for `target`."""
+        if key == target:
+            return
+        self._aliases[key] = (target, time.time())
+        self._aliases.move_to_end(key)
+        while len(self._aliases) > self.max_entries:
+            self._aliases.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start_round(self) -> None:
+        """Resets the per-round counters."""
+        self.round_stats = {
+            "responses": 0,
+            "judged": 0,
+            "deduplicated": 0,
+            "tokens_saved": 0,
+        }
+
+    def record_judged(self) -> None:
+        self.round_stats["responses"] += 1
+        self.round_stats["judged"] += 1
+
+    def record_deduplicated(self, tokens: int) -> None:
+        self.round_stats["responses"] += 1
+        self.round_stats["deduplicated"] += 1
+        self.round_stats["tokens_saved"] += tokens
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+            now = time.time()
+            for key, (score, created_at) in state.get("entries", []):
+                if now - created_at <= self.ttl:
+                    self._entries[key] = (score, created_at)
+            for key, (target, created_at) in state.get("aliases", []):
+                if now - created_at <= self.ttl:
+                    self._aliases[key] = (target, created_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            while len(self._aliases) > self.max_entries:
+                self._aliases.popitem(last=False)
+            bt.logging.info(
+                f"Loaded {len(self._entries)} judge cache entries from {self.path}"
+            )
+        except Exception as e:
+            bt.logging.warning(f"Failed to load judge cache from {self.path}: {e}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "entries": [[k, list(v)] for k, v in self._entries.items()],
+                        "aliases": [[k, list(v)] for k, v in self._aliases.items()],
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            bt.logging.warning(f"Failed to save judge cache to {self.path}: {e}")
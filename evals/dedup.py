@@ -0,0 +1,171 @@
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
+from .cache import normalize_response
+
+_HASH_SHIFT = np.uint64(32)
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+@dataclass
+class DuplicateCluster:
+    """
+    A group of near-duplicate responses.
+
+    `representative` and `members` are indices into the round's responses; the
+    representative is the one that gets judged.
+    """
+
+    representative: int
+    members: list[int]
+    similarity: float
+
+    @property
+    def duplicates(self) -> list[int]:
+        return [m for m in self.members if m != self.representative]
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index over miner responses.
+
+    Each response is shingled into word n-grams and reduced to a `num_perm` MinHash
+    signature. Signatures are split into `bands` buckets so only responses sharing a
+    bucket are compared, which keeps clustering sub-quadratic. Candidate pairs whose
+    estimated Jaccard similarity reaches `threshold` are merged into clusters.
+
+    Only responses of the same round are compared: prompts are generated anew every
+    round, and exact repeats across rounds are already caught by the judge cache.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.8,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Multiply-shift hashing: (a * x + b) mod 2**64, keeping the high 32 bits.
+        self._a = rng.randint(0, 1 << 62, size=(num_perm, 1), dtype=np.int64)
+        self._a = self._a.astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 1 << 62, size=(num_perm, 1), dtype=np.int64)
+        self._b = self._b.astype(np.uint64)
+
+    def _shingles(self, text: str, word_cache: dict[str, int]) -> np.ndarray:
+        """Hashes the word n-grams of a response, combining per-word hashes."""
+        words = normalize_response(text).split(" ")
+        hashes = []
+        for word in words:
+            word_hash = word_cache.get(word)
+            if word_hash is None:
+                word_hash = word_cache[word] = zlib.crc32(word.encode("utf-8"))
+            hashes.append(word_hash)
+        word_hashes = np.array(hashes, dtype=np.uint64)
+        size = min(self.shingle_size, len(words))
+        n_grams = len(words) - size + 1
+        grams = np.zeros(n_grams, dtype=np.uint64)
+        for offset in range(size):
+            grams = grams * _SHINGLE_MULTIPLIER + word_hashes[offset : offset + n_grams]
+        return grams
+
+    def signature(self, text: str) -> np.ndarray:
+        """Returns the MinHash signature of a response."""
+        return self.signatures([text])[0]
+
+    def signatures(self, texts: list[str]) -> np.ndarray:
+        """Returns the MinHash signatures of several responses in one pass."""
+        word_cache: dict[str, int] = {}
+        shingles = [self._shingles(text, word_cache) for text in texts]
+        offsets = np.cumsum([0] + [len(s) for s in shingles[:-1]])
+        hashed = (self._a * np.concatenate(shingles)[None, :] + self._b) >> _HASH_SHIFT
+        return np.minimum.reduceat(hashed, offsets, axis=1).T
+
+    def _similarity(self, sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        return float(np.count_nonzero(sig_a == sig_b)) / self.num_perm
+
+    def cluster(
+        self,
+        texts: list[str | None],
+        priority: list[float] | None = None,
+    ) -> list[DuplicateCluster]:
+        """
+        Groups near-duplicate responses of a round into clusters.
+
+        Args:
+            texts (list[str | None]): The responses; empty responses are ignored.
+            priority (list[float] | None): Lower values are preferred as the cluster
+                representative (e.g. response time). Defaults to response order.
+
+        Returns:
+            list[DuplicateCluster]: Clusters with more than one member.
+        """
+        indices = [i for i, text in enumerate(texts) if text]
+        if not indices:
+            return []
+        # Identical signatures are compared once.
+        signatures, inverse = np.unique(
+            self.signatures([texts[i] for i in indices]), axis=0, return_inverse=True
+        )
+        inverse = inverse.reshape(-1)
+
+        parent = list(range(len(signatures)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        # Band the signatures; only responses that share a bucket become candidates.
+        # Every pair of a bucket is a candidate, except pairs already clustered.
+        pair_similarity: dict[tuple[int, int], float] = {}
+        bands = signatures.reshape(len(signatures), self.bands, self.rows)
+        for band in range(self.bands):
+            buckets = defaultdict(list)
+            for row, band_hash in enumerate(bands[:, band, :]):
+                buckets[band_hash.tobytes()].append(row)
+            for bucket in buckets.values():
+                for a, i in enumerate(bucket):
+                    for j in bucket[a + 1 :]:
+                        if (i, j) in pair_similarity or find(i) == find(j):
+                            continue
+                        similarity = self._similarity(signatures[i], signatures[j])
+                        pair_similarity[i, j] = similarity
+                        if similarity >= self.threshold:
+                            parent[find(j)] = find(i)
+
+        groups = defaultdict(list)
+        for position, row in enumerate(inverse):
+            groups[find(row)].append(position)
+        lowest = {}
+        for (i, _), similarity in pair_similarity.items():
+            if similarity >= self.threshold:
+                root = find(i)
+                lowest[root] = min(similarity, lowest.get(root, 1.0))
+
+        order = priority if priority is not None else list(range(len(texts)))
+        clusters = []
+        for root, positions in groups.items():
+            if len(positions) < 2:
+                continue
+            members = [indices[p] for p in positions]
+            clusters.append(
+                DuplicateCluster(
+                    representative=min(members, key=lambda i: order[i]),
+                    members=sorted(members),
+                    similarity=lowest.get(root, 1.0),
+                )
+            )
+        return clusters
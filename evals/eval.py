@@ -11,7 +11,7 @@ class OpenAILLMAsJudgeEval:
         self.judge_model = judge_model
 
     async def judge_responses(
-        self, prompt: str, base_response: str, responses: list[str], config
+        self, prompt: str, base_response: str, responses: list[str], config=None
     ) -> list[float]:
         """
         Use LLM-as-Judge to determine numerical scores for each miner's response compared to the base response.
@@ -60,7 +60,7 @@ class OpenAILLMAsJudgeEval:
                 return [0.0] * len(responses)
         except Exception as e:
             bt.logging.error(f"LLM judge error: {e}")
-            if config.discord.webhook:
+            if config is not None and config.discord.webhook:
                 async with aiohttp.ClientSession() as session:
                     await session.post(
                         config.discord.webhook,
@@ -0,0 +1,14 @@
+from typing import Protocol
+
+
+class Judge(Protocol):
+    """
+    Interface shared by the judge backends in `evals/`.
+
+    A judge scores each response to `prompt` against `base_response` and returns one
+    score in [0, 1] per response, in order. Empty responses score 0.
+    """
+
+    async def judge_responses(
+        self, prompt: str, base_response: str, responses: list[str], config=None
+    ) -> list[float]: ...
@@ -0,0 +1,131 @@
+import asyncio
+
+import bittensor as bt
+import torch
+
+from .cache import JudgeCache
+
+JUDGE_INSTRUCTIONS = (
+    "You are a strict and fair judge for therapy responses. Rate how well the "
+    "therapist response answers the prompt, compared to the base response, from 0 "
+    "(useless or harmful) to 9 (excellent). A rating of 6 means the response is as "
+    "good as the base response."
+)
+
+
+class LocalLLMAsJudgeEval:
+    """
+    Judge backend that scores responses with a local HuggingFace causal LM, such as
+    the one loaded by `Validator.setup_model`, so no external service is needed.
+
+    Each response is rated in its own prompt. Instead of sampling a rating, a single
+    forward pass reads the next-token distribution over the digits 0-9 and the
+    expected rating is scaled to [0, 1], which makes the judge deterministic. Prompts
+    are run in batches of `batch_size` and scores are cached per distinct response.
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        batch_size: int = 8,
+        max_response_chars: int = 2000,
+        max_length: int = 2048,
+        judge_cache: JudgeCache | None = None,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.max_response_chars = max_response_chars
+        self.max_length = max_length
+        self.judge_cache = judge_cache if judge_cache is not None else JudgeCache()
+        self.digit_ids = [
+            tokenizer.encode(str(d), add_special_tokens=False)[-1] for d in range(10)
+        ]
+
+    def create_judge_prompt(
+        self, prompt: str, base_response: str, response: str
+    ) -> str:
+        return (
+            f"{JUDGE_INSTRUCTIONS}\n\n"
+            f"Prompt: {prompt}\n\n"
+            f"Base response: {base_response[: self.max_response_chars]}\n\n"
+            f"Therapist response: {response[: self.max_response_chars]}\n\n"
+            "Rating (0-9): "
+        )
+
+    def _device(self) -> torch.device:
+        try:
+            return next(self.model.parameters()).device
+        except (AttributeError, StopIteration):
+            return torch.device("cpu")
+
+    @torch.no_grad()
+    def _score_prompts(self, prompts: list[str]) -> list[float]:
+        """Returns the expected rating of each judge prompt, scaled to [0, 1]."""
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        # Left padding puts the last prompt token of every row at position -1.
+        padding_side = self.tokenizer.padding_side
+        self.tokenizer.padding_side = "left"
+        device = self._device()
+        digits = torch.arange(10, dtype=torch.float32)
+        scores = []
+        try:
+            for start in range(0, len(prompts), self.batch_size):
+                inputs = self.tokenizer(
+                    prompts[start : start + self.batch_size],
+                    padding=True,
+                    truncation=True,
+                    max_length=self.max_length,
+                    return_tensors="pt",
+                ).to(device)
+                logits = self.model(**inputs).logits[:, -1, self.digit_ids]
+                probs = torch.softmax(logits.float().cpu(), dim=-1)
+                scores.extend(((probs @ digits) / 9).tolist())
+        finally:
+            self.tokenizer.padding_side = padding_side
+        return scores
+
+    def score(
+        self, prompt: str, base_response: str, responses: list[str | None]
+    ) -> list[float]:
+        """Scores a round of responses, running inference only for uncached ones."""
+        scores = [0.0] * len(responses)
+        pending: dict[str, list[int]] = {}
+        for i, response in enumerate(responses):
+            if not response:
+                continue
+            key = self.judge_cache.key(prompt, base_response, response)
+            cached = self.judge_cache.get(key)
+            if cached is not None:
+                scores[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+
+        if pending:
+            keys = list(pending)
+            prompts = [
+                self.create_judge_prompt(
+                    prompt, base_response, responses[pending[key][0]]
+                )
+                for key in keys
+            ]
+            for key, score in zip(keys, self._score_prompts(prompts), strict=True):
+                self.judge_cache.put(key, score)
+                for i in pending[key]:
+                    scores[i] = score
+        return scores
+
+    async def judge_responses(
+        self, prompt: str, base_response: str, responses: list[str], config=None
+    ) -> list[float]:
+        """
+        Scores each response against the base response with the local model.
+        Returns a list of float scores (0-1).
+        """
+        try:
+            return await asyncio.to_thread(self.score, prompt, base_response, responses)
+        except Exception as e:
+            bt.logging.error(f"Local judge error: {e}")
+            return [0.0] * len(responses)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+import bittensor as bt
+from openai import OpenAI
+
+BATCH_COMPLETION_WINDOW = 24 * 60 * 60
+
+
+def estimate_request_tokens(request: dict) -> int:
+    """Rough token estimate of a judge request: ~4 characters per prompt token plus
+    the completion budget."""
+    body = request["body"]
+    prompt_chars = sum(len(m.get("content", "")) for m in body.get("messages", []))
+    return prompt_chars // 4 + body.get("max_tokens", 0)
+
+
+class JudgeScheduler:
+    """
+    Routes judge requests between the real-time chat completions API (fast lane) and
+    the 24h batch API (batch lane).
+
+    A request goes to the fast lane when its deadline is shorter than the batch
+    completion window, when too many batches are already pending, or when it is
+    sampled with probability `realtime_fraction`, as long as the hourly
+    `realtime_token_budget` allows it; requests that fail are refunded. Everything
+    else stays on the cheaper batch lane. Fast-lane results are returned as the same
+    JSON lines the batch API writes to its output file, so both lanes are ingested
+    by the same code.
+    """
+
+    def __init__(
+        self,
+        judge_client: OpenAI,
+        realtime_fraction: float = 0.05,
+        realtime_token_budget: int = 20000,
+        max_batch_queue_depth: int = 100,
+        max_concurrency: int = 4,
+        seed: int | None = None,
+    ):
+        self.judge_client = judge_client
+        self.realtime_fraction = realtime_fraction
+        self.realtime_token_budget = realtime_token_budget
+        self.max_batch_queue_depth = max_batch_queue_depth
+        self.max_concurrency = max_concurrency
+        self._rng = random.Random(seed)
+        self._spent: deque[tuple[float, int]] = deque()
+        # The budget entry of every routed fast-lane request, by custom_id.
+        self._charges: dict[str, tuple[float, int]] = {}
+
+    def tokens_spent(self) -> int:
+        """Estimated fast-lane tokens spent over the last hour."""
+        cutoff = time.time() - 60 * 60
+        while self._spent and self._spent[0][0] < cutoff:
+            self._spent.popleft()
+        return sum(tokens for _, tokens in self._spent)
+
+    def route(
+        self,
+        requests: list[dict],
+        deadline: float | None = None,
+        batch_queue_depth: int = 0,
+    ) -> tuple[list[dict], list[dict]]:
+        """
+        Splits judge requests into fast-lane and batch-lane requests.
+
+        Args:
+            requests (list[dict]): Batch API request dicts from `create_batch`.
+            deadline (float | None): Seconds within which the scores are needed.
+            batch_queue_depth (int): Number of batches still waiting for results.
+
+        Returns:
+            tuple[list[dict], list[dict]]: The fast-lane and batch-lane requests.
+        """
+        realtime, batch = [], []
+        spent = self.tokens_spent()
+        urgent = deadline is not None and deadline < BATCH_COMPLETION_WINDOW
+        backlogged = batch_queue_depth >= self.max_batch_queue_depth
+        for request in requests:
+            tokens = estimate_request_tokens(request)
+            wanted = urgent or backlogged or self._rng.random() < self.realtime_fraction
+            if wanted and spent + tokens <= self.realtime_token_budget:
+                realtime.append(request)
+                spent += tokens
+                charge = (time.time(), tokens)
+                self._spent.append(charge)
+                self._charges[request["custom_id"]] = charge
+            else:
+                batch.append(request)
+        return realtime, batch
+
+    def _complete(self, request: dict) -> tuple[str, bool]:
+        try:
+            completion = self.judge_client.chat.completions.create(**request["body"])
+            response = {"status_code": 200, "body": completion.model_dump()}
+        except Exception as e:
+            bt.logging.error(f"Real-time judge request failed: {e}")
+            response = {"status_code": 500, "body": {"error": str(e)}}
+        record = json.dumps({"custom_id": request["custom_id"], "response": response})
+        return record, response["status_code"] == 200
+
+    async def run_realtime(self, requests: list[dict]) -> tuple[list[str], list[dict]]:
+        """
+        Sends fast-lane requests to the chat completions API.
+
+        Returns:
+            tuple[list[str], list[dict]]: Result records in the batch output format,
+                and the requests that failed and should fall back to the batch lane.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def complete(request: dict) -> tuple[str, bool]:
+            async with semaphore:
+                return await asyncio.to_thread(self._complete, request)
+
+        results = await asyncio.gather(*(complete(r) for r in requests))
+        records = [record for record, ok in results if ok]
+        failed = []
+        for request, (_, ok) in zip(requests, results, strict=True):
+            charge = self._charges.pop(request["custom_id"], None)
+            if ok:
+                continue
+            failed.append(request)
+            # The batch lane judges it instead, so it does not count against the budget.
+            if charge is not None and charge in self._spent:
+                self._spent.remove(charge)
+        return records, failed
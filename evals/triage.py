@@ -0,0 +1,188 @@
+import re
+from collections import Counter
+from collections.abc import Callable
+
+import numpy as np
+
+# Common English function words; natural English prose is full of them.
+_ENGLISH_STOPWORDS = frozenset(
+    """a about after all also am an and any are as at be because been but by can
+    could did do does doing for from had has have having he her here him his how i
+    if in into is it its just me more most my no not now of on one or other our out
+    so some such than that the their them then there these they this those to too
+    up very was we were what when where which while who why will with would you
+    your yourself feel feeling help""".split()
+)
+
+# Function words of other common Latin-script languages that are not English words.
+_FOREIGN_STOPWORDS = frozenset(
+    """que el los las y es una por para del se lo como pero más muy está estás
+    también puedes sientes et est une pas pour dans qui sur au avec ce il elle ne
+    vous tu je les des du être très mais der und das ist nicht ich zu ein eine mit
+    sich auf für dem von du bist sie wir nao não uma com os você é che di della sono
+    questo anche""".split()
+)
+
+_INJECTION_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"\b(ignore|disregard|forget)\b.{0,40}\b(previous|prior|above|earlier|all)\b.{0,20}\b(instructions?|prompts?|rules)\b",
+        r"\byou are now\b.{0,40}\b(judge|evaluator|assistant|ai)\b",
+        r"\b(system|developer) prompt\b",
+        r"\b(give|assign)\b.{0,30}\b(this|my)\s+(response|answer|reply)\b.{0,30}\b(score|rating)\b",
+        r"[\"']scores?[\"']\s*:",
+        r"<\|[a-z_]+\|>",
+        r"\[/?(inst|system)\]",
+        r"#{2,}\s*(instruction|system)",
+    )
+]
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+EmbedFn = Callable[[list[str]], np.ndarray]
+
+
+class ResponseTriage:
+    """
+    Cheap local checks that score obvious miner responses before they are batched for
+    the judge, so paid judge tokens are only spent on ambiguous responses.
+
+    Responses with no usable content (empty, too short, too long, off topic) are
+    scored 0 locally. Non-English, unreadable and prompt-injection rules only flag a
+    response: a -1 blacklists the miner, and ordinary therapy text can match these
+    heuristics ("forget all the old rules you grew up with"), so that call stays with
+    the judge. Responses with no score are left for the judge. `counts` holds how
+    many responses each rule short-circuited since the last `start_round`, and
+    `flags` how many each rule flagged for the judge.
+    """
+
+    def __init__(
+        self,
+        min_words: int = 5,
+        max_chars: int = 20000,
+        min_latin_ratio: float = 0.5,
+        min_foreign_ratio: float = 0.1,
+        min_alpha_ratio: float = 0.5,
+        min_unique_word_ratio: float = 0.1,
+        embed_fn: EmbedFn | None = None,
+        min_similarity: float = 0.1,
+    ):
+        self.min_words = min_words
+        self.max_chars = max_chars
+        self.min_latin_ratio = min_latin_ratio
+        self.min_foreign_ratio = min_foreign_ratio
+        self.min_alpha_ratio = min_alpha_ratio
+        self.min_unique_word_ratio = min_unique_word_ratio
+        self.embed_fn = embed_fn
+        self.min_similarity = min_similarity
+        self.counts: Counter[str] = Counter()
+        self.total_counts: Counter[str] = Counter()
+        self.flags: Counter[str] = Counter()
+        self.total_flags: Counter[str] = Counter()
+
+    def start_round(self) -> None:
+        self.counts = Counter()
+        self.flags = Counter()
+
+    def classify(self, response: str | None) -> tuple[str, float | None] | None:
+        """
+        Runs the text heuristics on a single response.
+
+        Returns:
+            tuple[str, float | None] | None: The matching rule and its score, or None
+                if no rule matches. The score is None for rules that only flag the
+                response; it still needs the judge.
+        """
+        text = (response or "").strip()
+        if not text:
+            return "empty", 0.0
+        if len(text) > self.max_chars:
+            return "too_long", 0.0
+        words = [w.lower() for w in _WORD_RE.findall(text)]
+        if len(words) < self.min_words:
+            return "too_short", 0.0
+
+        for pattern in _INJECTION_PATTERNS:
+            if pattern.search(text):
+                return "injection", None
+
+        non_space = [ch for ch in text if not ch.isspace()]
+        alpha = [ch for ch in non_space if ch.isalpha()]
+        if len(alpha) < self.min_alpha_ratio * len(non_space):
+            return "unreadable", None
+        latin = sum(1 for ch in alpha if ord(ch) < 0x250)
+        if latin < self.min_latin_ratio * len(alpha):
+            return "non_english", None
+        english = sum(1 for w in words if w in _ENGLISH_STOPWORDS)
+        foreign = sum(1 for w in words if w in _FOREIGN_STOPWORDS)
+        if foreign > english and foreign >= self.min_foreign_ratio * len(words):
+            return "non_english", None
+        unique_words = len(set(words))
+        if len(words) >= 50 and unique_words < self.min_unique_word_ratio * len(words):
+            return "unreadable", None
+        return None
+
+    def triage(
+        self, base_response: str, responses: list[str | None]
+    ) -> dict[int, tuple[str, float]]:
+        """
+        Triages a round of responses.
+
+        Returns:
+            dict[int, tuple[str, float]]: Rule and score for each index of `responses`
+                that was scored locally.
+        """
+        verdicts = {}
+        for i, response in enumerate(responses):
+            verdict = self.classify(response)
+            if verdict is None:
+                continue
+            rule, score = verdict
+            if score is None:
+                self.flags[rule] += 1
+                self.total_flags[rule] += 1
+            else:
+                verdicts[i] = verdict
+
+        if self.embed_fn is not None:
+            pending = [i for i in range(len(responses)) if i not in verdicts]
+            if pending:
+                embeddings = self.embed_fn(
+                    [base_response] + [responses[i] for i in pending]
+                )
+                embeddings = embeddings / np.maximum(
+                    np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12
+                )
+                similarities = embeddings[1:] @ embeddings[0]
+                for i, similarity in zip(pending, similarities, strict=True):
+                    if similarity < self.min_similarity:
+                        verdicts[i] = ("off_topic", 0.0)
+
+        for rule, _ in verdicts.values():
+            self.counts[rule] += 1
+            self.total_counts[rule] += 1
+        return verdicts
+
+
+def build_embedder(model_name: str, device: str = "cpu") -> EmbedFn:
+    """
+    Returns a mean-pooled sentence embedding function backed by a HuggingFace encoder.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).to(device)
+    model.eval()
+
+    def embed(texts: list[str]) -> np.ndarray:
+        inputs = tokenizer(
+            texts, padding=True, truncation=True, max_length=512, return_tensors="pt"
+        ).to(device)
+        with torch.no_grad():
+            hidden = model(**inputs).last_hidden_state
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return pooled.float().cpu().numpy()
+
+    return embed
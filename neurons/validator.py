@@ -12,12 +12,23 @@ from ulid import api
 
 # import base validator class which takes care of most of the boilerplate
 from BetterTherapy.base.validator import BaseValidatorNeuron
+from BetterTherapy.db.connection import engine as db_engine
+from BetterTherapy.db.retention import RetentionJob
 
 # Bittensor Validator Template:
+from BetterTherapy.utils.api import PoolApiClient
+from BetterTherapy.utils.blacklist import BlacklistService
+from BetterTherapy.utils.health import AxonHealthProber
+from BetterTherapy.utils.sampler import MinerSampler
 from BetterTherapy.utils.wandb import SubnetEvaluationLogger
 from BetterTherapy.validator import forward
 from evals.eval import OpenAILLMAsJudgeEval
 from evals.batch import OpenAIBatchLLMAsJudgeEval
+from evals.cache import JudgeCache
+from evals.dedup import NearDuplicateIndex
+from evals.local import LocalLLMAsJudgeEval
+from evals.scheduler import JudgeScheduler
+from evals.triage import ResponseTriage, build_embedder
 
 
 class Validator(BaseValidatorNeuron):
@@ -32,14 +43,81 @@ class Validator(BaseValidatorNeuron):
     def __init__(self, config=None):
         super(Validator, self).__init__(config=config)  # noqa: UP008
 
-        bt.logging.info("load_state()")
-        self.load_state()
+        # First, so the one-time vacuum conversion runs before anything writes.
+        self.setup_retention()
         self.setup_wandb()
+        self.setup_pool_api()
+        self.setup_blacklist()
+        self.setup_sampler()
+        self.setup_health_prober()
         self.setup_model()
         self.setup_evals()
         self.setup_batch_evals()
         bt.logging.info(f"Validator initialized with uid: {self.uid}")
 
+    def setup_sampler(self):
+        self.miner_sampler = MinerSampler(
+            self.metagraph.n.item(),
+            coverage_rounds=self.config.neuron.coverage_rounds,
+        )
+        self.metagraph_tracker.subscribe(
+            lambda change: self.miner_sampler.sync(self.metagraph.hotkeys)
+        )
+
+    def setup_health_prober(self):
+        self.health_prober = None
+        if self.config.health_probe.off:
+            return
+        # The prober runs its own event loop, so it gets its own dendrite.
+        self.health_prober = AxonHealthProber(
+            bt.dendrite(wallet=self.wallet),
+            self.metagraph,
+            path=os.path.join(self.config.neuron.full_path, "axon_health.npz"),
+            interval=self.config.health_probe.interval,
+            timeout=self.config.health_probe.timeout,
+            max_concurrency=self.config.health_probe.concurrency,
+            max_failures=self.config.health_probe.max_failures,
+        )
+        self.metagraph_tracker.subscribe(
+            lambda change: self.health_prober.sync(self.metagraph.hotkeys)
+        )
+        self.health_prober.start()
+
+    def setup_retention(self):
+        self.retention_job = None
+        if self.config.retention.off:
+            return
+        self.retention_job = RetentionJob(
+            db_engine,
+            max_age_hours=self.config.retention.max_age_hours,
+            max_requests=self.config.retention.max_requests,
+            max_responses=self.config.retention.max_responses,
+            batch_size=self.config.retention.batch_size,
+            vacuum_pages=self.config.retention.vacuum_pages,
+            interval=self.config.retention.interval,
+        )
+        try:
+            self.retention_job.enable_incremental_vacuum()
+        except Exception as e:
+            bt.logging.error(f"Error enabling incremental vacuum: {e}")
+        self.retention_job.start()
+
+    def setup_pool_api(self):
+        self.pool_api = PoolApiClient(
+            self.config.pool_mining.url,
+            timeout=self.config.pool_mining.timeout,
+            retries=self.config.pool_mining.retries,
+            miners_ttl=self.config.pool_mining.miners_ttl,
+        )
+
+    def setup_blacklist(self):
+        self.blacklist_service = BlacklistService(
+            self.config.pool_mining.url,
+            ttl=self.config.pool_mining.blacklist_ttl,
+            client=self.pool_api,
+        )
+        self.blacklist_service.start()
+
     def setup_model(self):
         self.model_name = self.config.model.name
 
@@ -63,15 +141,60 @@ class Validator(BaseValidatorNeuron):
 
     def setup_batch_evals(self):
         api_key = self.config.openai.api_key
-        if api_key is None:
+        if api_key is None and self.config.judge.backend != "local":
             raise ValueError(
                 "OPENAI_API_KEY not set. Set it either in env(OPENAI_API_KEY) or using args --openai.api_key"
             )
+        self.judge_cache = None
+        if not self.config.judge_cache.off:
+            self.judge_cache = JudgeCache(
+                path=os.path.join(self.config.neuron.full_path, "judge_cache.json"),
+                max_entries=self.config.judge_cache.max_entries,
+                ttl=self.config.judge_cache.ttl_hours * 60 * 60,
+            )
+        # Triaged responses and near-duplicates resolve to their score through the
+        # judge cache, so both stages need the cache.
+        self.triage = None
+        if self.judge_cache is not None and not self.config.triage.off:
+            embed_fn = None
+            if self.config.triage.embedding_model:
+                embed_fn = build_embedder(
+                    self.config.triage.embedding_model, self.device
+                )
+            self.triage = ResponseTriage(
+                embed_fn=embed_fn, min_similarity=self.config.triage.min_similarity
+            )
+        self.near_duplicate_index = None
+        self.duplicate_clusters = []
+        if self.judge_cache is not None and not self.config.near_duplicate.off:
+            self.near_duplicate_index = NearDuplicateIndex(
+                threshold=self.config.near_duplicate.threshold
+            )
+        # The local backend scores rounds in the forward pass; no batches are queued.
+        self.batch_evals = None
+        self.judge_scheduler = None
+        if self.config.judge.backend == "local":
+            return
         self.batch_evals = OpenAIBatchLLMAsJudgeEval(
-            api_key=api_key, judge_model="gpt-4"
+            api_key=api_key, judge_model="gpt-4", judge_cache=self.judge_cache
         )
+        if self.config.judge.realtime_token_budget > 0:
+            self.judge_scheduler = JudgeScheduler(
+                self.batch_evals.judge_client,
+                realtime_fraction=self.config.judge.realtime_fraction,
+                realtime_token_budget=self.config.judge.realtime_token_budget,
+                max_batch_queue_depth=self.config.judge.max_batch_queue_depth,
+            )
 
     def setup_evals(self):
+        if self.config.judge.backend == "local":
+            self.evals = LocalLLMAsJudgeEval(
+                self.model,
+                self.tokenizer,
+                batch_size=self.config.judge.local_batch_size,
+            )
+            self.evals_token_limit = 7000
+            return
         load_dotenv()
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
@@ -1,5 +1,7 @@
-from BetterTherapy.db.query import get_ready_requests
+import asyncio
 
-reqs = get_ready_requests(hours=1)
+from BetterTherapy.db.async_query import get_ready_requests
+
+reqs = asyncio.run(get_ready_requests(hours=1))
 
 print(reqs)
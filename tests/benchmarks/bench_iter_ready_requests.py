@@ -0,0 +1,83 @@
+"""Benchmark of scoring a backlog of 1000 ready requests of 256 responses each, as
+after a day of downtime: get_ready_requests loading every request with its responses,
+against iter_ready_requests with the texts of one request fetched at a time.
+
+Run with: python -m tests.benchmarks.bench_iter_ready_requests
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from BetterTherapy.db import async_query
+from BetterTherapy.db import session as db_session
+from tests.helpers import fill_requests, make_async_engine, make_engine
+
+REQUESTS = 1000
+RESPONSES = 256
+PADDING = " I hear how hard this has been for you." * 15
+
+
+async def load_all() -> int:
+    scored = 0
+    for req in await async_query.get_ready_requests():
+        miner_db_response = {
+            item.miner_id: {
+                "response_text": item.response_text,
+                "response_time": item.response_time,
+            }
+            for item in req.responses
+        }
+        scored += len(miner_db_response)
+    return scored
+
+
+async def stream() -> int:
+    scored = 0
+    async for req in async_query.iter_ready_requests():
+        texts = await async_query.get_response_texts(
+            response_ids=[item.id for item in req.responses if item.has_text]
+        )
+        miner_db_response = {
+            item.miner_id: {
+                "response_text": texts.get(item.id, ""),
+                "response_time": item.response_time,
+            }
+            for item in req.responses
+        }
+        scored += len(miner_db_response)
+    return scored
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = make_engine(path)
+        fill_requests(engine, REQUESTS, RESPONSES, ready_every=1, padding=PADDING)
+        db_session.AsyncSessionLocal = async_sessionmaker(
+            make_async_engine(path), expire_on_commit=False
+        )
+        for name, run in (
+            ("get_ready_requests", load_all),
+            ("iter_ready_requests", stream),
+        ):
+            start = time.perf_counter()
+            scored = asyncio.run(run())
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            asyncio.run(run())
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{name:20s} {elapsed:6.2f} s, peak {peak / 2**20:7.1f} MiB "
+                f"for {scored} responses"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark of saving and loading the on-disk metagraph snapshot used at startup.
+
+Run with: python -m tests.benchmarks.bench_metagraph_snapshot
+"""
+
+import os
+import tempfile
+import time
+
+import bittensor as bt
+import numpy as np
+
+from BetterTherapy.utils.metagraph import (
+    load_metagraph_snapshot,
+    save_metagraph_snapshot,
+)
+from tests.helpers import make_axon
+
+REPEAT = 20
+
+
+def make_chain_metagraph(n: int) -> "bt.metagraph.Metagraph":
+    metagraph = bt.metagraph(1, network="test", lite=True, sync=False)
+    metagraph.n = np.array(n)
+    metagraph.block = np.array(1)
+    for name in ("stake", "tao_stake", "alpha_stake", "total_stake", "emission"):
+        setattr(metagraph, name, np.random.rand(n).astype(np.float32))
+    metagraph.uids = np.arange(n)
+    metagraph.last_update = np.arange(n)
+    metagraph.validator_permit = np.zeros(n, dtype=bool)
+    metagraph.axons = [make_axon(uid) for uid in range(n)]
+    return metagraph
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "metagraph.npz")
+        for n in (256, 4096):
+            metagraph = make_chain_metagraph(n)
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                save_metagraph_snapshot(metagraph, path)
+            save_ms = (time.perf_counter() - start) / REPEAT * 1000
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                load_metagraph_snapshot(path, 1, "test")
+            load_ms = (time.perf_counter() - start) / REPEAT * 1000
+            print(
+                f"{n:5d} UIDs: save {save_ms:7.2f} ms  load {load_ms:7.2f} ms  "
+                f"size {os.path.getsize(path) / 1024:7.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
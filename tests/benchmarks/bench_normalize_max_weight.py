@@ -0,0 +1,38 @@
+"""Benchmark of normalize_max_weight against the original list-based version.
+
+Run with: python -m tests.benchmarks.bench_normalize_max_weight
+"""
+
+import time
+
+import numpy as np
+
+from BetterTherapy.base.utils.weight_utils import normalize_max_weight
+from tests.helpers import reference_normalize_max_weight
+
+LIMIT = 0.1
+
+
+def measure(fn, x, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(x, LIMIT)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"normalize_max_weight, heavy-tailed float32 weights, limit {LIMIT}")
+    for n in (256, 1024, 4096, 16384, 100_000):
+        x = rng.pareto(1.0, n).astype(np.float32)
+        repeat = max(3, 200_000 // n)
+        reference = measure(reference_normalize_max_weight, x, repeat)
+        vectorized = measure(normalize_max_weight, x, repeat)
+        print(
+            f"  {n:7d} UIDs: reference {reference:8.3f} ms  "
+            f"vectorized {vectorized:8.3f} ms  ({reference / vectorized:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark of get_ready_requests at 1M miner_responses rows, on the default SQLite
+engine without indexes and on the tuned engine with the request indexes.
+
+Run with: python -m tests.benchmarks.bench_ready_requests
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from BetterTherapy.db.connection import configure_sqlite
+from BetterTherapy.db.models import MinerResponse, Request
+from tests.helpers import fill_requests, make_engine
+
+N_REQUESTS = 20_000
+RESPONSES_PER_REQUEST = 50
+REPEAT = 5
+READY_BEFORE = (datetime.now(timezone.utc) - timedelta(hours=24)).isoformat(" ")
+WRITES = 200
+
+
+def get_ready_requests(session):
+    """The ORM query of async_query.get_ready_requests, on a synchronous session."""
+    threshold = datetime.now(timezone.utc) - timedelta(hours=24)
+    return (
+        session.query(Request)
+        .filter(Request.created_at < threshold)
+        .options(selectinload(Request.responses).selectinload(MinerResponse.blob))
+        .all()
+    )
+
+
+def measure(engine):
+    # The two statements behind get_ready_requests, without building ORM objects.
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        with engine.connect() as connection:
+            ids = connection.execute(
+                text("SELECT id FROM requests WHERE created_at < :threshold"),
+                {"threshold": READY_BEFORE},
+            ).scalars()
+            connection.execute(
+                text(
+                    "SELECT id FROM miner_responses WHERE request_id IN "
+                    f"({','.join(map(str, ids))})"
+                )
+            ).all()
+    sql_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+    Session = sessionmaker(bind=engine)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        with Session() as session:
+            ready = get_ready_requests(session)
+            responses = sum(len(request.responses) for request in ready)
+    read_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+    # Small committed writes, like the forward loop storing one round.
+    start = time.perf_counter()
+    for i in range(WRITES):
+        with engine.begin() as connection:
+            connection.execute(
+                insert(MinerResponse),
+                [dict(request_id=1, miner_id=i, response_time=1.0)] * 8,
+            )
+    write_ms = (time.perf_counter() - start) / WRITES * 1000
+    return sql_ms, read_ms, write_ms, len(ready), responses
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        tuned_path = os.path.join(tmp, "tuned.db")
+        default_path = os.path.join(tmp, "default.db")
+        engine = make_engine(tuned_path, tuned=False)
+        fill_requests(engine, N_REQUESTS, RESPONSES_PER_REQUEST)
+        engine.dispose()
+        shutil.copy(tuned_path, default_path)
+
+        default = create_engine(f"sqlite:///{default_path}")
+        with default.begin() as connection:
+            connection.execute(text("DROP INDEX ix_requests_created_at"))
+            connection.execute(text("DROP INDEX ix_miner_responses_request_id"))
+        tuned = configure_sqlite(create_engine(f"sqlite:///{tuned_path}"))
+
+        print(
+            f"get_ready_requests, {N_REQUESTS} requests, "
+            f"{N_REQUESTS * RESPONSES_PER_REQUEST} responses, mean of {REPEAT}"
+        )
+        for name, engine in (("default", default), ("tuned", tuned)):
+            sql_ms, read_ms, write_ms, ready, responses = measure(engine)
+            print(
+                f"  {name:8s} sql {sql_ms:7.1f} ms  orm {read_ms:7.1f} ms "
+                f"({ready} requests, {responses} responses)  "
+                f"write {write_ms:5.2f} ms/commit"
+            )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Benchmark of storing 200 rounds of 256 responses, all distinct or with only 64
+distinct texts per round (miners running the same model return the same text):
+response texts inline in `miner_responses`, as before the blob store, against
+add_round with deduplicated, compressed blobs.
+
+Run with: python -m tests.benchmarks.bench_response_blobs
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    func,
+    insert,
+    text,
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from BetterTherapy.db import async_query
+from BetterTherapy.db import session as db_session
+from BetterTherapy.db.connection import configure_sqlite
+from tests.helpers import make_async_engine, make_engine
+
+ROUNDS = 200
+RESPONSES = 256
+BATCHES = 3
+DISTINCT = (RESPONSES, 64)  # Distinct texts per round; other miners repeat one.
+WORDS = (
+    "I hear how hard this has been for you and it makes sense to feel tired "
+    "anxious overwhelmed when sleep work family and money all pile up at once "
+    "it might help to notice one small thing you can do today such as a walk "
+    "a short breathing exercise or talking to someone you trust about it"
+).split()
+
+legacy = MetaData()
+Table(
+    "requests",
+    legacy,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("name", String(255), nullable=False, unique=True),
+    Column("openai_batch_id", String(255), nullable=False),
+    Column("prompt", Text, nullable=False),
+    Column("base_response", Text, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+legacy_responses = Table(
+    "miner_responses",
+    legacy,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("request_id", ForeignKey("requests.id"), nullable=False, index=True),
+    Column("miner_id", Integer, nullable=False),
+    Column("response_text", Text),
+    Column("response_time", Float),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def make_round(
+    rng: random.Random, round_index: int, distinct: int
+) -> tuple[list, list]:
+    texts = [" ".join(rng.choices(WORDS, k=250)) for _ in range(distinct)]
+    requests = [
+        dict(
+            name=f"round{round_index}_batch{batch}",
+            openai_batch_id=f"batch{batch}",
+            prompt="prompt",
+            base_response="base response",
+        )
+        for batch in range(BATCHES)
+    ]
+    responses = [
+        dict(
+            request=uid % BATCHES,
+            miner_id=uid,
+            response_text=texts[uid] if uid < distinct else rng.choice(texts),
+            response_time=1.0,
+        )
+        for uid in range(RESPONSES)
+    ]
+    return requests, responses
+
+
+async def store_inline(engine, requests: list, responses: list) -> None:
+    async with engine.begin() as connection:
+        result = await connection.execute(
+            insert(legacy.tables["requests"]).returning(
+                legacy.tables["requests"].c.id, sort_by_parameter_order=True
+            ),
+            requests,
+        )
+        request_ids = list(result.scalars().all())
+        await connection.execute(
+            insert(legacy_responses),
+            [
+                {
+                    **{k: v for k, v in response.items() if k != "request"},
+                    "request_id": request_ids[response["request"]],
+                }
+                for response in responses
+            ],
+        )
+
+
+async def run(name: str, path: str, rounds: list) -> float:
+    async_engine = make_async_engine(path)
+    db_session.AsyncSessionLocal = async_sessionmaker(
+        async_engine, expire_on_commit=False
+    )
+    start = time.perf_counter()
+    for requests, responses in rounds:
+        if name == "inline text":
+            await store_inline(async_engine, requests, responses)
+        else:
+            await async_query.add_round(requests, responses)
+    elapsed = time.perf_counter() - start
+    await async_engine.dispose()
+    return elapsed
+
+
+def main():
+    for distinct in DISTINCT:
+        rng = random.Random(0)
+        rounds = [make_round(rng, i, distinct) for i in range(ROUNDS)]
+        text_bytes = sum(
+            len(response["response_text"].encode())
+            for _, responses in rounds
+            for response in responses
+        )
+        print(
+            f"{ROUNDS} rounds of {RESPONSES} responses, {distinct} distinct texts "
+            f"per round, {text_bytes / 2**20:.1f} MiB of text"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("inline text", "blob store"):
+                path = os.path.join(tmp, f"{name}.db")
+                if name == "inline text":
+                    engine = create_engine(f"sqlite:///{path}")
+                    configure_sqlite(engine)
+                    legacy.create_all(engine)
+                else:
+                    engine = make_engine(path)
+                elapsed = asyncio.run(run(name, path, rounds))
+                with engine.connect() as connection:
+                    connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).all()
+                size = os.path.getsize(path)
+                print(
+                    f"  {name:12s} {elapsed / ROUNDS * 1000:6.2f} ms per round, "
+                    f"{ROUNDS * RESPONSES / elapsed:8.0f} responses/s, "
+                    f"database {size / 2**20:6.1f} MiB"
+                )
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark of the metagraph resync bookkeeping: deepcopy and full comparison
+against the diff-based MetagraphTracker.
+
+Run with: python -m tests.benchmarks.bench_resync
+"""
+
+import copy
+import time
+import tracemalloc
+
+from BetterTherapy.utils.metagraph import MetagraphTracker
+from tests.helpers import make_axon, make_metagraph
+
+REPEAT = 20
+
+
+def deepcopy_resync(metagraph, hotkeys, scores):
+    previous_metagraph = copy.deepcopy(metagraph)
+    if previous_metagraph.axons == metagraph.axons:
+        return
+    for uid, hotkey in enumerate(hotkeys):
+        if hotkey != metagraph.hotkeys[uid]:
+            scores[uid] = 0
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    elapsed = (time.perf_counter() - start) / REPEAT * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def main():
+    for n in (256, 4096):
+        metagraph = make_metagraph(n)
+        hotkeys = list(metagraph.hotkeys)
+        scores = [1.0] * n
+        tracker = MetagraphTracker(metagraph)
+
+        def change_one():
+            metagraph.axons[n // 2] = make_axon(
+                n // 2, ip=f"10.0.{time.time_ns() % 250}.1"
+            )
+
+        def deepcopy_round():
+            change_one()
+            deepcopy_resync(metagraph, hotkeys, scores)
+
+        def tracker_round():
+            change_one()
+            tracker.diff(metagraph)
+
+        print(f"resync bookkeeping, {n} UIDs, one axon changed, mean of {REPEAT}")
+        for name, fn in (("deepcopy", deepcopy_round), ("tracker", tracker_round)):
+            elapsed, peak = measure(fn)
+            print(f"  {name:10s} {elapsed:8.2f} ms  peak {peak:9.1f} KiB")
+        elapsed, peak = measure(lambda: tracker.diff(metagraph))
+        print(f"  {'unchanged':10s} {elapsed:8.2f} ms  peak {peak:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
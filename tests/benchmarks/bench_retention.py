@@ -0,0 +1,65 @@
+"""Benchmark of the database retention job: deletion throughput when trimming 1M
+miner_responses rows, and the database size over simulated hours of rounds with and
+without retention.
+
+Run with: python -m tests.benchmarks.bench_retention
+"""
+
+import os
+import tempfile
+
+from BetterTherapy.db.retention import RetentionJob
+from tests.helpers import fill_requests, make_engine
+
+RESPONSES_PER_REQUEST = 256
+BACKLOG = 4000  # Requests, about 1M responses.
+KEEP = 400
+HOURS = 12
+REQUESTS_PER_HOUR = 100
+
+
+def disk_size(path: str) -> int:
+    return sum(
+        os.path.getsize(path + suffix)
+        for suffix in ("", "-wal")
+        if os.path.exists(path + suffix)
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "retention.db")
+        engine = make_engine(path)
+        job = RetentionJob(engine, max_requests=KEEP, vacuum_pages=1_000_000)
+        fill_requests(engine, BACKLOG, RESPONSES_PER_REQUEST)
+        before = disk_size(path)
+        report = job.run()
+        print(
+            f"trim {BACKLOG * RESPONSES_PER_REQUEST} responses to "
+            f"{KEEP * RESPONSES_PER_REQUEST}: {report.deleted_responses} rows in "
+            f"{report.seconds:.2f}s ({report.rows_per_second:,.0f} rows/s), "
+            f"{before / 2**20:.1f} -> {report.db_bytes / 2**20:.1f} MiB"
+        )
+
+        unbounded_path = os.path.join(tmp, "unbounded.db")
+        unbounded = make_engine(unbounded_path)
+        next_id = BACKLOG + 1
+        fill_requests(unbounded, KEEP, RESPONSES_PER_REQUEST, first_id=next_id)
+        print(f"{'hour':>4s} {'retention':>12s} {'no retention':>14s}")
+        for hour in range(1, HOURS + 1):
+            next_id += KEEP if hour == 1 else REQUESTS_PER_HOUR
+            for target in (engine, unbounded):
+                fill_requests(
+                    target, REQUESTS_PER_HOUR, RESPONSES_PER_REQUEST, first_id=next_id
+                )
+            report = job.run()
+            print(
+                f"{hour:4d} {report.db_bytes / 2**20:9.1f} MiB "
+                f"{disk_size(unbounded_path) / 2**20:11.1f} MiB"
+            )
+        engine.dispose()
+        unbounded.dispose()
+
+
+if __name__ == "__main__":
+    main()
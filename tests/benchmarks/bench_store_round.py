@@ -0,0 +1,106 @@
+"""Benchmark of storing one round of 256 responses over 3 batches: a committed
+add_request per batch plus bulk_save_objects, against add_round.
+
+Run with: python -m tests.benchmarks.bench_store_round
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from BetterTherapy.db import async_query
+from BetterTherapy.db import session as db_session
+from BetterTherapy.db.blobs import blob_rows, insert_blobs
+from BetterTherapy.db.models import MinerResponse, Request
+from tests.helpers import make_async_engine, make_engine
+
+ROUNDS = 50
+RESPONSES = 256
+BATCHES = 3
+TEXT = "I hear how hard this has been for you. " * 40
+
+
+def request_rows(round_index: int) -> list[dict]:
+    return [
+        dict(
+            name=f"round{round_index}_batch{batch}",
+            openai_batch_id=f"batch{batch}",
+            prompt="prompt",
+            base_response="base response",
+        )
+        for batch in range(BATCHES)
+    ]
+
+
+def per_request_round(round_index: int) -> None:
+    with db_session.SessionLocal() as session:
+        for row in request_rows(round_index):
+            new_request = Request(**row)
+            session.add(new_request)
+            session.commit()
+            session.refresh(new_request)
+        hashes, blobs = blob_rows([TEXT] * RESPONSES)
+        session.execute(insert_blobs(), blobs)
+        session.bulk_save_objects(
+            [
+                MinerResponse(
+                    request_id=new_request.id,
+                    miner_id=uid,
+                    response_hash=response_hash,
+                    response_time=1.0,
+                )
+                for uid, response_hash in enumerate(hashes)
+            ]
+        )
+        session.commit()
+
+
+async def bulk_round(round_index: int) -> None:
+    await async_query.add_round(
+        requests=request_rows(round_index),
+        responses=[
+            dict(
+                request=uid % BATCHES,
+                miner_id=uid,
+                response_text=TEXT,
+                response_time=1.0,
+            )
+            for uid in range(RESPONSES)
+        ],
+    )
+
+
+async def run_bulk() -> None:
+    for i in range(ROUNDS):
+        await bulk_round(i)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("per-request", "add_round"):
+            path = os.path.join(tmp, f"{name}.db")
+            engine = make_engine(path)
+            db_session.SessionLocal = sessionmaker(bind=engine)
+            db_session.AsyncSessionLocal = async_sessionmaker(
+                make_async_engine(path), expire_on_commit=False
+            )
+            start = time.perf_counter()
+            if name == "per-request":
+                for i in range(ROUNDS):
+                    per_request_round(i)
+            else:
+                asyncio.run(run_bulk())
+            elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+            print(
+                f"{name:12s} {elapsed:7.2f} ms per round of {RESPONSES} responses "
+                f"in {BATCHES} batches"
+            )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
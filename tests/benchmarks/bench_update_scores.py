@@ -0,0 +1,66 @@
+"""Benchmark of the moving average update of one round: scatter-and-blend into new
+arrays, as update_scores did with its NaN check, against the in-place ScoreEngine.
+
+The engine allocates no array, so its peak stays at the few KiB of Python frames and
+NumPy scalars and views an update creates, whatever the subnet size. At 256 UIDs
+that fixed per-call overhead makes it slower than scatter-and-blend.
+
+Run with: python -m tests.benchmarks.bench_update_scores
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from BetterTherapy.utils.scores import ScoreEngine
+
+REPEAT = 1000
+ALPHA = 0.1
+
+
+def measure(fn):
+    fn()  # Warm up scratch buffers.
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    elapsed = (time.perf_counter() - start) / REPEAT * 1e6
+    # The worst peak of a single call, over what was allocated before it.
+    worst = 0
+    tracemalloc.start()
+    for _ in range(REPEAT):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        worst = max(worst, peak - baseline)
+    tracemalloc.stop()
+    return elapsed, worst / 1024
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for n, batch in ((256, 64), (4096, 256), (65536, 1024)):
+        uids = rng.choice(n, size=batch, replace=False).astype(np.intp)
+        rewards = rng.random(batch).astype(np.float32)
+        state = {"scores": np.zeros(n, dtype=np.float32)}
+        engine = ScoreEngine(n, alpha=ALPHA)
+
+        def scatter_and_blend():
+            if np.isnan(rewards).any():
+                raise AssertionError("no NaN rewards in this benchmark")
+            scattered_rewards = np.zeros_like(state["scores"])
+            scattered_rewards[uids.copy()] = rewards
+            state["scores"] = ALPHA * scattered_rewards + (1 - ALPHA) * state["scores"]
+
+        print(f"update_scores, {n} UIDs, {batch} rewards, mean of {REPEAT}")
+        for name, fn in (
+            ("scatter", scatter_and_blend),
+            ("engine", lambda: engine.update(uids, rewards)),
+        ):
+            elapsed, peak = measure(fn)
+            print(f"  {name:8s} {elapsed:8.1f} us  peak {peak:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
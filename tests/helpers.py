@@ -16,18 +16,34 @@
 # DEALINGS IN THE SOFTWARE.
 
 
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import bittensor as bt
+import numpy as np
+from aiohttp import web
 from bittensor import (
     AxonInfo,
     Balance,
     NeuronInfo,
     PrometheusInfo,
 )
-from bittensor.mock.wallet_mock import MockWallet as _MockWallet
-from bittensor.mock.wallet_mock import get_mock_coldkey as _get_mock_coldkey
-from bittensor.mock.wallet_mock import get_mock_hotkey as _get_mock_hotkey
-from bittensor.mock.wallet_mock import get_mock_wallet as _get_mock_wallet
+from bittensor_wallet.mock.wallet_mock import MockWallet as _MockWallet
+from bittensor_wallet.mock.wallet_mock import get_mock_coldkey as _get_mock_coldkey
+from bittensor_wallet.mock.wallet_mock import get_mock_hotkey as _get_mock_hotkey
+from bittensor_wallet.mock.wallet_mock import get_mock_wallet as _get_mock_wallet
 from rich.console import Console
 from rich.text import Text
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from BetterTherapy.db.blobs import blob_rows, insert_blobs
+from BetterTherapy.db.connection import configure_sqlite
+from BetterTherapy.db.models import Base, MinerResponse, Request
 
 
 def __mock_wallet_factory__(*args, **kwargs) -> _MockWallet:
@@ -176,3 +192,287 @@ class MockConsole:
         output_no_syntax = Text.from_ansi(Text.from_markup(text).plain).plain
 
         return output_no_syntax
+
+
+def make_validator(
+    n: int, seed: int = 0, block: int = 1, blacklisted: frozenset[str] = frozenset()
+) -> SimpleNamespace:
+    """Fake validator with a random metagraph that exercises every UID filter."""
+    rng = np.random.default_rng(seed)
+    n_ips = max(1, n // 20)
+    ips = [
+        "0.0.0.0" if rng.random() < 0.05 else f"10.0.{i // 256}.{i % 256}"
+        for i in rng.integers(0, n_ips, size=n)
+    ]
+    ports = rng.integers(8000, 8004, size=n)
+    axons = [
+        SimpleNamespace(ip=ip, port=int(port), is_serving=ip != "0.0.0.0")
+        for ip, port in zip(ips, ports)
+    ]
+    metagraph = SimpleNamespace(
+        n=np.array(n),
+        block=np.array(block),
+        axons=axons,
+        hotkeys=[f"hk{uid}" for uid in range(n)],
+        coldkeys=[f"ck{c}" for c in rng.integers(0, max(1, n // 25), size=n)],
+        S=rng.uniform(0, 2048, size=n).astype(np.float32),
+        validator_permit=rng.random(n) < 0.3,
+    )
+    config = SimpleNamespace(
+        neuron=SimpleNamespace(vpermit_tao_limit=1024),
+        pool_mining=SimpleNamespace(url="http://pool"),
+    )
+    blacklist_service = SimpleNamespace(hotkeys=frozenset(blacklisted), version=0)
+    return SimpleNamespace(
+        metagraph=metagraph, config=config, blacklist_service=blacklist_service
+    )
+
+
+def reference_filter_uids(bt_obj, blacklisted, max_per_key=15, blacklist=None):
+    """The original per-UID filter_uids loop, kept to check the vectorized one."""
+    available = []
+    counts = {}
+    ip_counts = {}
+    ip_port_sets = set()
+    metagraph = bt_obj.metagraph
+    limit = bt_obj.config.neuron.vpermit_tao_limit
+    for uid in range(metagraph.n.item()):
+        ip_address = metagraph.axons[uid].ip
+        ip_port = f"{ip_address}:{metagraph.axons[uid].port}"
+        ip_counts[ip_address] = ip_counts.get(ip_address, 0) + 1
+        if ip_counts[ip_address] >= max_per_key:
+            continue
+        if ip_port in ip_port_sets:
+            continue
+        ip_port_sets.add(ip_port)
+        if not metagraph.axons[uid].is_serving:
+            continue
+        if metagraph.validator_permit[uid] and metagraph.S[uid] > limit:
+            continue
+        ck = metagraph.coldkeys[uid]
+        hk = metagraph.hotkeys[uid]
+        if blacklist and hk in blacklist:
+            continue
+        if hk in blacklisted:
+            continue
+        cnt = counts.get(ck, 0)
+        if cnt >= max_per_key:
+            continue
+        available.append(uid)
+        counts[ck] = cnt + 1
+    return np.array(available, dtype=int)
+
+
+def make_engine(path, tuned: bool = True) -> Engine:
+    """SQLite engine on `path` with the schema created, tuned like production."""
+    engine = create_engine(f"sqlite:///{path}")
+    if tuned:
+        configure_sqlite(engine)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_async_engine(path) -> AsyncEngine:
+    """
+    Tuned aiosqlite engine on `path`. Connections are not pooled, so the engine can
+    be used from several `asyncio.run` calls.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    configure_sqlite(engine.sync_engine)
+    return engine
+
+
+def fill_requests(
+    engine: Engine,
+    n_requests: int,
+    responses_per_request: int,
+    ready_every: int = 100,
+    first_id: int = 1,
+    padding: str = "",
+) -> None:
+    """
+    Inserts requests with IDs from `first_id` and their responses, each with a
+    distinct text ending in `padding`. Every `ready_every`-th request is two days
+    old, the others were created now.
+    """
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=2)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Request),
+            [
+                dict(
+                    id=first_id + i,
+                    name=f"request-{first_id + i}",
+                    openai_batch_id=f"batch-{i}",
+                    prompt=f"prompt {i}",
+                    base_response=f"base response {i}",
+                    created_at=old if i % ready_every == 0 else now,
+                    updated_at=now,
+                )
+                for i in range(n_requests)
+            ],
+        )
+        for start in range(0, n_requests, 1000):
+            keys = [
+                (request_id, miner_id)
+                for request_id in range(
+                    first_id + start, first_id + min(start + 1000, n_requests)
+                )
+                for miner_id in range(responses_per_request)
+            ]
+            if not keys:
+                continue
+            hashes, blobs = blob_rows(
+                f"response {request_id}/{miner_id}{padding}"
+                for request_id, miner_id in keys
+            )
+            connection.execute(insert_blobs(), blobs)
+            connection.execute(
+                insert(MinerResponse),
+                [
+                    dict(
+                        request_id=request_id,
+                        miner_id=miner_id,
+                        response_hash=response_hash,
+                        response_time=1.0,
+                    )
+                    for (request_id, miner_id), response_hash in zip(keys, hashes)
+                ],
+            )
+
+
+def make_axon(uid: int, ip: str = "10.0.0.1") -> bt.AxonInfo:
+    return bt.AxonInfo(
+        version=1,
+        ip=ip,
+        port=8000 + uid,
+        ip_type=4,
+        hotkey=f"hk{uid}",
+        coldkey=f"ck{uid}",
+    )
+
+
+def make_metagraph(n: int, block: int = 1) -> SimpleNamespace:
+    """Fake metagraph with the arrays the validator reads."""
+    return SimpleNamespace(
+        n=np.array(n),
+        block=np.array(block),
+        hotkeys=[f"hk{uid}" for uid in range(n)],
+        coldkeys=[f"ck{uid}" for uid in range(n)],
+        axons=[make_axon(uid) for uid in range(n)],
+        S=np.arange(n, dtype=np.float32),
+    )
+
+
+class PoolApiStub:
+    """Local pool mining backend serving the blacklist and the pool metagraph."""
+
+    def __init__(self):
+        self.items = []
+        self.miners = []
+        self.etag = "v1"
+        self.down = False
+        self.fail_next = 0
+        self.delay = 0.0
+        self.calls = []
+        self.url = None
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+
+    def _record(self, request: web.Request) -> web.Response | None:
+        self.calls.append((request.path, dict(request.headers)))
+        if self.down:
+            return web.Response(status=503)
+        if self.fail_next:
+            self.fail_next -= 1
+            return web.Response(status=503)
+        return None
+
+    async def blacklist(self, request: web.Request) -> web.Response:
+        failed = self._record(request)
+        if failed is not None:
+            return failed
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag})
+        return web.json_response({"data": self.items}, headers={"ETag": self.etag})
+
+    async def pool_metagraph(self, request: web.Request) -> web.Response:
+        failed = self._record(request)
+        if failed is not None:
+            return failed
+        await asyncio.sleep(self.delay)
+        return web.json_response({"data": self.miners})
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/pool/get/blacklist", self.blacklist)
+        app.router.add_get("/pool/get/pool-metagraph", self.pool_metagraph)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    def start(self) -> None:
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def paths(self) -> list[str]:
+        return [path for path, _ in self.calls]
+
+
+def reference_normalize_max_weight(x: np.ndarray, limit: float = 0.1) -> np.ndarray:
+    """The original list-based normalize_max_weight, kept to check the vectorized one."""
+    epsilon = 1e-7
+    weights = x.copy()
+    values = np.sort(weights)
+    if x.sum() == 0 or len(x) * limit <= 1:
+        return np.ones_like(x) / x.size
+    estimation = values / values.sum()
+    if estimation.max() <= limit:
+        return weights / weights.sum()
+    cumsum = np.cumsum(estimation, 0)
+    estimation_sum = np.array(
+        [(len(values) - i - 1) * estimation[i] for i in range(len(values))]
+    )
+    n_values = (estimation / (estimation_sum + cumsum + epsilon) < limit).sum()
+    cutoff_scale = (limit * cumsum[n_values - 1] - epsilon) / (
+        1 - (limit * (len(estimation) - n_values))
+    )
+    cutoff = cutoff_scale * values.sum()
+    weights[weights > cutoff] = cutoff
+    return weights / weights.sum()
+
+
+def random_weights(rng: np.random.Generator, n: int, dtype=np.float32) -> np.ndarray:
+    """Random non-negative weights: uniform, skewed, sparse or heavy-tailed."""
+    kind = rng.integers(4)
+    if kind == 0:
+        x = rng.random(n)
+    elif kind == 1:
+        x = rng.random(n) ** 8
+    elif kind == 2:
+        x = rng.random(n) * (rng.random(n) < 0.3)
+    else:
+        x = rng.pareto(1.0, n)
+    return x.astype(dtype)
+
+
+def reference_convert_weights_and_uids_for_emit(uids, weights):
+    """The original per-element u16 conversion."""
+    if np.sum(weights) == 0:
+        return [], []
+    max_weight = float(np.max(weights))
+    weight_uids, weight_vals = [], []
+    for weight, uid in zip(weights, uids, strict=True):
+        uint16_val = round(float(weight) / max_weight * 65535)
+        if uint16_val != 0:
+            weight_vals.append(uint16_val)
+            weight_uids.append(int(uid))
+    return weight_uids, weight_vals
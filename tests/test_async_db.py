@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from BetterTherapy.db import async_query
+from BetterTherapy.db import session as db_session
+from BetterTherapy.db.blobs import decompress
+from BetterTherapy.db.models import MinerResponse
+from BetterTherapy.db.session import unit_of_work
+from tests.helpers import fill_requests, make_async_engine, make_engine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = make_engine(tmp_path / "test.db")
+    async_engine = make_async_engine(tmp_path / "test.db")
+    monkeypatch.setattr(
+        db_session,
+        "AsyncSessionLocal",
+        async_sessionmaker(async_engine, expire_on_commit=False),
+    )
+    yield engine
+    engine.dispose()
+
+
+def _count(engine, table: str) -> int:
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+async def _store_round(fail: bool = False):
+    async with unit_of_work() as session:
+        request = await async_query.add_request(
+            name="r",
+            openai_batch_id="b",
+            prompt="p",
+            base_response="a",
+            session=session,
+        )
+        await async_query.add_bulk_responses(
+            responses=[
+                MinerResponse(request_id=request.id, miner_id=uid) for uid in (1, 2)
+            ],
+            texts=["same", "same"],
+            session=session,
+        )
+        if fail:
+            raise RuntimeError("round failed")
+    return request
+
+
+def test_unit_of_work_commits_or_rolls_back_together(engine):
+    with pytest.raises(RuntimeError):
+        asyncio.run(_store_round(fail=True))
+    assert _count(engine, "requests") == 0
+    assert _count(engine, "miner_responses") == 0
+
+    request = asyncio.run(_store_round())
+    assert request.id == 1
+    assert _count(engine, "miner_responses") == 2
+    assert _count(engine, "response_blobs") == 1
+
+
+def test_ready_requests_are_deleted_with_their_responses(engine):
+    fill_requests(engine, 4, 3, ready_every=2)
+
+    async def main():
+        ready = await async_query.get_ready_requests()
+        pending = await async_query.count_pending_requests()
+        await async_query.delete_requests(request_ids=[r.id for r in ready])
+        return ready, pending, await async_query.count_pending_requests()
+
+    ready, pending, remaining = asyncio.run(main())
+    assert [request.id for request in ready] == [1, 3]
+    assert [len(request.responses) for request in ready] == [3, 3]
+    assert (pending, remaining) == (4, 2)
+    assert _count(engine, "miner_responses") == 6
+
+
+def test_async_blacklist_queries(engine):
+    async def main():
+        for _ in range(2):
+            await async_query.add_or_update_blacklisted_miner(
+                miner_id=3, hotkey="c", coldkey="ck", reason="judge"
+            )
+        await async_query.add_or_update_blacklisted_miner(
+            miner_id=4, hotkey="d", coldkey="ck", reason="judge"
+        )
+        return await async_query.get_blacklisted_miners_hotkeys()
+
+    blacklisted = asyncio.run(main())
+    assert [row.hotkey for row in blacklisted] == ["c"]
+
+
+def test_add_round_links_responses_to_their_request(engine):
+    requests = [
+        dict(name=f"r_{i}", openai_batch_id=f"b{i}", prompt="p", base_response="a")
+        for i in range(3)
+    ]
+    responses = [
+        dict(request=uid % 3, miner_id=uid, response_text=f"t{uid}") for uid in range(9)
+    ]
+
+    request_ids = asyncio.run(async_query.add_round(requests, responses))
+
+    assert request_ids == [1, 2, 3]
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text(
+                "SELECT r.openai_batch_id, m.miner_id FROM miner_responses m "
+                "JOIN requests r ON r.id = m.request_id ORDER BY m.miner_id"
+            )
+        ).all()
+    assert rows == [(f"b{uid % 3}", uid) for uid in range(9)]
+
+
+def test_add_round_is_one_transaction(engine):
+    requests = [dict(name="r", openai_batch_id="b", prompt="p", base_response="a")]
+    responses = [dict(request=0, miner_id=None)]  # Violates NOT NULL.
+
+    with pytest.raises(IntegrityError):
+        asyncio.run(async_query.add_round(requests, responses))
+    assert _count(engine, "requests") == 0
+
+
+def test_iter_ready_requests_streams_projected_pages(engine):
+    fill_requests(engine, 10, 3, ready_every=2)
+    with engine.begin() as connection:
+        connection.execute(
+            text("UPDATE miner_responses SET response_hash = NULL WHERE miner_id > 0")
+        )
+
+    async def main():
+        ready = [req async for req in async_query.iter_ready_requests(page_size=2)]
+        texts = await async_query.get_response_texts(
+            response_ids=[item.id for item in ready[0].responses if item.has_text]
+        )
+        return ready, texts
+
+    ready, texts = asyncio.run(main())
+    assert [req.id for req in ready] == [1, 3, 5, 7, 9]
+    assert ready[1].openai_batch_id == "batch-2"
+    assert [
+        (item.miner_id, item.response_time, item.has_text)
+        for item in ready[0].responses
+    ] == [(0, 1.0, True), (1, 1.0, False), (2, 1.0, False)]
+    assert not hasattr(ready[0].responses[0], "response_hash")
+    assert texts == {ready[0].responses[0].id: "response 1/0"}
+
+
+def test_iter_ready_requests_without_responses(engine):
+    fill_requests(engine, 3, 1, ready_every=1)
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM miner_responses WHERE request_id = 2"))
+
+    async def main():
+        return [req async for req in async_query.iter_ready_requests(page_size=2)]
+
+    ready = asyncio.run(main())
+    assert [(req.id, len(req.responses)) for req in ready] == [(1, 1), (2, 0), (3, 1)]
+
+
+def test_add_round_shares_texts_until_their_last_response_is_deleted(engine):
+    requests = [
+        dict(name=f"r_{i}", openai_batch_id=f"b{i}", prompt="p", base_response="a")
+        for i in range(2)
+    ]
+    responses = [
+        dict(request=0, miner_id=0, response_text="same"),
+        dict(request=0, miner_id=1, response_text="only in 0"),
+        dict(request=1, miner_id=2, response_text="same"),
+        dict(request=1, miner_id=3, response_text=None),
+    ]
+
+    async def main():
+        request_ids = await async_query.add_round(requests, responses)
+        ready = await async_query.get_ready_requests(hours=-1)
+        texts = await async_query.get_response_texts(
+            response_ids=[r.id for req in ready for r in req.responses]
+        )
+        await async_query.delete_requests(request_ids=request_ids[:1])
+        return ready, texts
+
+    ready, texts = asyncio.run(main())
+    assert [[r.response_text for r in req.responses] for req in ready] == [
+        ["same", "only in 0"],
+        ["same", None],
+    ]
+    assert texts == {1: "same", 2: "only in 0", 3: "same"}
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT data FROM response_blobs")).scalars()
+        assert [decompress(data) for data in rows] == ["same"]
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from BetterTherapy.db import session as db_session
+from BetterTherapy.db.async_query import add_or_update_blacklisted_miner
+from BetterTherapy.db.query import get_blacklist_snapshot, replace_blacklist_snapshot
+from BetterTherapy.utils.api import PoolApiClient
+from BetterTherapy.utils.blacklist import BlacklistService, parse_blacklisted_hotkey
+from tests.helpers import PoolApiStub, make_async_engine, make_engine
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    engine = make_engine(tmp_path / "test.db")
+    monkeypatch.setattr(db_session, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(
+        db_session,
+        "AsyncSessionLocal",
+        async_sessionmaker(
+            make_async_engine(tmp_path / "test.db"), expire_on_commit=False
+        ),
+    )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def pool_api():
+    api = PoolApiStub()
+    api.start()
+    yield api
+    api.stop()
+
+
+def _blacklist(hotkey: str) -> None:
+    asyncio.run(
+        add_or_update_blacklisted_miner(
+            miner_id=3, hotkey=hotkey, coldkey="ck", reason="judge"
+        )
+    )
+
+
+def _service(pool_api) -> BlacklistService:
+    return BlacklistService(pool_api.url, client=PoolApiClient(pool_api.url, backoff=0))
+
+
+def test_parse_blacklisted_hotkey():
+    assert parse_blacklisted_hotkey("hk") == "hk"
+    assert parse_blacklisted_hotkey({"hotkey": "hk"}) == "hk"
+    assert parse_blacklisted_hotkey(["hk", "ck"]) == "hk"
+    assert parse_blacklisted_hotkey(None) is None
+
+
+def test_refresh_uses_etag(pool_api):
+    pool_api.items = ["hk1", {"hotkey": "hk2"}]
+    service = _service(pool_api)
+
+    assert service.refresh()
+    assert service.hotkeys == {"hk1", "hk2"}
+    version = service.version
+
+    assert service.refresh()
+    assert pool_api.calls[-1][1]["If-None-Match"] == "v1"
+    assert service.version == version
+
+
+def test_falls_back_to_snapshot_when_api_is_down(pool_api):
+    _blacklist("own")
+    pool_api.items = [["hk1"], ["own"]]
+    _service(pool_api).refresh()
+
+    pool_api.down = True
+    service = _service(pool_api)
+    assert not service.refresh()
+    assert service.source == "db"
+    # "own" keeps its own row and is still part of the snapshot.
+    assert service.hotkeys == {"hk1", "own"}
+
+    pool_api.down = False
+    pool_api.items = ["hk2"]
+    pool_api.etag = "v2"
+    assert service.refresh()
+    assert service.hotkeys == {"hk2"}
+    restarted = _service(pool_api)
+    assert restarted.load_snapshot()
+    assert restarted.hotkeys == {"hk2"}
+
+
+def test_snapshot_keeps_hotkeys_with_a_row_of_their_own(database):
+    _blacklist("c")
+    replace_blacklist_snapshot(["a", "b", "c"], reason="pool")
+    assert sorted(get_blacklist_snapshot()) == ["a", "b", "c"]
+
+    # "a" only had a snapshot row; blacklisting it makes the row its own.
+    _blacklist("a")
+    replace_blacklist_snapshot(["b"], reason="pool")
+    assert get_blacklist_snapshot() == ["b"]
+    with database.connect() as connection:
+        rows = connection.execute(
+            text("SELECT hotkey, reason FROM blacklisted_miners ORDER BY hotkey")
+        ).all()
+    assert [tuple(row) for row in rows] == [
+        ("a", "judge"),
+        ("b", "pool"),
+        ("c", "judge"),
+    ]
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+
+from BetterTherapy.utils.chain import ChainStateCache
+
+
+class _Subtensor:
+    def __init__(self):
+        self.calls = []
+        self.limit = 0.5
+        self.down = False
+
+    def max_weight_limit(self, netuid):
+        self.calls.append(("max_weight_limit", netuid))
+        if self.down:
+            raise ConnectionError("chain down")
+        return self.limit
+
+    def min_allowed_weights(self, netuid):
+        self.calls.append(("min_allowed_weights", netuid))
+        return 8
+
+    def query_subtensor(self, name, params):
+        self.calls.append((name, *params))
+        return SimpleNamespace(value=[(0, 65535), (3, 100)])
+
+
+def test_refreshes_on_block_interval_and_invalidate():
+    subtensor = _Subtensor()
+    cache = ChainStateCache(subtensor, netuid=7, refresh_blocks=10)
+
+    assert cache.max_weight_limit(100) == 0.5
+    subtensor.limit = 0.3
+    assert cache.max_weight_limit(109) == 0.5
+    assert cache.min_allowed_weights(109) == 8
+    assert cache.max_weight_limit(110) == 0.3
+
+    subtensor.limit = 0.2
+    cache.invalidate()
+    assert cache.max_weight_limit(111) == 0.2
+    assert subtensor.calls.count(("max_weight_limit", 7)) == 3
+
+
+def test_serves_last_value_when_chain_fails():
+    subtensor = _Subtensor()
+    cache = ChainStateCache(subtensor, netuid=7, refresh_blocks=10)
+    subtensor.down = True
+    with pytest.raises(ConnectionError):
+        cache.max_weight_limit(1)
+
+    subtensor.down = False
+    assert cache.max_weight_limit(1) == 0.5
+    subtensor.down = True
+    assert cache.max_weight_limit(50) == 0.5
+
+
+def test_validator_weights_queries_single_row():
+    subtensor = _Subtensor()
+    cache = ChainStateCache(subtensor, netuid=7)
+
+    assert cache.validator_weights(4, block=1) == [(0, 65535), (3, 100)]
+    assert cache.validator_weights(4, block=2) == [(0, 65535), (3, 100)]
+    assert subtensor.calls == [("Weights", 7, 4)]
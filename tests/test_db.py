@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from BetterTherapy.db.blobs import blob_rows, decompress
+from tests.helpers import make_engine
+
+
+def _scalar(connection, sql: str):
+    return connection.execute(text(sql)).scalar()
+
+
+def _plan(connection, sql: str) -> str:
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+    return " ".join(row[-1] for row in rows)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(tmp_path / "test.db")
+    yield engine
+    engine.dispose()
+
+
+def test_connections_use_the_tuned_profile(engine):
+    with engine.connect() as connection:
+        assert _scalar(connection, "PRAGMA journal_mode") == "wal"
+        assert _scalar(connection, "PRAGMA synchronous") == 1  # NORMAL
+        assert _scalar(connection, "PRAGMA foreign_keys") == 1
+        assert _scalar(connection, "PRAGMA cache_size") == -64000
+
+        with pytest.raises(IntegrityError):
+            connection.execute(
+                text(
+                    "INSERT INTO miner_responses (request_id, miner_id) VALUES (42, 1)"
+                )
+            )
+
+
+def test_ready_request_query_uses_the_indexes(engine):
+    with engine.connect() as connection:
+        assert "ix_requests_created_at" in _plan(
+            connection, "SELECT id FROM requests WHERE created_at < '2026-01-01'"
+        )
+        assert "ix_miner_responses_request_id" in _plan(
+            connection, "SELECT id FROM miner_responses WHERE request_id IN (1, 2)"
+        )
+
+
+def test_blob_rows_store_each_text_once():
+    hashes, rows = blob_rows(["same", None, "same", "", "other"])
+
+    assert hashes[0] == hashes[2] != hashes[4]
+    assert hashes[1] is None and hashes[3] is None
+    assert [decompress(row["data"]) for row in rows] == ["same", "other"]
+    assert [row["size"] for row in rows] == [4, 5]
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+
+from evals.dedup import NearDuplicateIndex
+
+
+def _random_text(rng: random.Random, n_words: int = 120) -> str:
+    return " ".join(f"word{rng.randrange(5000)}" for _ in range(n_words))
+
+
+def _paraphrase(rng: random.Random, text: str) -> str:
+    words = text.split()
+    words[rng.randrange(len(words))] = "changed"
+    return " ".join(words)
+
+
+def test_clusters_light_paraphrases():
+    rng = random.Random(0)
+    texts = [_random_text(rng) for _ in range(20)]
+    texts.append(_paraphrase(rng, texts[3]))
+    texts.append(texts[3].upper())
+    texts.append(None)
+
+    clusters = NearDuplicateIndex().cluster(texts)
+
+    assert len(clusters) == 1
+    assert clusters[0].members == [3, 20, 21]
+    assert clusters[0].representative == 3
+    assert clusters[0].duplicates == [20, 21]
+
+
+def test_representative_follows_priority():
+    rng = random.Random(1)
+    text = _random_text(rng)
+    texts = [text, text, _random_text(rng)]
+
+    clusters = NearDuplicateIndex().cluster(texts, priority=[9.0, 1.0, 5.0])
+
+    assert clusters[0].representative == 1
+
+
+def test_clusters_pairs_beyond_the_first_member_of_a_bucket():
+    index = NearDuplicateIndex(num_perm=8, bands=2)
+    # All three share the first band; only the last two are near-duplicates.
+    signatures = np.array(
+        [
+            [1, 1, 1, 1, 10, 11, 12, 13],
+            [1, 1, 1, 1, 20, 21, 22, 23],
+            [1, 1, 1, 1, 20, 21, 22, 99],
+        ],
+        dtype=np.uint64,
+    )
+    index.signatures = lambda texts: signatures
+
+    clusters = index.cluster(["a", "b", "c"])
+
+    assert len(clusters) == 1
+    assert clusters[0].members == [1, 2]
+    assert clusters[0].similarity == 7 / 8
+
+
+def test_identical_responses_form_one_cluster():
+    rng = random.Random(3)
+    text = _random_text(rng)
+    texts = [text] * 50 + [_random_text(rng)]
+
+    clusters = NearDuplicateIndex().cluster(texts)
+
+    assert len(clusters) == 1
+    assert clusters[0].members == list(range(50))
+    assert clusters[0].similarity == 1.0
@@ -0,0 +1,169 @@
+import asyncio
+import importlib
+import json
+import re
+from types import SimpleNamespace
+
+from BetterTherapy.validator.forward import assign_batches, resolve_cached_scores
+from evals import batch as judge_batch
+from evals.cache import JudgeCache
+
+# The package re-exports the `forward` function under the module's name.
+forward = importlib.import_module("BetterTherapy.validator.forward")
+
+
+def _response(output, process_time=1.0):
+    return SimpleNamespace(
+        output=output, dendrite=SimpleNamespace(process_time=process_time)
+    )
+
+
+def test_assign_batches_follows_the_judged_response():
+    validator = SimpleNamespace(
+        judge_cache=JudgeCache(),
+        near_duplicate_index=object(),
+        duplicate_clusters=[{"representative": 3, "members": [3, 5]}],
+    )
+    outputs = ["a", "b", "a", "c", "", "c'"]
+    batch_info = [
+        ([], {"req_1": "0,1"}),
+        ([], {"req_1": "3"}),
+    ]
+
+    batches = assign_batches(
+        validator,
+        "prompt",
+        "base",
+        [_response(output) for output in outputs],
+        list(range(len(outputs))),
+        batch_info,
+    )
+
+    # 2 repeats the response of 0, 5 is a near-duplicate of 3 and no batch scores 4.
+    assert batches == [0, 0, 0, 1, None, 1]
+
+
+def test_cached_and_triaged_responses_are_scored_without_a_batch():
+    cache = JudgeCache()
+    cache.put(cache.key("prompt", "base", "cached"), 0.9)
+    cache.put(cache.key("prompt", "base", "triaged"), 0.0)
+    cache.alias(
+        cache.key("prompt", "base", "near cached"),
+        cache.key("prompt", "base", "cached"),
+    )
+    logged = []
+    validator = SimpleNamespace(
+        judge_cache=cache,
+        config=SimpleNamespace(near_duplicate=SimpleNamespace(policy="share")),
+        metagraph=SimpleNamespace(
+            hotkeys=[f"hk{i}" for i in range(4)], coldkeys=[f"ck{i}" for i in range(4)]
+        ),
+        wandb_logger=SimpleNamespace(
+            log_evaluation_round=lambda prompt, name, judged: logged.append(judged),
+            create_summary_dashboard=lambda: None,
+        ),
+        ready_to_set_weights=False,
+    )
+    outputs = ["cached", "triaged", "near cached", "new"]
+    miner_scores = {}
+
+    handled = resolve_cached_scores(
+        validator,
+        "btai_1",
+        "prompt",
+        "base",
+        [_response(output) for output in outputs],
+        [0, 1, 2, 3],
+        [0, 1, 2, 3],
+        miner_scores,
+    )
+
+    assert handled == {0, 1, 2}
+    assert miner_scores == {0: 93.0, 1: 0.0, 2: 93.0}
+    assert validator.ready_to_set_weights
+    assert [r["miner_id"] for r in logged[0]] == [0, 1, 2]
+
+
+class _EchoJudgeScheduler:
+    """Judges every request right away, scoring "good" responses 0.9 and others 0.1."""
+
+    def route(self, requests, deadline=None, batch_queue_depth=0):
+        return list(requests), []
+
+    async def run_realtime(self, requests):
+        records = []
+        for request in requests:
+            words = re.findall(
+                r"Therapist \d+: (\w+)", request["body"]["messages"][1]["content"]
+            )
+            scores = [0.9 if word == "good" else 0.1 for word in words]
+            body = {
+                "choices": [{"message": {"content": json.dumps({"scores": scores})}}]
+            }
+            records.append(
+                json.dumps(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": body},
+                    }
+                )
+            )
+        return records, []
+
+    def tokens_spent(self):
+        return 0
+
+
+def test_fast_lane_credits_every_batch_to_its_own_miners(monkeypatch):
+    async def no_pending_requests():
+        return 0
+
+    monkeypatch.setattr(forward, "count_pending_requests", no_pending_requests)
+    monkeypatch.setattr(
+        judge_batch,
+        "count_and_clip_tokens",
+        lambda text, max_tokens: (len(text.split()), text),
+    )
+    judge = judge_batch.OpenAIBatchLLMAsJudgeEval.__new__(
+        judge_batch.OpenAIBatchLLMAsJudgeEval
+    )
+    judge.judge_model = "gpt-4o"
+    judge.judge_cache = None
+    outputs = ["good " * 4000, "bad " * 4000, "bad " * 4000, "good " * 4000]
+    responses = [_response(output) for output in outputs]
+    miner_uids = [0, 1, 2, 3]
+    batch_info = judge.create_batch(
+        "prompt", "base", "btai_1", responses, 4000, miner_uids, max_request_per_batch=1
+    )
+    assert len(batch_info) == 2
+    validator = SimpleNamespace(
+        config=SimpleNamespace(judge=SimpleNamespace(deadline_minutes=0)),
+        judge_scheduler=_EchoJudgeScheduler(),
+        judge_cache=None,
+        metagraph=SimpleNamespace(
+            hotkeys=[f"hk{i}" for i in range(4)], coldkeys=[f"ck{i}" for i in range(4)]
+        ),
+        wandb_logger=SimpleNamespace(
+            log_evaluation_round=lambda prompt, name, judged: None,
+            create_summary_dashboard=lambda: None,
+        ),
+        ready_to_set_weights=False,
+    )
+    miner_scores = {}
+
+    remaining, handled = asyncio.run(
+        forward.run_fast_lane(
+            validator,
+            "btai_1",
+            "prompt",
+            "base",
+            responses,
+            miner_uids,
+            batch_info,
+            miner_scores,
+        )
+    )
+
+    assert remaining == []
+    assert handled == {0, 1, 2, 3}
+    assert miner_scores == {0: 93.0, 1: 0.0, 2: 0.0, 3: 93.0}
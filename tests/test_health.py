@@ -0,0 +1,89 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from BetterTherapy.utils import uids
+from BetterTherapy.utils.health import AxonHealthProber
+from tests.helpers import make_validator
+
+
+class _Dendrite:
+    """Answers pings from the axons whose port is not in `dead_ports`."""
+
+    def __init__(self, dead_ports=()):
+        self.dead_ports = set(dead_ports)
+        self.batch_sizes = []
+
+    async def __call__(self, axons, synapse, deserialize, timeout):
+        self.batch_sizes.append(len(axons))
+        return [
+            SimpleNamespace(
+                dendrite=SimpleNamespace(
+                    status_code=408 if axon.port in self.dead_ports else 200,
+                    process_time=0.05 * axon.port,
+                )
+            )
+            for axon in axons
+        ]
+
+
+def _metagraph(n):
+    return SimpleNamespace(
+        hotkeys=[f"hk{uid}" for uid in range(n)],
+        axons=[
+            SimpleNamespace(ip="1.2.3.4", port=uid, is_serving=True) for uid in range(n)
+        ],
+    )
+
+
+def test_marks_axons_unreachable_after_consecutive_failures():
+    metagraph = _metagraph(10)
+    dendrite = _Dendrite(dead_ports={2, 7})
+    prober = AxonHealthProber(dendrite, metagraph, max_concurrency=4, max_failures=2)
+
+    asyncio.run(prober.probe_all())
+    assert dendrite.batch_sizes == [4, 4, 2]
+    assert prober.reachable_mask(12).all()
+
+    asyncio.run(prober.probe_all())
+    mask = prober.reachable_mask(12)
+    assert np.flatnonzero(~mask).tolist() == [2, 7]
+    assert prober.rtt[3] == pytest.approx(0.15)
+    assert np.isnan(prober.rtt[2])
+
+    dendrite.dead_ports.clear()
+    asyncio.run(prober.probe_all())
+    assert prober.reachable_mask(10).all()
+
+
+def test_stats_survive_restart_for_unchanged_hotkeys(tmp_path):
+    path = str(tmp_path / "axon_health.npz")
+    metagraph = _metagraph(4)
+    prober = AxonHealthProber(
+        _Dendrite(dead_ports={1, 3}), metagraph, path=path, max_failures=1
+    )
+    asyncio.run(prober.probe_all())
+    prober.save()
+
+    metagraph.hotkeys[3] = "new"
+    restarted = AxonHealthProber(_Dendrite(), metagraph, path=path, max_failures=1)
+    restarted.load()
+
+    assert restarted.reachable_mask(4).tolist() == [True, False, True, True]
+    assert restarted.probes.tolist() == [1, 1, 1, 0]
+
+
+def test_filter_uids_skips_unreachable_axons():
+    uids._filter_cache.clear()
+    validator = make_validator(128)
+    before = uids.filter_uids(validator)
+
+    prober = AxonHealthProber(None, validator.metagraph, max_failures=1)
+    prober.record([(int(before[0]), False, None)])
+    validator.health_prober = prober
+
+    after = uids.filter_uids(validator)
+    assert before[0] not in after
+    assert set(after) <= set(before)
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import pytest
+
+import BetterTherapy  # noqa: F401  # import the package before evals.batch
+from evals.batch import OpenAIBatchLLMAsJudgeEval
+from evals.cache import JudgeCache
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    # tiktoken downloads its encoding on first use; count words instead.
+    monkeypatch.setattr(
+        "evals.batch.count_and_clip_tokens",
+        lambda text, max_tokens: (len(text.split()), text),
+    )
+
+
+def test_key_ignores_case_and_whitespace():
+    a = JudgeCache.key("prompt", "base", "I hear you.\n  That sounds hard.")
+    b = JudgeCache.key("prompt", "base", "i hear you. that sounds hard.")
+    c = JudgeCache.key("other prompt", "base", "i hear you. that sounds hard.")
+    assert a == b
+    assert a != c
+
+
+def test_lru_eviction():
+    cache = JudgeCache(max_entries=2)
+    cache.put("a", 0.1)
+    cache.put("b", 0.2)
+    assert cache.get("a") == 0.1
+    cache.put("c", 0.3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 0.1
+    assert cache.get("c") == 0.3
+
+
+def test_expired_entries_are_dropped():
+    cache = JudgeCache(ttl=-1)
+    cache.put("a", 0.5)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_alias_resolves_to_target_score():
+    cache = JudgeCache()
+    cache.alias("copy", "original")
+    assert cache.lookup("copy") == (None, True)
+    cache.put("original", 0.6)
+    assert cache.lookup("copy") == (0.6, True)
+    assert cache.lookup("original") == (0.6, False)
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "judge_cache.json")
+    cache = JudgeCache(path=path)
+    cache.put("a", 0.7)
+    cache.alias("b", "a")
+    cache.save()
+    assert JudgeCache(path=path).lookup("b") == (0.7, True)
+
+
+def test_create_batch_sends_each_distinct_response_once():
+    cache = JudgeCache()
+    evals = OpenAIBatchLLMAsJudgeEval(api_key="test", judge_cache=cache)
+    outputs = ["Same answer.", "same   answer.", "A different answer.", ""]
+    responses = [SimpleNamespace(output=output) for output in outputs]
+
+    batches = evals.create_batch(
+        "prompt", "base", "btai_test", responses, 400, [1, 2, 3, 4]
+    )
+
+    _, metadata = batches[0]
+    assert list(metadata.values()) == ["1,3"]
+    assert cache.round_stats["judged"] == 2
+    assert cache.round_stats["deduplicated"] == 1
+    assert cache.round_stats["tokens_saved"] > 0
+
+
+def test_create_batch_skips_uids():
+    cache = JudgeCache()
+    evals = OpenAIBatchLLMAsJudgeEval(api_key="test", judge_cache=cache)
+    responses = [SimpleNamespace(output="One answer."), SimpleNamespace(output="Two.")]
+
+    batches = evals.create_batch(
+        "prompt", "base", "btai_test", responses, 400, [1, 2], skip_uids={2}
+    )
+
+    assert list(batches[0][1].values()) == ["1"]
+    assert cache.round_stats["deduplicated"] == 1
+
+
+def test_create_batch_skips_responses_scored_in_earlier_rounds():
+    cache = JudgeCache()
+    cache.put(JudgeCache.key("prompt", "base", "Cached answer."), 0.8)
+    evals = OpenAIBatchLLMAsJudgeEval(api_key="test", judge_cache=cache)
+    responses = [SimpleNamespace(output="Cached answer.")]
+
+    assert evals.create_batch("prompt", "base", "btai_test", responses, 400, [5]) == []
@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+
+import torch
+
+from evals.local import LocalLLMAsJudgeEval
+
+
+class _CharTokenizer:
+    """Character-level tokenizer with the parts of the HuggingFace API the judge uses."""
+
+    pad_token = None
+    eos_token = "\0"
+    padding_side = "right"
+
+    def encode(self, text, add_special_tokens=True):
+        return [ord(ch) % 256 for ch in text]
+
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        ids = [self.encode(text)[-max_length:] for text in texts]
+        width = max(len(row) for row in ids)
+        assert self.padding_side == "left"
+        input_ids = torch.tensor([[0] * (width - len(row)) + row for row in ids])
+        attention_mask = torch.tensor(
+            [[0] * (width - len(row)) + [1] * len(row) for row in ids]
+        )
+        return _Encoding(input_ids=input_ids, attention_mask=attention_mask)
+
+
+class _Encoding(dict):
+    def to(self, device):
+        return self
+
+
+class _MarkModel(torch.nn.Module):
+    """Rates a prompt 9 if the response contains '!' and 0 otherwise."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def forward(self, input_ids, attention_mask):
+        self.calls.append(len(input_ids))
+        logits = torch.zeros(*input_ids.shape, 256)
+        for row, ids in enumerate(input_ids):
+            digit = "9" if (ids == ord("!")).any() else "0"
+            logits[row, -1, ord(digit)] = 50.0
+        return SimpleNamespace(logits=logits)
+
+
+def test_scores_in_batches_and_caches():
+    model = _MarkModel()
+    judge = LocalLLMAsJudgeEval(model, _CharTokenizer(), batch_size=2)
+    responses = ["Great answer!", "Plain answer.", "Great answer!", None, "Third!"]
+
+    scores = asyncio.run(judge.judge_responses("prompt", "base", responses))
+
+    assert [round(s, 3) for s in scores] == [1.0, 0.0, 1.0, 0.0, 1.0]
+    # Three distinct responses in batches of two.
+    assert model.calls == [2, 1]
+    assert judge.tokenizer.padding_side == "right"
+
+    judge.score("prompt", "base", responses)
+    assert model.calls == [2, 1]
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from BetterTherapy.base.validator import BaseValidatorNeuron
+from BetterTherapy.utils.metagraph import MetagraphTracker
+from tests.helpers import make_axon, make_metagraph
+
+
+def test_diff_reports_changed_uids_only():
+    metagraph = make_metagraph(8)
+    tracker = MetagraphTracker(metagraph)
+    assert tracker.diff(metagraph).empty
+
+    metagraph.hotkeys[2] = "new"
+    metagraph.axons[5] = make_axon(5, ip="10.0.0.9")
+    metagraph.S[6] += 1
+
+    change = tracker.diff(metagraph)
+    assert change.replaced_uids.tolist() == [2]
+    assert change.axon_uids.tolist() == [5]
+    assert change.stake_uids.tolist() == [6]
+    assert change.changed_uids.tolist() == [2, 5, 6]
+    assert tracker.diff(metagraph).empty
+
+
+def _validator(metagraph):
+    validator = SimpleNamespace(
+        metagraph=metagraph,
+        subtensor=None,
+        hotkeys=list(metagraph.hotkeys),
+        hotkey_to_uid={hk: uid for uid, hk in enumerate(metagraph.hotkeys)},
+        scores=np.ones(int(metagraph.n), dtype=np.float32),
+        metagraph_tracker=MetagraphTracker(metagraph),
+    )
+    metagraph.sync = lambda subtensor: None
+    validator.apply_metagraph_changes = lambda sync_ms=None: (
+        BaseValidatorNeuron.apply_metagraph_changes(validator, sync_ms)
+    )
+    return validator
+
+
+def test_resync_updates_replaced_uids_and_notifies_subscribers():
+    metagraph = make_metagraph(4)
+    validator = _validator(metagraph)
+    changes = []
+    validator.metagraph_tracker.subscribe(changes.append)
+
+    metagraph.hotkeys[1] = "new"
+    metagraph.n = np.array(5)
+    metagraph.hotkeys.append("hk4")
+    metagraph.axons.append(make_axon(4))
+    metagraph.S = np.arange(5, dtype=np.float32)
+    BaseValidatorNeuron.resync_metagraph(validator)
+
+    assert validator.scores.tolist() == [1, 0, 1, 1, 0]
+    assert validator.hotkeys == ["hk0", "new", "hk2", "hk3", "hk4"]
+    assert validator.hotkey_to_uid["new"] == 1
+    assert "hk1" not in validator.hotkey_to_uid
+    assert changes[0].replaced_uids.tolist() == [1, 4]
+
+    scores = validator.scores
+    BaseValidatorNeuron.resync_metagraph(validator)
+    assert validator.scores is scores
+    assert len(changes) == 1
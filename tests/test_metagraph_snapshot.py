@@ -0,0 +1,50 @@
+import bittensor as bt
+import numpy as np
+
+from BetterTherapy.utils.metagraph import (
+    load_metagraph_snapshot,
+    save_metagraph_snapshot,
+)
+from tests.helpers import make_axon
+
+
+def _metagraph(n: int, block: int = 7) -> "bt.metagraph.Metagraph":
+    metagraph = bt.metagraph(3, network="test", lite=True, sync=False)
+    metagraph.n = np.array(n)
+    metagraph.block = np.array(block)
+    metagraph.uids = np.arange(n)
+    metagraph.stake = np.linspace(0, 1, n, dtype=np.float32)
+    metagraph.last_update = np.arange(n) * 10
+    metagraph.validator_permit = np.arange(n) % 2 == 0
+    metagraph.axons = [make_axon(uid, ip=f"10.0.0.{uid}") for uid in range(n)]
+    return metagraph
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "metagraph.npz")
+    metagraph = _metagraph(5)
+    save_metagraph_snapshot(metagraph, path)
+
+    loaded = load_metagraph_snapshot(path, 3, "test")
+
+    assert int(loaded.n.item()) == 5
+    assert int(loaded.block.item()) == 7
+    assert loaded.hotkeys == metagraph.hotkeys
+    assert loaded.coldkeys == metagraph.coldkeys
+    np.testing.assert_array_equal(loaded.S, metagraph.S)
+    np.testing.assert_array_equal(loaded.last_update, metagraph.last_update)
+    np.testing.assert_array_equal(loaded.validator_permit, metagraph.validator_permit)
+    assert loaded.axons == metagraph.axons
+    assert [axon.is_serving for axon in loaded.axons] == [True] * 5
+
+
+def test_snapshot_missing_corrupt_or_other_subnet(tmp_path):
+    path = str(tmp_path / "metagraph.npz")
+    assert load_metagraph_snapshot(path, 3, "test") is None
+
+    save_metagraph_snapshot(_metagraph(2), path)
+    assert load_metagraph_snapshot(path, 4, "test") is None
+
+    with open(path, "wb") as f:
+        f.write(b"not a snapshot")
+    assert load_metagraph_snapshot(path, 3, "test") is None
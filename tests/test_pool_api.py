@@ -0,0 +1,91 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from BetterTherapy.utils.api import PoolApiClient
+from tests.helpers import PoolApiStub
+
+
+@pytest.fixture
+def pool_api():
+    api = PoolApiStub()
+    api.start()
+    yield api
+    api.stop()
+
+
+def _run(client: PoolApiClient, coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+def test_pool_miners_are_cached(pool_api):
+    pool_api.miners = [{"uid": 3}, {"uid": 7}, {"hotkey": "no uid"}]
+    client = PoolApiClient(pool_api.url, miners_ttl=60)
+
+    async def rounds():
+        first = await client.pool_miner_uids()
+        pool_api.miners = [{"uid": 9}]
+        second = await client.pool_miner_uids()
+        forced = await client.pool_miner_uids(force=True)
+        return first, second, forced
+
+    first, second, forced = _run(client, rounds())
+    assert first == second == {3, 7}
+    assert forced == {9}
+    assert pool_api.paths() == ["/pool/get/pool-metagraph"] * 2
+
+
+def test_retries_and_serves_last_good_value(pool_api):
+    pool_api.miners = [{"uid": 1}]
+    client = PoolApiClient(pool_api.url, retries=2, backoff=0, miners_ttl=0)
+
+    pool_api.fail_next = 2
+    assert _run(client, client.get_pool_miners()) == [{"uid": 1}]
+    assert len(pool_api.calls) == 3
+
+    pool_api.down = True
+    assert _run(client, client.get_pool_miners()) == [{"uid": 1}]
+    assert len(pool_api.calls) == 6
+
+
+def test_timeout(pool_api):
+    pool_api.delay = 1
+    client = PoolApiClient(pool_api.url, timeout=0.2, retries=0)
+    with pytest.raises(asyncio.TimeoutError):
+        _run(client, client.fetch_pool_miners())
+
+
+def test_blacklist_is_fetched_conditionally(pool_api):
+    pool_api.items = ["hk1"]
+    client = PoolApiClient(pool_api.url)
+
+    async def rounds():
+        first = await client.fetch_blacklist()
+        second = await client.fetch_blacklist(first[1])
+        return first, second
+
+    assert _run(client, rounds()) == ((["hk1"], "v1"), (None, "v1"))
+    assert "If-None-Match" not in pool_api.calls[0][1]
+    assert pool_api.calls[1][1]["If-None-Match"] == "v1"
+
+
+def test_drops_sessions_of_closed_loops(pool_api):
+    client = PoolApiClient(pool_api.url)
+    asyncio.run(client.fetch_blacklist())
+    _run(client, client.fetch_blacklist())
+
+    assert client._sessions == {}
+
+
+def test_does_not_retry_client_errors(pool_api):
+    client = PoolApiClient(pool_api.url, retries=2, backoff=60)
+    with pytest.raises(aiohttp.ClientResponseError) as error:
+        _run(client, client.request("GET", "/missing"))
+    assert error.value.status == 404
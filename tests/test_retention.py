@@ -0,0 +1,84 @@
+import os
+import time
+
+from sqlalchemy import text
+
+from BetterTherapy.db.retention import RetentionJob
+from tests.helpers import fill_requests, make_engine
+
+
+def _ids(engine, sql: str) -> list[int]:
+    with engine.connect() as connection:
+        return list(connection.execute(text(sql)).scalars())
+
+
+def test_caps_delete_oldest_requests_with_their_responses(tmp_path):
+    engine = make_engine(tmp_path / "test.db")
+    fill_requests(engine, 12, 5, ready_every=3)  # Requests 1, 4, 7 and 10 are old.
+
+    job = RetentionJob(
+        engine, max_age_hours=24, max_requests=6, max_responses=20, batch_size=2
+    )
+    report = job.run()
+
+    # Age cap: 1, 4, 7, 10. Request cap: 2, 3. Response cap: 5, 6.
+    assert _ids(engine, "SELECT id FROM requests") == [8, 9, 11, 12]
+    assert _ids(engine, "SELECT DISTINCT request_id FROM miner_responses") == [
+        8,
+        9,
+        11,
+        12,
+    ]
+    assert (report.deleted_requests, report.deleted_responses) == (8, 40)
+    assert job.last_report is report
+
+
+def test_orphaned_responses_are_deleted(tmp_path):
+    engine = make_engine(tmp_path / "test.db", tuned=False)
+    fill_requests(engine, 2, 3)
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM requests WHERE id = 1"))
+
+    report = RetentionJob(engine, max_age_hours=0, batch_size=1).run()
+
+    assert report.deleted_responses == 3
+    assert _ids(engine, "SELECT DISTINCT request_id FROM miner_responses") == [2]
+
+
+def test_incremental_vacuum_keeps_the_file_flat(tmp_path):
+    path = tmp_path / "test.db"
+    engine = make_engine(path, tuned=False)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA auto_vacuum")).scalar() == 0
+    engine.dispose()
+    engine = make_engine(path)
+    job = RetentionJob(engine, max_requests=10)
+    job.enable_incremental_vacuum()
+
+    size = None
+    for round_index in range(5):
+        fill_requests(engine, 10, 50, first_id=10 * round_index + 1)
+        report = job.run()
+        if round_index == 0:
+            continue
+        # The previous requests are replaced and their pages reused or vacuumed.
+        assert report.deleted_requests == 10
+        assert report.deleted_blobs == 500
+        assert report.free_bytes == 0
+        # Measured once the hash-keyed blob index has reached its steady fill.
+        size = size or os.path.getsize(path)
+        assert os.path.getsize(path) <= size * 1.1
+
+
+def test_background_job_does_not_rewrite_the_database(tmp_path):
+    engine = make_engine(tmp_path / "test.db", tuned=False)
+    job = RetentionJob(engine, max_age_hours=0, interval=3600)
+
+    job.start()
+    while job.last_report is None:
+        time.sleep(0.01)
+    job.stop()
+
+    # The whole-file VACUUM is left to enable_incremental_vacuum at startup.
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA auto_vacuum")).scalar() == 0
@@ -0,0 +1,61 @@
+import warnings
+
+import numpy as np
+
+from BetterTherapy.utils.metagraph import MetagraphChange
+from BetterTherapy.utils.rewards import RewardHistory
+
+
+def test_batched_record_keeps_last_window_in_order():
+    history = RewardHistory(4, window=3)
+    history.record([1, 1, 2, 1, 1], [0.1, 0.2, 0.5, 0.3, 0.4], timestamps=10.0)
+
+    assert history.counts.tolist() == [0, 4, 1, 0]
+    # UID 1 wrapped around: 0.1 was overwritten by 0.4.
+    np.testing.assert_array_equal(
+        np.sort(history.rewards[1]), np.float32([0.2, 0.3, 0.4])
+    )
+    assert np.isclose(history.mean()[1], 0.3)
+    assert np.isnan(history.mean()[0])
+
+    history.record([5], [1.0])
+    assert history.n == 6
+
+
+def test_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    history = RewardHistory(32, window=16)
+    for step in range(40):
+        uids = rng.choice(32, size=8)
+        history.record(uids, rng.random(8), timestamps=float(step))
+
+    for since in (None, 30.0):
+        rewards = history.rewards.astype(np.float64)
+        if since is not None:
+            rewards = np.where(history.timestamps >= since, rewards, np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            np.testing.assert_allclose(history.mean(since), np.nanmean(rewards, 1))
+            np.testing.assert_allclose(
+                history.median(since), np.nanmedian(rewards, axis=1)
+            )
+            np.testing.assert_allclose(
+                history.percentile(90, since), np.nanpercentile(rewards, 90, axis=1)
+            )
+        np.testing.assert_array_equal(
+            history.count(since), np.count_nonzero(~np.isnan(rewards), axis=1)
+        )
+
+
+def test_apply_change_resizes_and_clears_replaced():
+    history = RewardHistory(3, window=4)
+    history.record([0, 1, 2], [1.0, 1.0, 1.0])
+
+    history.apply_change(
+        MetagraphChange(
+            block=2, n_before=3, n_after=5, replaced_uids=np.array([1, 3, 4])
+        )
+    )
+
+    assert history.n == 5
+    assert history.count().tolist() == [1, 0, 1, 0, 0]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from BetterTherapy.utils.sampler import MinerSampler
+
+
+def test_returns_k_distinct_eligible_uids():
+    sampler = MinerSampler(256, seed=0)
+    eligible = np.arange(0, 256, 2)
+
+    uids = sampler.sample(eligible, 20)
+
+    assert len(uids) == 20
+    assert len(set(uids.tolist())) == 20
+    assert np.isin(uids, eligible).all()
+    assert len(sampler.sample(eligible[:5], 20)) == 5
+
+
+def test_covers_every_eligible_uid_within_window():
+    sampler = MinerSampler(256, coverage_rounds=8, seed=1)
+    eligible = np.arange(200)
+    # Make a few miners far more attractive so weighted draws favour them.
+    sampler.record(range(10), [True] * 10, [0.1] * 10)
+    sampler.record(range(10, 200), [False] * 190, [60.0] * 190)
+
+    for window in range(3):
+        seen = set()
+        for _ in range(8):
+            seen.update(sampler.sample(eligible, 30).tolist())
+        assert seen == set(range(200)), window
+
+
+def test_prefers_fast_reliable_miners():
+    sampler = MinerSampler(100, coverage_rounds=1000, seed=2)
+    sampler.record(range(50), [True] * 50, [1.0] * 50)
+    sampler.record(range(50, 100), [False] * 50, [90.0] * 50)
+
+    counts = np.zeros(100)
+    for _ in range(50):
+        counts[sampler.sample(np.arange(100), 10)] += 1
+
+    assert counts[:50].sum() > 3 * counts[50:].sum()
+
+
+def test_latency_percentiles_and_hotkey_reset():
+    sampler = MinerSampler(3, latency_window=4)
+    sampler.sync(["a", "b", "c"])
+    for latency in [4.0, 1.0, 3.0, 2.0, 5.0]:
+        sampler.record([0], [True], [latency])
+    sampler.record([1], [False], [None])
+
+    p50 = sampler.latency_percentile(50)
+    assert p50[0] == 2.0
+    assert np.isnan(p50[1])
+    # 4.0 was overwritten by 5.0.
+    assert sampler.latency_percentile(100)[0] == 5.0
+    assert sampler.latency_percentile(0)[0] == 1.0
+    assert sampler.success_rate()[1] == 1 / 3
+
+    sampler.sync(["a", "x", "c", "d"])
+    assert sampler.attempts.tolist() == [5, 0, 0, 0]
@@ -0,0 +1,90 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from evals.scheduler import JudgeScheduler, estimate_request_tokens
+
+
+def _request(custom_id: str, content: str = "x" * 400) -> dict:
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": "gpt-4",
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": 100,
+        },
+    }
+
+
+class _FakeCompletions:
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.calls = []
+
+    def create(self, **body):
+        custom_id = body["messages"][0]["content"]
+        self.calls.append(custom_id)
+        if custom_id in self.fail_ids:
+            raise RuntimeError("rate limited")
+        return SimpleNamespace(model_dump=lambda: {"choices": [custom_id]})
+
+
+def _client(fail_ids=()):
+    return SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(fail_ids)))
+
+
+def test_estimate_request_tokens():
+    assert estimate_request_tokens(_request("a")) == 200
+
+
+def test_routes_sampled_fraction_to_batch_by_default():
+    scheduler = JudgeScheduler(_client(), realtime_fraction=0.0)
+    realtime, batch = scheduler.route([_request(str(i)) for i in range(5)])
+    assert realtime == []
+    assert len(batch) == 5
+
+
+def test_urgent_requests_respect_token_budget():
+    scheduler = JudgeScheduler(
+        _client(), realtime_fraction=0.0, realtime_token_budget=500
+    )
+    requests = [_request(str(i)) for i in range(5)]
+
+    realtime, batch = scheduler.route(requests, deadline=60 * 60)
+
+    assert [r["custom_id"] for r in realtime] == ["0", "1"]
+    assert len(batch) == 3
+    assert scheduler.tokens_spent() == 400
+    # The budget is shared across rounds.
+    realtime, _ = scheduler.route(requests, deadline=60 * 60)
+    assert realtime == []
+
+
+def test_backlog_routes_to_realtime():
+    scheduler = JudgeScheduler(
+        _client(), realtime_fraction=0.0, max_batch_queue_depth=3
+    )
+    realtime, _ = scheduler.route([_request("a")], batch_queue_depth=2)
+    assert realtime == []
+    realtime, _ = scheduler.route([_request("a")], batch_queue_depth=3)
+    assert len(realtime) == 1
+
+
+def test_run_realtime_returns_batch_records_and_failures():
+    client = _client(fail_ids={"bad"})
+    scheduler = JudgeScheduler(client)
+    requests = [_request("ok", content="ok"), _request("bad", content="bad")]
+    realtime, _ = scheduler.route(requests, deadline=60)
+    assert scheduler.tokens_spent() == 2 * estimate_request_tokens(requests[0])
+
+    records, failed = asyncio.run(scheduler.run_realtime(realtime))
+
+    assert [r["custom_id"] for r in failed] == ["bad"]
+    # The failed request is refunded; it goes to the batch lane.
+    assert scheduler.tokens_spent() == estimate_request_tokens(requests[0])
+    record = json.loads(records[0])
+    assert record["custom_id"] == "ok"
+    assert record["response"]["status_code"] == 200
+    assert record["response"]["body"] == {"choices": ["ok"]}
@@ -0,0 +1,84 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from BetterTherapy.utils.scores import ScoreEngine
+
+
+def reference_update(scores, uids, rewards, alpha):
+    """The scatter-and-blend update the engine replaces."""
+    scattered_rewards = np.zeros_like(scores)
+    scattered_rewards[uids] = rewards
+    return alpha * scattered_rewards + (1 - alpha) * scores
+
+
+def test_update_matches_scatter_and_blend():
+    rng = np.random.default_rng(0)
+    engine = ScoreEngine(64, alpha=0.1)
+    expected = engine.scores.copy()
+    for _ in range(50):
+        uids = rng.choice(64, size=rng.integers(1, 20))
+        rewards = rng.random(len(uids))
+        engine.update(uids, rewards)
+        expected = reference_update(expected, uids, rewards, 0.1)
+
+    assert engine.scores.dtype == np.float32
+    np.testing.assert_array_equal(engine.scores, expected)
+
+
+def test_batched_rounds_equal_sequential_rounds():
+    rng = np.random.default_rng(1)
+    rewards = rng.random((3, 4))
+    uids = rng.choice(16, size=(3, 4))
+    batched, sequential = ScoreEngine(16), ScoreEngine(16)
+
+    batched.update(uids, rewards)
+    for round_uids, round_rewards in zip(uids, rewards, strict=True):
+        sequential.update(round_uids, round_rewards)
+    np.testing.assert_array_equal(batched.scores, sequential.scores)
+
+    batched.update(uids[0], rewards)
+    for round_rewards in rewards:
+        sequential.update(uids[0], round_rewards)
+    np.testing.assert_array_equal(batched.scores, sequential.scores)
+
+
+def test_nan_rewards_count_as_zero_and_bad_input_is_rejected():
+    engine = ScoreEngine(4, alpha=0.5)
+    engine.update([0, 1], [np.nan, 1.0])
+    assert engine.scores.tolist() == [0, 0.5, 0, 0]
+
+    with pytest.raises(ValueError):
+        engine.update([0, 1], [1.0])
+    with pytest.raises(IndexError):
+        engine.update([4], [1.0])
+
+
+@pytest.mark.parametrize("rounds", [(), (2,)])
+def test_steady_state_update_allocates_no_arrays(rounds):
+    n = 1 << 16
+    engine = ScoreEngine(n)
+    uids = np.arange(0, n, 4, dtype=np.intp)
+    rewards = np.ones((*rounds, len(uids)), dtype=np.float32)
+    engine.update(uids, rewards)
+    buffer = engine.scores
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for _ in range(10):
+        engine.update(uids, rewards)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert engine.scores is buffer
+    # A temporary copy of the rewards would take n bytes, one of the scores n * 4.
+    assert peak - baseline < 4096
+
+
+def test_load_and_resize_keep_float32():
+    engine = ScoreEngine()
+    engine.load(np.array([1.0, 2.0]))
+    engine.resize(3)
+    assert engine.scores.dtype == np.float32
+    assert engine.scores.tolist() == [1, 2, 0]
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+
+from BetterTherapy.utils.state import StateStore
+
+
+def _files(path) -> list[str]:
+    return sorted(os.listdir(path))
+
+
+def test_journal_round_trip_and_skips_unchanged(tmp_path):
+    store = StateStore(str(tmp_path), checkpoint_every=100)
+    scores = np.zeros(8, dtype=np.float32)
+    hotkeys = [f"hk{uid}" for uid in range(8)]
+
+    assert store.save(0, scores, hotkeys)
+    assert not store.save(1, scores, hotkeys)
+    scores[[2, 5]] = [0.5, 0.25]
+    assert store.save(2, scores, hotkeys)
+    scores[5] = np.nan
+    assert store.save(3, scores, hotkeys)
+    assert not store.save(4, scores, hotkeys)
+    assert _files(tmp_path) == [
+        "state-journal-1.bin",
+        "state-scores-1.npy",
+        "state.json",
+    ]
+
+    state = StateStore(str(tmp_path)).load()
+    assert state.step == 3
+    assert state.hotkeys == hotkeys
+    assert state.scores.dtype == np.float32
+    np.testing.assert_array_equal(state.scores, scores)
+
+
+def test_checkpoints_on_hotkey_change_and_every_n_records(tmp_path):
+    store = StateStore(str(tmp_path), checkpoint_every=2)
+    scores = np.zeros(4, dtype=np.float32)
+    store.save(0, scores, ["a", "b", "c", "d"])
+    for step in range(1, 4):
+        scores[0] = step
+        store.save(step, scores, ["a", "b", "c", "d"])
+    # Two journal records, then a checkpoint.
+    assert "state-scores-2.npy" in _files(tmp_path)
+
+    scores = np.append(scores, 1.0).astype(np.float32)
+    store.save(4, scores, ["a", "b", "c", "d", "e"])
+    assert "state-scores-3.npy" in _files(tmp_path)
+    assert "state-scores-2.npy" not in _files(tmp_path)
+
+    state = StateStore(str(tmp_path)).load()
+    assert state.step == 4
+    assert state.hotkeys == ["a", "b", "c", "d", "e"]
+    np.testing.assert_array_equal(state.scores, scores)
+
+
+def test_recovers_from_torn_journal(tmp_path):
+    store = StateStore(str(tmp_path))
+    scores = np.zeros(4, dtype=np.float32)
+    store.save(0, scores, ["a", "b", "c", "d"])
+    scores[1] = 1.0
+    store.save(1, scores, ["a", "b", "c", "d"])
+    scores[2] = 2.0
+    store.save(2, scores, ["a", "b", "c", "d"])
+    journal = tmp_path / "state-journal-1.bin"
+    journal.write_bytes(journal.read_bytes()[:-3])
+
+    store = StateStore(str(tmp_path))
+    state = store.load()
+    assert state.step == 1
+    assert state.scores.tolist() == [0, 1, 0, 0]
+
+    # New records follow the last good one.
+    scores = np.array(state.scores)
+    scores[3] = 3.0
+    assert store.save(3, scores, state.hotkeys)
+    assert StateStore(str(tmp_path)).load().scores.tolist() == [0, 1, 0, 3]
+
+
+def test_missing_and_legacy_state(tmp_path):
+    assert StateStore(str(tmp_path)).load() is None
+
+    np.savez(
+        tmp_path / "state.npz",
+        step=7,
+        scores=np.ones(2, dtype=np.float32),
+        hotkeys=["a", "b"],
+    )
+    state = StateStore(str(tmp_path)).load()
+    assert state.step == 7
+    assert state.hotkeys == ["a", "b"]
+    assert state.scores.tolist() == [1, 1]
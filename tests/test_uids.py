@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from BetterTherapy.utils import uids
+from tests.helpers import make_validator, reference_filter_uids
+
+BLACKLISTED = frozenset({"hk3", "hk40", "hk77"})
+
+
+@pytest.fixture
+def masks_calls(monkeypatch):
+    calls = []
+    compute_uid_masks = uids.compute_uid_masks
+
+    def counted(*args):
+        calls.append(args)
+        return compute_uid_masks(*args)
+
+    monkeypatch.setattr(uids, "compute_uid_masks", counted)
+    uids._filter_cache.clear()
+    return calls
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_per_uid_loop(masks_calls, seed):
+    validator = make_validator(512, seed=seed, blacklisted=BLACKLISTED)
+
+    for max_per_key, blacklist in [(15, None), (3, ["hk5", "hk6"])]:
+        expected = reference_filter_uids(validator, BLACKLISTED, max_per_key, blacklist)
+        result = uids.filter_uids(validator, max_per_key, blacklist)
+        np.testing.assert_array_equal(result, expected)
+
+
+def test_memoized_per_block(masks_calls):
+    validator = make_validator(64)
+
+    first = uids.filter_uids(validator)
+    first[:] = -1
+    second = uids.filter_uids(validator)
+    assert len(masks_calls) == 1
+    assert (second >= 0).all()
+
+    validator.metagraph.block = np.array(2)
+    uids.filter_uids(validator)
+    assert len(masks_calls) == 2
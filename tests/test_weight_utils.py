@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from BetterTherapy.base.utils.weight_utils import (
+    U16_MAX,
+    convert_weights_and_uids_for_emit,
+    normalize_max_weight,
+    process_weights_for_emit,
+)
+from tests.helpers import (
+    random_weights,
+    reference_convert_weights_and_uids_for_emit,
+    reference_normalize_max_weight,
+)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("seed", range(5))
+def test_normalize_max_weight_matches_reference(seed, dtype):
+    rng = np.random.default_rng(seed)
+    for _ in range(200):
+        n = int(rng.integers(1, 1024))
+        limit = float(rng.uniform(0.001, 0.5))
+        x = random_weights(rng, n, dtype)
+
+        y = normalize_max_weight(x, limit=limit)
+
+        np.testing.assert_array_equal(y, reference_normalize_max_weight(x, limit))
+        assert y.dtype == x.dtype
+        assert y.sum() == pytest.approx(1, abs=1e-5)
+        if n * limit > 1:
+            assert y.max() <= limit + 1e-6
+        else:
+            np.testing.assert_allclose(y, 1 / n)
+
+
+def test_normalize_max_weight_edge_cases():
+    np.testing.assert_allclose(normalize_max_weight(np.zeros(4)), 0.25)
+    np.testing.assert_allclose(
+        normalize_max_weight(np.array([1.0, 3.0]), 0.8), [0.25, 0.75]
+    )
+    y = normalize_max_weight(np.array([0.0] * 9 + [1.0]), limit=0.2)
+    assert y.sum() == pytest.approx(1)
+    assert y.max() <= 0.2 + 1e-6
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_convert_weights_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(50):
+        n = int(rng.integers(1, 1024))
+        uids = rng.permutation(n)
+        weights = random_weights(rng, n, np.float32)
+        # Values that land exactly halfway between two u16 values.
+        weights[: n // 4] = (rng.integers(0, 100, n // 4) + 0.5) / U16_MAX
+
+        uint_uids, uint_weights = convert_weights_and_uids_for_emit(uids, weights)
+
+        assert uint_uids.dtype == uint_weights.dtype == np.uint16
+        expected = reference_convert_weights_and_uids_for_emit(uids, weights)
+        assert (uint_uids.tolist(), uint_weights.tolist()) == expected
+
+
+def test_convert_weights_rejects_invalid_input():
+    with pytest.raises(ValueError):
+        convert_weights_and_uids_for_emit(np.arange(2), np.array([0.5, -0.1]))
+    with pytest.raises(ValueError):
+        convert_weights_and_uids_for_emit(np.arange(3), np.ones(2))
+    uids, weights = convert_weights_and_uids_for_emit(np.arange(3), np.zeros(3))
+    assert uids.size == weights.size == 0
+
+
+def test_process_weights_for_emit():
+    weights = np.zeros(8, dtype=np.float32)
+    weights[[1, 2, 5]] = [0.2, 0.5, 1.0]
+
+    uids, uint_weights = process_weights_for_emit(
+        np.arange(8), weights, n=8, min_allowed_weights=2, max_weight_limit=0.5
+    )
+    assert uids.tolist() == [1, 2, 5]
+    assert uint_weights.max() == U16_MAX
+
+    # Fewer non-zero weights than allowed: every UID gets a small weight.
+    uids, uint_weights = process_weights_for_emit(
+        np.arange(8), weights, n=8, min_allowed_weights=4, max_weight_limit=0.5
+    )
+    assert uids.tolist() == list(range(8))
+
+    # No weights at all: uniform.
+    uids, uint_weights = process_weights_for_emit(
+        np.arange(8), np.zeros(8), n=8, min_allowed_weights=2, max_weight_limit=1
+    )
+    assert uint_weights.tolist() == [U16_MAX] * 8
@@ -0,0 +1,104 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from BetterTherapy.base.validator import BaseValidatorNeuron
+from BetterTherapy.utils.weight_worker import WeightCommitWorker
+
+
+class _Job:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.subtensors = []
+
+    def __call__(self, subtensor):
+        self.subtensors.append(subtensor)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _worker(**kwargs) -> WeightCommitWorker:
+    connections = iter(range(100))
+    worker = WeightCommitWorker(lambda: next(connections), **kwargs)
+    worker.start()
+    return worker
+
+
+def test_retries_with_backoff_and_reconnects():
+    worker = _worker(retries=3, backoff=0.01)
+    job = _Job([ConnectionError("closed"), (False, "rate limited"), (True, "ok")])
+
+    worker.enqueue(job)
+    assert worker.wait_idle(5)
+    worker.stop()
+
+    # A new connection after the exception, reused after the failed extrinsic.
+    assert job.subtensors == [0, 1, 1]
+    [submission] = worker.history
+    assert submission.success
+    assert submission.attempts == 3
+    assert submission.latency >= 0.03
+
+
+def test_gives_up_after_retries_or_window():
+    worker = _worker(retries=1, backoff=0.01)
+    job = _Job([(False, "a"), (False, "b")])
+    worker.enqueue(job)
+    assert worker.wait_idle(5)
+    assert not worker.history[-1].success
+    assert worker.history[-1].attempts == 2
+
+    worker.window = 0.005
+    job = _Job([(False, "a")])
+    worker.enqueue(job)
+    assert worker.wait_idle(5)
+    worker.stop()
+    assert worker.history[-1].attempts == 1
+    assert worker.history[-1].message == "a"
+
+
+def test_latest_snapshot_supersedes_queued_and_retrying_jobs():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def blocking(subtensor):
+        calls.append("blocking")
+        started.set()
+        release.wait(5)
+        return False, "failed"
+
+    def job(name):
+        def submit(subtensor):
+            calls.append(name)
+            return True, "ok"
+
+        return submit
+
+    worker = _worker(retries=3, backoff=0.05)
+    worker.enqueue(blocking)
+    assert started.wait(5)
+    worker.enqueue(job("old"))
+    worker.enqueue(job("new"))
+    release.set()
+    assert worker.wait_idle(5)
+    worker.stop()
+
+    assert calls == ["blocking", "new"]
+    assert [s.success for s in worker.history] == [False, True]
+
+
+def test_validator_shutdown_submits_queued_weights_and_stops_the_worker():
+    def slow(subtensor):
+        time.sleep(0.1)
+        return True, "ok"
+
+    worker = _worker()
+    worker.enqueue(slow)
+    validator = SimpleNamespace(weight_worker=worker)
+
+    BaseValidatorNeuron.stop_weight_worker(validator)
+
+    assert [s.success for s in worker.history] == [True]
+    assert worker._thread is None